@@ -12,22 +12,34 @@ https://docs.djangoproject.com/en/3.2/ref/settings/
 
 from pathlib import Path
 import os
+import sys
+
+from django.core.exceptions import ImproperlyConfigured
 
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
 
-# Quick-start development settings - unsuitable for production
+# Settings profile: dev, test or prod. `manage.py test` picks test on its own.
 # See https://docs.djangoproject.com/en/3.2/howto/deployment/checklist/
+TESTING = len(sys.argv) > 1 and sys.argv[1] == 'test'
+PROFILE = os.environ.get('DJANGO_PROFILE', 'test' if TESTING else 'dev')
+if PROFILE not in ('dev', 'test', 'prod'):
+    raise ImproperlyConfigured(f'Unknown DJANGO_PROFILE {PROFILE!r}, use dev, test or prod')
 
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = 'django-insecure-r)qkt$$vtwjmobw$m)dbi4@5x2r!ajha-2wc)_t&=my5f+2k3s'
+SECRET_KEY = os.environ.get('DJANGO_SECRET_KEY')
+if not SECRET_KEY:
+    if PROFILE == 'prod':
+        raise ImproperlyConfigured('DJANGO_SECRET_KEY is required in the prod profile')
+    SECRET_KEY = 'django-insecure-r)qkt$$vtwjmobw$m)dbi4@5x2r!ajha-2wc)_t&=my5f+2k3s'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# DEBUG keeps every SQL query in memory, long running workers must not have it on
+DEBUG = os.environ.get('DJANGO_DEBUG', '1' if PROFILE == 'dev' else '0') == '1'
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [host for host in os.environ.get('DJANGO_ALLOWED_HOSTS', '').split(',') if host]
 
 
 # Application definition
@@ -46,13 +58,17 @@ INSTALLED_APPS = [
     'article',
 ]
 
+# Sessions, session users and messages only run outside /api/, see core/middleware.py.
+# API views are csrf exempt already, CsrfViewMiddleware returns early for them.
 MIDDLEWARE = [
+    'core.middleware.QueryStatsMiddleware',
+    'core.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'core.middleware.SiteSessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
+    'core.middleware.SiteAuthenticationMiddleware',
+    'core.middleware.SiteMessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
@@ -73,6 +89,14 @@ TEMPLATES = [
         },
     },
 ]
+if PROFILE == 'prod':
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
 
 WSGI_APPLICATION = 'app.wsgi.application'
 
@@ -87,11 +111,38 @@ DATABASES = {
         'NAME': os.environ.get('DB_NAME'),
         'PASSWORD': os.environ.get('DB_PASS'),
         'USER': os.environ.get('DB_USER'),
-
+        # persistent connections in prod, a new connection per request costs more than most queries
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60 if PROFILE == 'prod' else 0)),
+        # libpq waits forever for an unreachable host by default, readyz workers included
+        'OPTIONS': {'connect_timeout': int(os.environ.get('DB_CONNECT_TIMEOUT', 5))},
     }
 }
 
 
+# Cache, shared by every process through memcached when CACHE_LOCATION is set
+# https://docs.djangoproject.com/en/3.2/topics/cache/
+# The article list cache is invalidated through a version key, a per-process cache
+# would keep serving stale lists from every worker but the one that saw the write.
+
+CACHE_LOCATION = os.environ.get('CACHE_LOCATION')
+if not CACHE_LOCATION and not DEBUG and PROFILE != 'test':
+    raise ImproperlyConfigured('CACHE_LOCATION (memcached host:port list) is required without DJANGO_DEBUG')
+if CACHE_LOCATION:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.memcached.PyMemcacheCache',
+            'LOCATION': CACHE_LOCATION.split(','),
+            'KEY_PREFIX': 'app',
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+
 # Password validation
 # https://docs.djangoproject.com/en/3.2/ref/settings/#auth-password-validators
 
@@ -134,6 +185,51 @@ MEDIA_URL = '/media/'
 MEDIA_ROOT = '/vol/web/media'
 STATIC_ROOT = '/vol/web/static'
 
+# Media files are stored under content addressed names, see core/storage.py
+MEDIA_STORAGE = os.environ.get('MEDIA_STORAGE', 'local')
+DEFAULT_FILE_STORAGE = {
+    'local': 'core.storage.LocalMediaStorage',
+    's3': 'core.storage.S3MediaStorage',
+}[MEDIA_STORAGE]
+MEDIA_S3_BUCKET = os.environ.get('MEDIA_S3_BUCKET')
+MEDIA_S3_ENDPOINT_URL = os.environ.get('MEDIA_S3_ENDPOINT_URL')
+MEDIA_S3_PUBLIC_URL = os.environ.get('MEDIA_S3_PUBLIC_URL')
+
+# Let the web server send local media: nginx internal location prefix or X-Sendfile
+MEDIA_ACCEL_REDIRECT_PREFIX = os.environ.get('MEDIA_ACCEL_REDIRECT_PREFIX')
+MEDIA_SENDFILE = os.environ.get('MEDIA_SENDFILE') == '1'
+
+# Partial files of resumable uploads, must be shared by every worker and replica taking chunks
+UPLOAD_PARTIAL_DIR = os.environ.get('UPLOAD_PARTIAL_DIR', '/vol/web/uploads')
+
+# On-disk LRU cache of resized article images
+RENDITION_CACHE_DIR = os.environ.get('RENDITION_CACHE_DIR', '/vol/web/renditions')
+RENDITION_CACHE_MAX_BYTES = int(os.environ.get('RENDITION_CACHE_MAX_BYTES', 512 * 1024 * 1024))
+
+# Comment and like events for the article stream, published through Redis so a stream on any
+# worker sees writes made on every other one. The in-process broker is only for DEBUG and tests.
+EVENTS_REDIS_URL = os.environ.get('EVENTS_REDIS_URL')
+if not EVENTS_REDIS_URL and not DEBUG and PROFILE != 'test':
+    raise ImproperlyConfigured('EVENTS_REDIS_URL is required without DJANGO_DEBUG')
+
+# Write-behind likes for traffic spikes: unset writes directly, 'local' or 'redis' buffers them
+LIKE_BUFFER = os.environ.get('LIKE_BUFFER')
+LIKE_BUFFER_REDIS_URL = os.environ.get('LIKE_BUFFER_REDIS_URL')
+LIKE_BUFFER_FLUSH_SECONDS = float(os.environ.get('LIKE_BUFFER_FLUSH_SECONDS', 1))
+
+# Per endpoint SQL fingerprint stats, read them with `manage.py query_stats` or in the admin
+QUERY_STATS = os.environ.get('QUERY_STATS') == '1'
+QUERY_STATS_FLUSH_SECONDS = float(os.environ.get('QUERY_STATS_FLUSH_SECONDS', 10))
+SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 200))
+
+# cProfile samples: requests sent with `X-Profile: <PROFILING_TOKEN>`, or a PROFILING_RATE share
+# of the PROFILING_VIEWS url names (all when empty). Read them with `manage.py profile_summary`
+PROFILING_TOKEN = os.environ.get('PROFILING_TOKEN')
+PROFILING_RATE = float(os.environ.get('PROFILING_RATE', 0))
+PROFILING_VIEWS = [name for name in os.environ.get('PROFILING_VIEWS', '').split(',') if name]
+PROFILING_DIR = os.environ.get('PROFILING_DIR', '/vol/web/profiles')
+PROFILING_MAX_FILES = int(os.environ.get('PROFILING_MAX_FILES', 200))
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/3.2/ref/settings/#default-auto-field
 
@@ -141,3 +237,10 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 AUTH_USER_MODEL = 'core.User'
 
+# Test profile: cheap password hashing, slowest test report, `TEST_DB=sqlite` for an in-memory database
+TEST_RUNNER = 'app.test_runner.TimedTestRunner'
+if PROFILE == 'test':
+    PASSWORD_HASHERS = ['django.contrib.auth.hashers.MD5PasswordHasher']
+    if os.environ.get('TEST_DB') == 'sqlite':
+        DATABASES = {'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': ':memory:'}}
+
@@ -0,0 +1,52 @@
+import time
+import unittest
+
+from django.test.runner import DiscoverRunner
+
+
+class TimedTextTestResult(unittest.TextTestResult):
+    """Records how long every test took, setUpTestData is charged to the class"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.timings = []
+
+    def startTest(self, test):
+        self._started = time.perf_counter()
+        super().startTest(test)
+
+    def stopTest(self, test):
+        super().stopTest(test)
+        self.timings.append((time.perf_counter() - self._started, test.id()))
+
+
+class TimedTestRunner(DiscoverRunner):
+    """DiscoverRunner that ends with the slowest tests, `--slowest 0` turns the report off"""
+
+    def __init__(self, slowest=10, **kwargs):
+        super().__init__(**kwargs)
+        self.slowest = slowest
+
+    @classmethod
+    def add_arguments(cls, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--slowest', type=int, default=10,
+            help='Report the N slowest tests, skipped with --parallel as workers only send results back'
+        )
+
+    def get_resultclass(self):
+        return super().get_resultclass() or TimedTextTestResult
+
+    def run_suite(self, suite, **kwargs):
+        result = super().run_suite(suite, **kwargs)
+        if self.slowest and self.parallel <= 1 and hasattr(result, 'timings'):
+            self.report_slowest(result.stream, result.timings)
+        return result
+
+    def report_slowest(self, stream, timings):
+        """Written to the result stream, next to the rest of the runner output"""
+        timings = sorted(timings, reverse=True)[:self.slowest]
+        stream.writeln(f'\nSlowest {len(timings)} tests:')
+        for seconds, test_id in timings:
+            stream.writeln(f'{seconds:8.3f}s  {test_id}')
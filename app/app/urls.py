@@ -15,12 +15,16 @@ Including another URLconf
 """
 from django.contrib import admin
 from django.urls import path, include
-from django.conf.urls.static import static
 from django.conf import settings
 
+from core.views import media, healthz, readyz
+
 urlpatterns = [
+    path('healthz', healthz, name='healthz'),
+    path('readyz', readyz, name='readyz'),
     path('admin/', admin.site.urls),
     path('api/user/', include('user.urls')),
-    path('api/article/', include('article.urls'))
-] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
+    path('api/article/', include('article.urls')),
+    path(f'{settings.MEDIA_URL.strip("/")}/<path:path>', media, name='media'),
+]
  
@@ -0,0 +1,233 @@
+import json
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+
+from core.models import Comment
+
+
+CHANNEL_PREFIX = 'article-events:'
+SUBSCRIBER_BUFFER = 100
+HEARTBEAT_SECONDS = 15
+STREAM_MAX_SECONDS = 300
+RETRY_MS = 3000
+REPLAY_LIMIT = 100
+RECONNECT_SECONDS = 0.5
+RECONNECT_MAX_SECONDS = 30
+
+logger = logging.getLogger(__name__)
+
+
+def topic(article_id):
+    return f'article:{article_id}'
+
+
+class Broker:
+    """
+    In-process pub/sub, every open stream on this process gets its own
+    bounded queue. A stream that can not keep up loses events rather than
+    blocking the publisher, clients catch up through Last-Event-ID.
+    Publishing only reaches streams of the same process, settings refuse
+    to run without EVENTS_REDIS_URL outside DEBUG.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = {}
+
+    def subscribe(self, name):
+        subscriber = queue.Queue(maxsize=SUBSCRIBER_BUFFER)
+        with self._lock:
+            self._subscribers.setdefault(name, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, name, subscriber):
+        with self._lock:
+            subscribers = self._subscribers.get(name, set())
+            subscribers.discard(subscriber)
+            if not subscribers:
+                self._subscribers.pop(name, None)
+
+    def deliver(self, name, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(name, ()))
+        for subscriber in subscribers:
+            try:
+                subscriber.put_nowait(event)
+            except queue.Full:
+                pass
+
+    def publish(self, name, event):
+        self.deliver(name, event)
+
+
+class RedisBroker(Broker):
+    """
+    Publishes through a Redis channel so streams on every node see the
+    event. redis is only needed when EVENTS_REDIS_URL is set, any client
+    with the same methods can be passed in.
+    """
+
+    def __init__(self, client=None, url=None):
+        super().__init__()
+        self.url = url or settings.EVENTS_REDIS_URL
+        self._client = client
+        self._listener = None
+
+    @property
+    def client(self):
+        if self._client is None:
+            import redis
+            self._client = redis.Redis.from_url(self.url)
+        return self._client
+
+    def publish(self, name, event):
+        self.client.publish(CHANNEL_PREFIX + name, json.dumps(event, cls=DjangoJSONEncoder))
+
+    def subscribe(self, name):
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(
+                    target=self._listen, args=(self._connect(),), name='article-events', daemon=True
+                )
+                self._listener.start()
+        return super().subscribe(name)
+
+    def _connect(self):
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe(CHANNEL_PREFIX + '*')
+        return pubsub
+
+    def _listen(self, pubsub):
+        """
+        Deliver messages to the local streams, resubscribing with backoff when
+        the connection drops. Events published meanwhile are lost, comments
+        come back through Last-Event-ID when the client reconnects.
+        """
+        delay = RECONNECT_SECONDS
+        try:
+            while True:
+                try:
+                    if pubsub is None:
+                        pubsub = self._connect()
+                        delay = RECONNECT_SECONDS
+                    for message in pubsub.listen():
+                        self._deliver_message(message)
+                except Exception:
+                    logger.warning('Lost the Redis event subscription, retrying in %ss', delay, exc_info=True)
+                pubsub = None
+                time.sleep(delay)
+                delay = min(delay * 2, RECONNECT_MAX_SECONDS)
+        finally:
+            with self._lock:
+                self._listener = None
+
+    def _deliver_message(self, message):
+        if message['type'] != 'pmessage':
+            return
+        channel = message['channel']
+        if isinstance(channel, bytes):
+            channel = channel.decode()
+        self.deliver(channel[len(CHANNEL_PREFIX):], json.loads(message['data']))
+
+
+_broker = None
+
+
+def broker():
+    global _broker
+    if _broker is None:
+        _broker = RedisBroker() if settings.EVENTS_REDIS_URL else Broker()
+    return _broker
+
+
+def comment_event(comment):
+    return {
+        'id': comment.id,
+        'event': 'comment',
+        'data': {
+            'id': comment.id,
+            'article': comment.article_id,
+            'author': comment.author_id,
+            'body': comment.body,
+            'created_on': comment.created_on,
+        },
+    }
+
+
+def publish(name, event):
+    """
+    Runs from on_commit callbacks, where an exception would turn the already
+    committed write into a 500. A lost event is only logged, streams catch up
+    on comments through Last-Event-ID.
+    """
+    try:
+        broker().publish(name, event)
+    except Exception:
+        logger.exception('Could not publish %s event on %s', event['event'], name)
+
+
+def publish_comment(comment):
+    publish(topic(comment.article_id), comment_event(comment))
+
+
+def publish_like_counts(like_counts):
+    for article_id, like_count in like_counts:
+        publish(topic(article_id), {
+            'event': 'like_count',
+            'data': {'article': article_id, 'like_count': like_count},
+        })
+
+
+def format_event(event):
+    lines = []
+    if event.get('id') is not None:
+        lines.append(f'id: {event["id"]}')
+    lines.append(f'event: {event["event"]}')
+    lines.append(f'data: {json.dumps(event["data"], cls=DjangoJSONEncoder)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+def missed_comments(article_id, last_event_id):
+    """Comments created while the client was reconnecting"""
+    comments = Comment.objects.filter(article_id=article_id, id__gt=last_event_id).only(
+        'id', 'article', 'author', 'body', 'created_on'
+    ).order_by('id')[:REPLAY_LIMIT]
+    return [comment_event(comment) for comment in comments]
+
+
+def stream(article_id, last_event_id=None):
+    """
+    Server-sent events for one article. The stream ends after
+    STREAM_MAX_SECONDS so a worker is never held forever; EventSource
+    reconnects on its own and sends Last-Event-ID to pick up the gap.
+    """
+    name = topic(article_id)
+    subscriber = broker().subscribe(name)
+    try:
+        yield f'retry: {RETRY_MS}\n\n'
+        if last_event_id is not None:
+            for event in missed_comments(article_id, last_event_id):
+                yield format_event(event)
+        # nothing below reads the database, hand the connection back while the stream waits
+        if not connection.in_atomic_block:
+            connection.close()
+
+        deadline = time.monotonic() + STREAM_MAX_SECONDS
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                event = subscriber.get(timeout=min(HEARTBEAT_SECONDS, remaining))
+            except queue.Empty:
+                yield ': keep-alive\n\n'
+                continue
+            yield format_event(event)
+    finally:
+        broker().unsubscribe(name, subscriber)
@@ -0,0 +1,94 @@
+import csv
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+
+from core.models import Article, Comment
+
+
+CHUNK_SIZE = 2000
+
+ARTICLE_FIELDS = ('id', 'title', 'slug', 'description', 'owner', 'publish_date', 'image', 'categories', 'like_count')
+COMMENT_FIELDS = ('id', 'article', 'author', 'body', 'created_on')
+
+
+def article_records(chunk_size=CHUNK_SIZE):
+    """
+    Stream articles ordered by id, merging category ids from a second cursor
+    over the join table ordered the same way so no per-article query is needed.
+    """
+    categories = Article.categories.through.objects.order_by(
+        'article_id', 'category_id'
+    ).values_list('article_id', 'category_id').iterator(chunk_size=chunk_size)
+    pending = next(categories, None)
+
+    articles = Article.objects.order_by('id').values_list(
+        'id', 'title', 'slug', 'description', 'owner_id', 'publish_date', 'image', 'like_count'
+    ).iterator(chunk_size=chunk_size)
+    for pk, title, slug, description, owner, publish_date, image, like_count in articles:
+        category_ids = []
+        while pending is not None and pending[0] <= pk:
+            if pending[0] == pk:
+                category_ids.append(pending[1])
+            pending = next(categories, None)
+        yield {
+            'id': pk,
+            'title': title,
+            'slug': slug,
+            'description': description,
+            'owner': owner,
+            'publish_date': publish_date,
+            'image': image or None,
+            'categories': category_ids,
+            'like_count': like_count,
+        }
+
+
+def comment_records(chunk_size=CHUNK_SIZE):
+    comments = Comment.objects.order_by('id').values_list(
+        'id', 'article_id', 'author_id', 'body', 'created_on'
+    ).iterator(chunk_size=chunk_size)
+    for row in comments:
+        yield dict(zip(COMMENT_FIELDS, row))
+
+
+DATASETS = {
+    'articles': (article_records, ARTICLE_FIELDS),
+    'comments': (comment_records, COMMENT_FIELDS),
+}
+
+
+class Echo:
+    """File-like object handing each written line straight back to the caller"""
+
+    def write(self, value):
+        return value
+
+
+def render_ndjson(records, fields):
+    for record in records:
+        yield json.dumps(record, cls=DjangoJSONEncoder) + '\n'
+
+
+def render_csv(records, fields):
+    writer = csv.writer(Echo())
+    yield writer.writerow(fields)
+    for record in records:
+        yield writer.writerow([
+            ';'.join(str(item) for item in value) if isinstance(value, list) else value
+            for value in (record[field] for field in fields)
+        ])
+
+
+OUTPUTS = {
+    'ndjson': (render_ndjson, 'application/x-ndjson'),
+    'csv': (render_csv, 'text/csv'),
+}
+
+
+def export(dataset, output, chunk_size=CHUNK_SIZE):
+    """Return (lines, content type) for a dataset rendered in the given output format"""
+    records, fields = DATASETS[dataset]
+    render, content_type = OUTPUTS[output]
+
+    return render(records(chunk_size), fields), content_type
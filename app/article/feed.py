@@ -0,0 +1,112 @@
+from django.db.models import Count, Exists, OuterRef
+from django.utils import timezone
+
+from core.models import Article, Category, FeedEntry
+
+
+FEED_SIZE = 200
+FEED_TRIM_SLACK = 50
+FANOUT_MAX_FOLLOWS = 50
+FANOUT_BATCH_SIZE = 1000
+
+ArticleCategory = Article.categories.through
+CategoryFollower = Category.followers.through
+
+
+def count_follows(user):
+    """Store how many categories the user follows, fan-out skips heavy followers by this column"""
+    user.follow_count = user.followed_categories.count()
+    type(user).objects.filter(pk=user.pk).update(follow_count=user.follow_count)
+
+
+def is_heavy_follower(user):
+    """Users following too many categories to keep a precomputed timeline"""
+    return user.follow_count > FANOUT_MAX_FOLLOWS
+
+
+def merged_articles(user):
+    """Latest articles in the user's categories, read straight from the join table"""
+    in_followed_category = ArticleCategory.objects.filter(
+        article_id=OuterRef('pk'),
+        category_id__in=CategoryFollower.objects.filter(user_id=user.id).values('category_id')
+    )
+    return Article.objects.filter(
+        Exists(in_followed_category),
+        publish_date__lte=timezone.now()
+    )
+
+
+def fan_out(article, category_ids):
+    """Push an article into the timelines of everyone following its categories"""
+    follower_ids = CategoryFollower.objects.filter(
+        category_id__in=category_ids,
+        user__follow_count__lte=FANOUT_MAX_FOLLOWS
+    ).values_list('user_id', flat=True).distinct()
+
+    batch = []
+    for user_id in follower_ids.iterator():
+        batch.append(user_id)
+        if len(batch) == FANOUT_BATCH_SIZE:
+            _push(article, batch)
+            batch = []
+    _push(article, batch)
+
+
+def _push(article, user_ids):
+    if not user_ids:
+        return
+    FeedEntry.objects.bulk_create([
+        FeedEntry(user_id=user_id, article_id=article.id, publish_date=article.publish_date)
+        for user_id in user_ids
+    ], ignore_conflicts=True)
+    trim(user_ids)
+
+
+def withdraw(article):
+    """Drop an article from timelines of users no longer following any of its categories"""
+    FeedEntry.objects.filter(article_id=article.id).exclude(
+        user__followed_categories__in=ArticleCategory.objects.filter(
+            article_id=article.id
+        ).values('category_id')
+    ).delete()
+
+
+def trim(user_ids):
+    """Cap timelines at FEED_SIZE, only once they grew FEED_TRIM_SLACK entries past it"""
+    oversized = FeedEntry.objects.filter(user_id__in=user_ids).values('user_id').annotate(
+        entries=Count('id')
+    ).filter(entries__gt=FEED_SIZE + FEED_TRIM_SLACK).values_list('user_id', flat=True)
+    for user_id in oversized:
+        stale = FeedEntry.objects.filter(user_id=user_id).order_by(
+            '-publish_date', '-article_id'
+        ).values_list('id', flat=True)[FEED_SIZE:]
+        FeedEntry.objects.filter(id__in=list(stale)).delete()
+
+
+def rebuild(user):
+    """Recompute a user's timeline after they follow or unfollow a category"""
+    count_follows(user)
+    FeedEntry.objects.filter(user_id=user.id).delete()
+    if is_heavy_follower(user):
+        return
+    articles = merged_articles(user).order_by('-publish_date').values_list(
+        'id', 'publish_date'
+    )[:FEED_SIZE]
+    FeedEntry.objects.bulk_create([
+        FeedEntry(user_id=user.id, article_id=article_id, publish_date=publish_date)
+        for article_id, publish_date in articles
+    ])
+
+
+def refresh(article_ids):
+    """Bring timelines in line with articles written in bulk, which sends no signals"""
+    category_ids = {}
+    for article_id, category_id in ArticleCategory.objects.filter(
+        article_id__in=article_ids
+    ).values_list('article_id', 'category_id'):
+        category_ids.setdefault(article_id, set()).add(category_id)
+    for article in Article.objects.filter(pk__in=article_ids).only('id', 'publish_date'):
+        FeedEntry.objects.filter(article_id=article.id).update(publish_date=article.publish_date)
+        withdraw(article)
+        if article.id in category_ids:
+            fan_out(article, category_ids[article.id])
@@ -0,0 +1,238 @@
+"""
+Chunked NDJSON importer. Every line is one record, references between
+records use natural keys so nothing has to be kept in memory between chunks:
+
+    {"type": "user", "email": "...", "name": "...", "is_author": true, "password": "<hash>"}
+    {"type": "category", "slug": "...", "title": "...", "author": "<email>"}
+    {"type": "article", "slug": "...", "title": "...", "description": "...", "owner": "<email>",
+     "publish_date": "...", "categories": ["<slug>"], "likes": ["<email>"]}
+    {"type": "comment", "article": "<slug>", "author": "<email>", "body": "...", "created_on": "..."}
+
+Records must come after the records they reference. Importing the same
+records again changes nothing: users, categories and articles are matched on
+their natural key, comments on a hash of the record, plus its line number
+when it has no created_on to tell repeated comments apart.
+
+Bulk writes send no signals, so the article list cache is invalidated and
+the imported articles are pushed into feeds once the whole stream is in.
+"""
+import hashlib
+import json
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.models import Article, Category, Comment, ImportCheckpoint
+from article import feed
+from article import list_cache
+
+
+CHUNK_SIZE = 1000
+
+
+def parse_date(value):
+    if not value:
+        return timezone.now()
+    moment = parse_datetime(value)
+    if moment is None:
+        raise ValueError(f'Invalid date {value!r}')
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def lookup(model, key, values):
+    return dict(model._base_manager.filter(**{f'{key}__in': set(values)}).values_list(key, 'id'))
+
+
+def upsert(model, key, objects, fields):
+    """
+    Insert or update objects matched on a unique field, returns {key: pk}.
+    Equivalent of bulk_create(update_conflicts=True) for Django < 4.1.
+    """
+    objects = list({getattr(obj, key): obj for obj in objects}.values())
+    keys = [getattr(obj, key) for obj in objects]
+    existing = lookup(model, key, keys)
+    to_update = []
+    to_create = []
+    for obj in objects:
+        pk = existing.get(getattr(obj, key))
+        if pk:
+            obj.id = pk
+            to_update.append(obj)
+        else:
+            to_create.append(obj)
+    if fields:
+        model._base_manager.bulk_update(to_update, fields)
+    model.objects.bulk_create(to_create)
+    if to_create:
+        existing.update(lookup(model, key, [getattr(obj, key) for obj in to_create]))
+
+    return existing
+
+
+USER_FIELDS = ('name', 'is_author', 'password')
+
+
+def import_users(records, line_numbers):
+    """Existing users only get the fields present in their record, a missing password keeps theirs"""
+    user_model = get_user_model()
+    groups = {}
+    for record in records:
+        fields = tuple(field for field in USER_FIELDS if record.get(field) is not None)
+        groups.setdefault(fields, []).append(user_model(
+            email=user_model.objects.normalize_email(record['email']),
+            name=record.get('name') or '',
+            is_author=record.get('is_author') or False,
+            password=record.get('password') or make_password(None),
+        ))
+    for fields, users in groups.items():
+        upsert(user_model, 'email', users, list(fields))
+
+    return len(records), 0
+
+
+def import_categories(records, line_numbers):
+    authors = lookup(get_user_model(), 'email', [record['author'] for record in records])
+    categories = [
+        Category(slug=record['slug'], title=record['title'], author_id=authors[record['author']])
+        for record in records if record['author'] in authors
+    ]
+    upsert(Category, 'slug', categories, ['title', 'author'])
+
+    return len(categories), len(records) - len(categories)
+
+
+def import_articles(records, line_numbers):
+    emails = set()
+    slugs = set()
+    for record in records:
+        emails.add(record['owner'])
+        emails.update(record.get('likes', ()))
+        slugs.update(record.get('categories', ()))
+    users = lookup(get_user_model(), 'email', emails)
+    categories = lookup(Category, 'slug', slugs)
+
+    total = len(records)
+    records = [record for record in records if record['owner'] in users]
+    articles = [
+        Article(
+            slug=record['slug'],
+            title=record['title'],
+            description=record.get('description', ''),
+            owner_id=users[record['owner']],
+            publish_date=parse_date(record.get('publish_date')),
+        )
+        for record in records
+    ]
+    article_ids = upsert(
+        Article, 'slug', articles, ['title', 'description', 'owner', 'publish_date', 'deleted_on']
+    )
+
+    ArticleCategory = Article.categories.through
+    ArticleLike = Article.like.through
+    ArticleCategory.objects.filter(article_id__in=article_ids.values()).delete()
+    ArticleCategory.objects.bulk_create([
+        ArticleCategory(article_id=article_ids[record['slug']], category_id=categories[slug])
+        for record in records
+        for slug in record.get('categories', ()) if slug in categories
+    ], ignore_conflicts=True)
+    ArticleLike.objects.bulk_create([
+        ArticleLike(article_id=article_ids[record['slug']], user_id=users[email])
+        for record in records
+        for email in record.get('likes', ()) if email in users
+    ], ignore_conflicts=True)
+    Article.objects.filter(pk__in=article_ids.values()).refresh_counters()
+
+    return len(articles), total - len(articles)
+
+
+def comment_key(record, line):
+    """
+    Comments have no natural key, the record itself identifies them across
+    runs. Without created_on two identical comments only differ by their line.
+    """
+    if not record.get('created_on'):
+        record = dict(record, line=line)
+    return hashlib.sha1(json.dumps(record, sort_keys=True).encode()).hexdigest()
+
+
+def import_comments(records, line_numbers):
+    users = lookup(get_user_model(), 'email', [record['author'] for record in records])
+    articles = lookup(Article, 'slug', [record['article'] for record in records])
+    comments = [
+        Comment(
+            article_id=articles[record['article']],
+            author_id=users[record['author']],
+            body=record['body'],
+            created_on=parse_date(record.get('created_on')),
+            import_key=comment_key(record, line),
+        )
+        for record, line in zip(records, line_numbers)
+        if record['author'] in users and record['article'] in articles
+    ]
+    imported = Comment.objects.filter(import_key__in=[comment.import_key for comment in comments])
+    existing = imported.count()
+    Comment.objects.bulk_create(comments, ignore_conflicts=True)
+    created = imported.count() - existing
+    Article.objects.filter(pk__in={comment.article_id for comment in comments}).refresh_counters()
+
+    return created, len(records) - created
+
+
+IMPORTERS = {
+    'user': import_users,
+    'category': import_categories,
+    'article': import_articles,
+    'comment': import_comments,
+}
+
+
+def chunks(lines, start, chunk_size):
+    """Group consecutive records of the same type, yields (type, records, line numbers, last line number)"""
+    kind = None
+    batch = []
+    numbers = []
+    position = 0
+    for position, line in enumerate(lines, 1):
+        if position <= start or not line.strip():
+            continue
+        record = json.loads(line)
+        if batch and (record['type'] != kind or len(batch) == chunk_size):
+            yield kind, batch, numbers, position - 1
+            batch = []
+            numbers = []
+        kind = record['type']
+        batch.append(record)
+        numbers.append(position)
+    if batch:
+        yield kind, batch, numbers, position
+
+
+def run(lines, name, resume=False, chunk_size=CHUNK_SIZE):
+    """
+    Import records chunk by chunk. Each chunk commits together with the
+    checkpoint, so a resumed run starts right after the last committed chunk.
+    Yields (type, imported, skipped, line number) per chunk.
+    """
+    checkpoint, _ = ImportCheckpoint.objects.get_or_create(name=name)
+    if not resume:
+        checkpoint.position = 0
+
+    slugs = set()
+    for kind, records, numbers, position in chunks(lines, checkpoint.position, chunk_size):
+        if kind not in IMPORTERS:
+            raise ValueError(f'Unknown record type {kind!r} before line {position}')
+        with transaction.atomic():
+            imported, skipped = IMPORTERS[kind](records, numbers)
+            checkpoint.position = position
+            checkpoint.save(update_fields=['position', 'updated_on'])
+        if kind == 'article':
+            slugs.update(record['slug'] for record in records)
+        yield kind, imported, skipped, position
+
+    feed.refresh(Article.objects.filter(slug__in=slugs).values_list('id', flat=True))
+    list_cache.invalidate()
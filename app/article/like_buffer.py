@@ -0,0 +1,238 @@
+"""
+Write-behind likes for traffic spikes, enabled with LIKE_BUFFER.
+
+Likes are recorded as the latest intent per (article, user) and written
+to the like table and counters in batches by `flush`. The toggle, list and
+detail responses apply the caller's own pending intents on top of the
+stored likes, other users see a like once it is flushed. On a crash:
+
+* `local` keeps intents in process memory and flushes them from a
+  background thread every LIKE_BUFFER_FLUSH_SECONDS and at exit. A hard
+  crash loses the intents since the last flush. Use it on a single process
+  only.
+* `redis` keeps intents in Redis and is flushed by `flush_likes`. A crash
+  of a web process loses nothing. A flush that dies halfway leaves its
+  batch under the flushing keys, and the next flush applies it again.
+  Applying is idempotent, inserts ignore conflicts and counters are
+  recomputed from the table.
+"""
+import atexit
+import threading
+
+from django.conf import settings
+from django.db import connection, transaction
+
+from core.models import Article, NotificationOutbox
+from article import events
+from article import list_cache
+
+
+BATCH_SIZE = 500
+PENDING_KEY = 'likes:pending:{}'
+FLUSHING_KEY = 'likes:flushing:{}'
+DIRTY_KEY = 'likes:dirty'
+
+ArticleLike = Article.like.through
+
+
+class LocalLikeBuffer:
+
+    def __init__(self, interval=None):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._flushing = {}
+        self.interval = interval
+        self._timer = None
+
+    def record(self, article_id, user_id, liked):
+        with self._lock:
+            self._pending.setdefault(article_id, {})[user_id] = liked
+            if self.interval and self._timer is None:
+                self._timer = threading.Timer(self.interval, self._flush_later)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _flush_later(self):
+        with self._lock:
+            self._timer = None
+        try:
+            flush(self)
+        finally:
+            connection.close()
+
+    def pending(self, article_ids, user_id):
+        intents = {}
+        with self._lock:
+            for article_id in article_ids:
+                liked = self._pending.get(article_id, {}).get(user_id)
+                if liked is None:
+                    liked = self._flushing.get(article_id, {}).get(user_id)
+                if liked is not None:
+                    intents[article_id] = liked
+        return intents
+
+    def take(self, batch_size=BATCH_SIZE):
+        with self._lock:
+            if not self._flushing:
+                article_ids = list(self._pending)[:batch_size]
+                self._flushing = {article_id: self._pending.pop(article_id) for article_id in article_ids}
+            return dict(self._flushing)
+
+    def done(self, batch):
+        with self._lock:
+            self._flushing = {}
+
+
+class RedisLikeBuffer:
+    """
+    One hash of user intents per article plus a set of dirty articles.
+    A batch is claimed by renaming the article hashes to flushing keys,
+    likes recorded meanwhile start a fresh pending hash.
+    """
+
+    def __init__(self, client=None, url=None):
+        self.url = url or settings.LIKE_BUFFER_REDIS_URL
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            import redis
+            self._client = redis.Redis.from_url(self.url)
+        return self._client
+
+    def record(self, article_id, user_id, liked):
+        pipe = self.client.pipeline()
+        pipe.hset(PENDING_KEY.format(article_id), user_id, int(liked))
+        pipe.sadd(DIRTY_KEY, article_id)
+        pipe.execute()
+
+    def pending(self, article_ids, user_id):
+        pipe = self.client.pipeline()
+        for article_id in article_ids:
+            pipe.hget(PENDING_KEY.format(article_id), user_id)
+            pipe.hget(FLUSHING_KEY.format(article_id), user_id)
+        values = pipe.execute()
+        intents = {}
+        for i, article_id in enumerate(article_ids):
+            value = values[2 * i] if values[2 * i] is not None else values[2 * i + 1]
+            if value is not None:
+                intents[article_id] = value in (b'1', '1')
+        return intents
+
+    def take(self, batch_size=BATCH_SIZE):
+        keys = list(self.client.scan_iter(match=FLUSHING_KEY.format('*')))
+        if not keys:
+            for article_id in self.client.spop(DIRTY_KEY, batch_size) or []:
+                article_id = int(article_id)
+                if self.client.exists(PENDING_KEY.format(article_id)):
+                    self.client.rename(PENDING_KEY.format(article_id), FLUSHING_KEY.format(article_id))
+                    keys.append(FLUSHING_KEY.format(article_id))
+
+        batch = {}
+        for key in keys:
+            if isinstance(key, bytes):
+                key = key.decode()
+            batch[int(key.rsplit(':', 1)[1])] = {
+                int(user_id): value in (b'1', '1') for user_id, value in self.client.hgetall(key).items()
+            }
+        return batch
+
+    def done(self, batch):
+        if batch:
+            self.client.delete(*[FLUSHING_KEY.format(article_id) for article_id in batch])
+
+
+_buffer = None
+
+
+def enabled():
+    return bool(settings.LIKE_BUFFER)
+
+
+def buffer():
+    global _buffer
+    if _buffer is None:
+        if settings.LIKE_BUFFER == 'redis':
+            _buffer = RedisLikeBuffer()
+        else:
+            _buffer = LocalLikeBuffer(interval=settings.LIKE_BUFFER_FLUSH_SECONDS)
+            atexit.register(flush, _buffer)
+    return _buffer
+
+
+def record(article_id, user_id, liked):
+    buffer().record(article_id, user_id, liked)
+
+
+def merge_pending(articles, user_id):
+    """Apply the user's pending intents to serialized articles, in place"""
+    intents = buffer().pending([article['id'] for article in articles], user_id)
+    for article in articles:
+        liked = intents.get(article['id'])
+        if liked is None:
+            continue
+        stored = user_id in article['like']
+        article['like'] = [like_id for like_id in article['like'] if like_id != user_id]
+        if liked:
+            article['like'].append(user_id)
+        if 'like_count' in article:
+            article['like_count'] += liked - stored
+
+
+def apply(batch):
+    """Write one batch of intents, returns the number of articles touched"""
+    with transaction.atomic():
+        articles = Article.all_objects.filter(pk__in=batch)
+        owners = dict(articles.values_list('id', 'owner_id'))
+        intents = {
+            (article_id, user_id): liked
+            for article_id, users in batch.items() if article_id in owners
+            for user_id, liked in users.items()
+        }
+        if not intents:
+            return 0
+        existing = set(ArticleLike.objects.filter(
+            article_id__in=owners,
+            user_id__in={user_id for _, user_id in intents}
+        ).values_list('article_id', 'user_id'))
+        added = [pair for pair, liked in intents.items() if liked and pair not in existing]
+        removed = [pair for pair, liked in intents.items() if not liked and pair in existing]
+
+        ArticleLike.objects.bulk_create(
+            [ArticleLike(article_id=article_id, user_id=user_id) for article_id, user_id in added],
+            ignore_conflicts=True
+        )
+        for article_id, user_ids in _group(removed).items():
+            ArticleLike.objects.filter(article_id=article_id, user_id__in=user_ids).delete()
+        articles.refresh_counters()
+        NotificationOutbox.objects.bulk_create([
+            NotificationOutbox(recipient_id=owners[article_id], article_id=article_id, kind=NotificationOutbox.LIKE)
+            for article_id, user_id in added if owners[article_id] != user_id
+        ])
+
+        like_counts = list(articles.values_list('id', 'like_count'))
+        transaction.on_commit(list_cache.invalidate)
+        transaction.on_commit(lambda: events.publish_like_counts(like_counts))
+
+    return len(owners)
+
+
+def _group(pairs):
+    grouped = {}
+    for article_id, user_id in pairs:
+        grouped.setdefault(article_id, set()).add(user_id)
+    return grouped
+
+
+def flush(like_buffer=None, batch_size=BATCH_SIZE):
+    """Drain the buffer batch by batch, a batch is only dropped from the buffer once committed"""
+    like_buffer = like_buffer or buffer()
+    flushed = 0
+    while True:
+        batch = like_buffer.take(batch_size)
+        if not batch:
+            return flushed
+        apply(batch)
+        like_buffer.done(batch)
+        flushed += len(batch)
@@ -0,0 +1,57 @@
+from django.db import connection, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+from core.models import Article
+from article import events
+from article import list_cache
+
+
+ArticleLike = Article.like.through
+
+
+def _changed(article_id, delta):
+    """Move the counter in the same transaction as the through row and announce it after commit"""
+    like_count = Greatest(F('like_count') + delta, 0) if delta < 0 else F('like_count') + delta
+    Article.all_objects.filter(pk=article_id).update(like_count=like_count)
+    like_count = _like_count(article_id)
+    transaction.on_commit(list_cache.invalidate)
+    transaction.on_commit(lambda: events.publish_like_counts([(article_id, like_count)]))
+    return like_count
+
+
+def _like_count(article_id):
+    return Article.all_objects.filter(pk=article_id).values_list('like_count', flat=True).get()
+
+
+def add(article_id, user_id):
+    """
+    Idempotent like. The unique (article, user) constraint decides the race,
+    only the request whose row was inserted bumps the counter.
+    Returns whether the like is new and the article's like count.
+    """
+    table = ArticleLike._meta.db_table
+    quote = connection.ops.quote_name
+    with transaction.atomic(savepoint=False):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'INSERT INTO {quote(table)} ({quote("article_id")}, {quote("user_id")}) '
+                f'VALUES (%s, %s) ON CONFLICT DO NOTHING',
+                [article_id, user_id]
+            )
+            added = cursor.rowcount == 1
+        like_count = _changed(article_id, 1) if added else _like_count(article_id)
+
+    return added, like_count
+
+
+def remove(article_id, user_id):
+    """
+    Conditional delete, only the request that removed the row lowers the counter.
+    Returns whether a like was removed and the article's like count.
+    """
+    with transaction.atomic(savepoint=False):
+        removed = ArticleLike.objects.filter(article_id=article_id, user_id=user_id).delete()[0] == 1
+        like_count = _changed(article_id, -1) if removed else _like_count(article_id)
+
+    return removed, like_count
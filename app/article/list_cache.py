@@ -0,0 +1,50 @@
+import math
+
+from django.core.cache import cache
+from django.utils import timezone
+
+from core.models import Article
+
+
+LIST_CACHE_TTL = 300
+VERSION_KEY = 'article-list:version'
+
+
+def version():
+    return cache.get_or_set(VERSION_KEY, 1, timeout=None)
+
+
+def invalidate():
+    """Orphan every cached list, old entries expire on their own"""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 1, timeout=None)
+
+
+def key(request):
+    return f'article-list:{version()}:{request.get_full_path()}'
+
+
+def ttl(now=None):
+    """Seconds a list may be cached, ending exactly when the next scheduled article goes live"""
+    now = now or timezone.now()
+    next_publish = Article.objects.filter(
+        publish_date__gt=now
+    ).order_by('publish_date').values_list('publish_date', flat=True).first()
+    if next_publish is None:
+        return LIST_CACHE_TTL
+
+    return min(LIST_CACHE_TTL, math.ceil((next_publish - now).total_seconds()))
+
+
+def get(list_key):
+    return cache.get(list_key)
+
+
+def store(list_key, data):
+    """
+    Takes the key computed before the list was queried: a write committed
+    meanwhile bumps the version, so the stale page lands under the old one.
+    """
+    cache.set(list_key, data, timeout=ttl())
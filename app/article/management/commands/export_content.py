@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from article import export
+
+
+class Command(BaseCommand):
+    help = 'Stream articles or comments as NDJSON or CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=sorted(export.DATASETS))
+        parser.add_argument('--output', choices=sorted(export.OUTPUTS), default='ndjson')
+        parser.add_argument('--file', help='Write to this path instead of stdout')
+        parser.add_argument('--chunk-size', type=int, default=export.CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        lines, _ = export.export(options['dataset'], options['output'], options['chunk_size'])
+        if options['file']:
+            with open(options['file'], 'w', newline='') as out:
+                out.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
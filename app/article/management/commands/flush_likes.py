@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from article import like_buffer
+
+
+class Command(BaseCommand):
+    help = 'Write buffered likes to the like table and counters'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=like_buffer.BATCH_SIZE, help='Articles per batch')
+        parser.add_argument(
+            '--interval', type=float, default=0,
+            help='Keep running and flush every N seconds'
+        )
+
+    def handle(self, *args, **options):
+        if not like_buffer.enabled():
+            raise CommandError('LIKE_BUFFER is not set, likes are written directly')
+        while True:
+            flushed = like_buffer.flush(batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'Flushed likes for {flushed} articles'))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,138 @@
+import random
+import itertools
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.models import Article, Category, Comment
+
+
+BATCH_SIZE = 2000
+
+
+def zipf_weights(count, exponent):
+    """Cumulative weights where item n is picked ~ 1 / n**exponent times"""
+    return list(itertools.accumulate(1 / (rank ** exponent) for rank in range(1, count + 1)))
+
+
+class Command(BaseCommand):
+    help = 'Generate synthetic users, categories, articles, likes and comments'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--authors', type=int, default=50)
+        parser.add_argument('--categories', type=int, default=30)
+        parser.add_argument('--articles', type=int, default=5000)
+        parser.add_argument('--likes', type=int, default=50000, help='Total likes, skewed towards popular articles')
+        parser.add_argument('--comments', type=int, default=20000)
+        parser.add_argument('--days', type=int, default=90, help='Spread publish dates over this many days')
+        parser.add_argument('--skew', type=float, default=1.1, help='Zipf exponent for popularity')
+        parser.add_argument('--prefix', default='synthetic', help='Prefix for generated emails and slugs')
+        parser.add_argument('--seed', type=int)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.prefix = options['prefix']
+        self.skew = options['skew']
+        self.now = timezone.now()
+
+        users = self.create_users('user', options['users'], is_author=False)
+        authors = self.create_users('author', options['authors'], is_author=True)
+        categories = self.create_categories(options['categories'], authors)
+        articles = self.create_articles(options['articles'], options['days'], authors, categories)
+        readers = users + authors
+        self.create_likes(options['likes'], articles, readers)
+        self.create_comments(options['comments'], articles, readers)
+        Article.objects.filter(slug__startswith=f'{self.prefix}-article').refresh_counters()
+
+        self.stdout.write(self.style.SUCCESS('Synthetic data generated'))
+
+    def bulk_create(self, model, objects):
+        created = 0
+        for batch in iter(lambda: list(itertools.islice(objects, BATCH_SIZE)), []):
+            model.objects.bulk_create(batch, ignore_conflicts=True)
+            created += len(batch)
+        self.stdout.write(f'{model.__name__}: {created}')
+
+    def create_users(self, kind, count, is_author):
+        """Every user shares one password hash, hashing per user dominates otherwise"""
+        password = make_password('synthetic-password')
+        user_model = get_user_model()
+        pattern = f'{self.prefix}-{kind}'
+        self.bulk_create(user_model, (
+            user_model(
+                email=f'{pattern}{i}@example.com',
+                name=f'{kind.title()} {i}',
+                is_author=is_author,
+                password=password,
+            )
+            for i in range(count)
+        ))
+        return list(
+            user_model.objects.filter(email__startswith=pattern).order_by('id').values_list('id', flat=True)
+        )
+
+    def create_categories(self, count, authors):
+        slug = f'{self.prefix}-category'
+        self.bulk_create(Category, (
+            Category(title=f'{slug} {i}', slug=f'{slug}-{i}', author_id=self.rng.choice(authors))
+            for i in range(count)
+        ))
+        return list(Category.objects.filter(slug__startswith=slug).order_by('id').values_list('id', flat=True))
+
+    def create_articles(self, count, days, authors, categories):
+        slug = f'{self.prefix}-article'
+        author_weights = zipf_weights(len(authors), self.skew)
+        self.bulk_create(Article, (
+            Article(
+                title=f'Synthetic article {i}',
+                description='Lorem ipsum dolor sit amet. ' * self.rng.randint(5, 60),
+                slug=f'{slug}-{i}',
+                owner_id=self.rng.choices(authors, cum_weights=author_weights)[0],
+                publish_date=self.now - timedelta(seconds=self.rng.uniform(0, days * 86400)),
+            )
+            for i in range(count)
+        ))
+        articles = list(Article.objects.filter(slug__startswith=slug).order_by('id').values_list('id', flat=True))
+
+        category_weights = zipf_weights(len(categories), self.skew)
+        ArticleCategory = Article.categories.through
+        self.bulk_create(ArticleCategory, (
+            ArticleCategory(article_id=article_id, category_id=category_id)
+            for article_id in articles
+            for category_id in set(self.rng.choices(
+                categories, cum_weights=category_weights, k=self.rng.randint(1, 3)
+            ))
+        ))
+        return articles
+
+    def popular_articles(self, articles, count):
+        """Shuffled so popularity is not tied to insertion order"""
+        ranked = articles[:]
+        self.rng.shuffle(ranked)
+        weights = zipf_weights(len(ranked), self.skew)
+        while count > 0:
+            size = min(count, BATCH_SIZE)
+            yield from self.rng.choices(ranked, cum_weights=weights, k=size)
+            count -= size
+
+    def create_likes(self, count, articles, users):
+        ArticleLike = Article.like.through
+        self.bulk_create(ArticleLike, (
+            ArticleLike(article_id=article_id, user_id=self.rng.choice(users))
+            for article_id in self.popular_articles(articles, count)
+        ))
+
+    def create_comments(self, count, articles, users):
+        self.bulk_create(Comment, (
+            Comment(
+                article_id=article_id,
+                author_id=self.rng.choice(users),
+                body='Synthetic comment ' * self.rng.randint(1, 20),
+                created_on=self.now - timedelta(seconds=self.rng.uniform(0, 7 * 86400)),
+            )
+            for article_id in self.popular_articles(articles, count)
+        ))
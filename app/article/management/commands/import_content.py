@@ -0,0 +1,38 @@
+import os
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from article import importer
+
+
+class Command(BaseCommand):
+    help = 'Upsert users, categories, articles and comments from an NDJSON stream'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='NDJSON file, or - for stdin')
+        parser.add_argument('--resume', action='store_true', help='Continue after the last committed chunk')
+        parser.add_argument('--name', help='Checkpoint name, defaults to the file name')
+        parser.add_argument('--chunk-size', type=int, default=importer.CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        name = options['name'] or ('stdin' if path == '-' else os.path.basename(path))
+        source = sys.stdin if path == '-' else open(path)
+        started = time.monotonic()
+        total = 0
+        try:
+            with source:
+                for kind, imported, skipped, position in importer.run(
+                    source, name, options['resume'], options['chunk_size']
+                ):
+                    total += imported
+                    rate = total / max(time.monotonic() - started, 1e-6)
+                    self.stdout.write(
+                        f'{kind}: {imported} imported, {skipped} skipped (line {position}, {rate:.0f} rows/s)'
+                    )
+        except (ValueError, KeyError) as exc:
+            raise CommandError(f'Import stopped: {exc!r}')
+
+        self.stdout.write(self.style.SUCCESS(f'Imported {total} records'))
@@ -0,0 +1,130 @@
+import json
+import math
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from rest_framework.authtoken.models import Token
+
+from core.models import Article, Category
+
+
+SAMPLE_SIZE = 500
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not samples:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(samples)), 1)
+    return samples[rank - 1]
+
+
+class Scenario:
+
+    def __init__(self, name, method, path, body=None, auth=False):
+        self.name = name
+        self.method = method
+        self.path = path
+        self.body = body
+        self.auth = auth
+
+
+class Command(BaseCommand):
+    help = 'Replay list, filter, detail, like and comment traffic against a running server'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://localhost:8000')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per scenario')
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument('--user', help='Email of the user used for like and comment scenarios')
+        parser.add_argument('--scenario', action='append', help='Only run the named scenarios')
+        parser.add_argument('--timeout', type=float, default=10)
+        parser.add_argument('--seed', type=int)
+
+    def handle(self, *args, **options):
+        self.rng = random.Random(options['seed'])
+        self.base_url = options['base_url'].rstrip('/')
+        self.timeout = options['timeout']
+        self.token = self.get_token(options['user'])
+
+        self.article_ids = list(Article.objects.order_by('-id').values_list('id', flat=True)[:SAMPLE_SIZE])
+        self.category_ids = list(Category.objects.order_by('-id').values_list('id', flat=True)[:SAMPLE_SIZE])
+        if not self.article_ids or not self.category_ids:
+            raise CommandError('No articles or categories to hit, run generate_content first')
+
+        scenarios = [
+            scenario for scenario in self.scenarios()
+            if (not options['scenario'] or scenario.name in options['scenario'])
+            and (self.token or not scenario.auth)
+        ]
+        self.stdout.write(
+            f'{"scenario":<12}{"requests":>10}{"errors":>8}{"req/s":>10}{"p50 ms":>10}{"p95 ms":>10}{"p99 ms":>10}'
+        )
+        for scenario in scenarios:
+            self.report(scenario, *self.run(scenario, options['requests'], options['concurrency']))
+
+    def get_token(self, email):
+        if not email:
+            return None
+        user = get_user_model().objects.filter(email=email).first()
+        if user is None:
+            raise CommandError(f'No user with email {email}')
+        return Token.objects.get_or_create(user=user)[0].key
+
+    def scenarios(self):
+        article = lambda: self.rng.choice(self.article_ids)
+        categories = lambda: ','.join(
+            str(pk) for pk in self.rng.sample(self.category_ids, min(2, len(self.category_ids)))
+        )
+        return [
+            Scenario('list', 'GET', lambda: '/api/article/articles/'),
+            Scenario('filter', 'GET', lambda: f'/api/article/articles/?categories={categories()}'),
+            Scenario('detail', 'GET', lambda: f'/api/article/articles/{article()}/'),
+            Scenario(
+                'like', 'PATCH', lambda: f'/api/article/articles/{article()}/add-like/',
+                body=lambda: {}, auth=True
+            ),
+            Scenario(
+                'comment', 'POST', lambda: '/api/article/comments/',
+                body=lambda: {'article': article(), 'body': 'Load test comment'}, auth=True
+            ),
+        ]
+
+    def request(self, scenario):
+        headers = {'Content-Type': 'application/json'}
+        if scenario.auth:
+            headers['Authorization'] = f'Token {self.token}'
+        data = json.dumps(scenario.body()).encode() if scenario.body else None
+        req = Request(self.base_url + scenario.path(), data=data, headers=headers, method=scenario.method)
+        started = time.perf_counter()
+        try:
+            with urlopen(req, timeout=self.timeout) as res:
+                res.read()
+                ok = res.status < 400
+        except HTTPError as exc:
+            ok = exc.code < 400
+        except (URLError, OSError):
+            ok = False
+        return time.perf_counter() - started, ok
+
+    def run(self, scenario, requests, concurrency):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            results = list(pool.map(lambda _: self.request(scenario), range(requests)))
+        elapsed = time.perf_counter() - started
+        latencies = sorted(latency for latency, _ in results)
+        errors = sum(1 for _, ok in results if not ok)
+        return latencies, errors, elapsed
+
+    def report(self, scenario, latencies, errors, elapsed):
+        ms = [latency * 1000 for latency in latencies]
+        self.stdout.write(
+            f'{scenario.name:<12}{len(latencies):>10}{errors:>8}{len(latencies) / elapsed:>10.1f}'
+            f'{percentile(ms, 50):>10.1f}{percentile(ms, 95):>10.1f}{percentile(ms, 99):>10.1f}'
+        )
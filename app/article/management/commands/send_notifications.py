@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from article import notifications
+
+
+class Command(BaseCommand):
+    help = 'Drain the notification outbox into per-article digests'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=notifications.BATCH_SIZE)
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help='Keep running and poll the outbox every N seconds'
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            drained = 0
+            while True:
+                count = notifications.drain(options['batch_size'])
+                drained += count
+                if count < options['batch_size']:
+                    break
+            self.stdout.write(self.style.SUCCESS(f'Sent digests for {drained} events'))
+            if not options['interval']:
+                break
+            time.sleep(options['interval'])
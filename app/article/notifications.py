@@ -0,0 +1,37 @@
+from collections import Counter
+
+from django.db import transaction
+
+from core.models import Notification, NotificationOutbox
+
+
+BATCH_SIZE = 1000
+
+
+def enqueue(article, actor, kind):
+    """The only write added to the request path, skipped when authors act on their own articles"""
+    if article.owner_id == actor.id:
+        return
+    NotificationOutbox.objects.create(recipient_id=article.owner_id, article_id=article.id, kind=kind)
+
+
+def drain(batch_size=BATCH_SIZE):
+    """
+    Turn one batch of outbox rows into digests and delete them in the same
+    transaction. Locked rows are skipped so several workers can run at once.
+    Returns the number of outbox rows consumed.
+    """
+    with transaction.atomic():
+        events = list(NotificationOutbox.objects.select_for_update(skip_locked=True).order_by('id').values_list(
+            'id', 'recipient_id', 'article_id', 'kind'
+        )[:batch_size])
+        if not events:
+            return 0
+        digests = Counter((recipient_id, article_id, kind) for _, recipient_id, article_id, kind in events)
+        Notification.objects.bulk_create([
+            Notification(recipient_id=recipient_id, article_id=article_id, kind=kind, count=count)
+            for (recipient_id, article_id, kind), count in digests.items()
+        ])
+        NotificationOutbox.objects.filter(id__in=[event[0] for event in events]).delete()
+
+    return len(events)
@@ -11,5 +11,6 @@ class AuthorAccessPermission(permissions.BasePermission):
             return True
 
     def has_object_permission(self, request, view, obj):
-        if obj.owner == request.user or request.user.is_superuser:
+        # compare keys, `obj.owner` would load the owner's row for every check
+        if obj.owner_id == request.user.id or request.user.is_superuser:
             return True
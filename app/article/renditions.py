@@ -0,0 +1,150 @@
+import fcntl
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+
+
+ALLOWED_WIDTHS = (64, 128, 256, 512, 768, 1024, 1600, 2048)
+FORMATS = {
+    'jpeg': ('JPEG', 'image/jpeg'),
+    'webp': ('WEBP', 'image/webp'),
+    'png': ('PNG', 'image/png'),
+}
+DEFAULT_QUALITY = 80
+RENDER_WORKERS = 4
+EVICT_TO = 0.9
+OPEN_ATTEMPTS = 3
+LOCK_SUFFIX = '.lock'
+EVICT_LOCK = '.evict.lock'
+
+_pool = ThreadPoolExecutor(max_workers=RENDER_WORKERS, thread_name_prefix='rendition')
+_lock = threading.Lock()
+_in_flight = {}
+
+
+def cache_dir():
+    return settings.RENDITION_CACHE_DIR
+
+
+def version(image_name):
+    """Stored image names are the SHA-256 of their bytes, see core/storage.py"""
+    return os.path.splitext(os.path.basename(image_name))[0]
+
+
+def rendition_path(image_name, width, output, quality):
+    stem = version(image_name)
+    return os.path.join(cache_dir(), stem[:2], f'{stem}-{width}-{quality}.{output}')
+
+
+def render(image_name, path, width, output, quality):
+    """
+    Runs in the pool. Workers of every process lock `<path>.lock` and check
+    again once they hold it, so a rendition another process just finished is
+    reused instead of rendered twice. The file is moved into place atomically.
+    """
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path + LOCK_SUFFIX, 'a') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        if os.path.exists(path):
+            return path
+        pil_format = FORMATS[output][0]
+        with default_storage.open(image_name, 'rb') as source, Image.open(source) as img:
+            img.draft('RGB', (width, width * 10))
+            img.thumbnail((width, img.height), Image.LANCZOS)
+            if pil_format == 'JPEG' and img.mode not in ('RGB', 'L'):
+                img = img.convert('RGB')
+            partial = f'{path}.{os.getpid()}.{threading.get_ident()}.part'
+            with open(partial, 'wb') as out:
+                img.save(out, format=pil_format, quality=quality)
+        os.replace(partial, path)
+    evict()
+    return path
+
+
+def get(image_name, width, output='jpeg', quality=DEFAULT_QUALITY):
+    """
+    Path of the rendition, rendered on a miss. Concurrent misses for the
+    same rendition share one render instead of each burning a worker.
+    """
+    path = rendition_path(image_name, width, output, quality)
+    try:
+        os.utime(path)
+        return path
+    except FileNotFoundError:
+        pass
+
+    with _lock:
+        future = _in_flight.get(path)
+        if future is None:
+            future = _pool.submit(render, image_name, path, width, output, quality)
+            _in_flight[path] = future
+            future.add_done_callback(lambda _: _forget(path))
+
+    return future.result()
+
+
+def open_rendition(image_name, width, output='jpeg', quality=DEFAULT_QUALITY):
+    """
+    Open file of the rendition. Eviction may delete it between `get` and the
+    open, it is rendered again then; once open the bytes stay readable.
+    """
+    for _ in range(OPEN_ATTEMPTS):
+        path = get(image_name, width, output, quality)
+        try:
+            return open(path, 'rb')
+        except FileNotFoundError:
+            continue
+    raise FileNotFoundError(path)
+
+
+def _forget(path):
+    with _lock:
+        _in_flight.pop(path, None)
+
+
+def _scan():
+    files = []
+    for root, _, names in os.walk(cache_dir()):
+        for name in names:
+            if name.endswith(('.part', LOCK_SUFFIX)):
+                continue
+            full = os.path.join(root, name)
+            try:
+                stat = os.stat(full)
+            except FileNotFoundError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, full))
+    return files
+
+
+def evict():
+    """
+    Delete least recently used renditions once the directory is past the
+    limit. Sizes are read from disk, so renditions written by every process
+    count, and one process evicts at a time while the others skip.
+    """
+    with open(os.path.join(cache_dir(), EVICT_LOCK), 'a') as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return
+        files = sorted(_scan())
+        cache_bytes = sum(size for _, size, _ in files)
+        if cache_bytes <= settings.RENDITION_CACHE_MAX_BYTES:
+            return
+        target = settings.RENDITION_CACHE_MAX_BYTES * EVICT_TO
+        for _, size, full in files:
+            if cache_bytes <= target:
+                break
+            # a render waiting on the old lock file may repeat the work, never corrupt it
+            for evicted in (full, full + LOCK_SUFFIX):
+                try:
+                    os.remove(evicted)
+                except FileNotFoundError:
+                    pass
+            cache_bytes -= size
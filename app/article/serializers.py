@@ -1,6 +1,7 @@
 from rest_framework import serializers
+from rest_framework.validators import UniqueValidator
 
-from core.models import Category, Article, Comment
+from core.models import Category, Article, Comment, ImageUpload
 from user.serializers import UserSerializer
 
 
@@ -21,27 +22,30 @@ class AbbreviateCommentSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'author')
 
 
-class ArticleAddLikeSerializer(serializers.ModelSerializer):
+class ArticleSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Article
-        fields = ('id', 'like')
-        read_only_fields = ('id',)
-
-    def save(self):
-        user = self.validated_data.get('like')[0]
-        if self.context.get('request').method == 'DELETE':
-            like = self.instance.like.remove(user)
-            return like
-        like = self.instance.like.add(user)
-
-
-class ArticleSerializer(serializers.ModelSerializer):
+        fields = (
+            'id', 'title', 'description', 'slug', 'owner', 'categories', 'publish_date', 'like',
+            'like_count', 'comment_count'
+        )
+        read_only_fields = ('id', 'owner', 'like_count', 'comment_count')
+        # the slug stays taken by soft deleted articles until they are purged
+        extra_kwargs = {
+            'slug': {'validators': [UniqueValidator(
+                queryset=Article.all_objects.all(), message='article with this slug already exists.'
+            )]},
+        }
+
+
+class TrendingArticleSerializer(serializers.ModelSerializer):
+    score = serializers.FloatField(source='trending.score', read_only=True)
 
     class Meta:
         model = Article
-        fields = ('id', 'title', 'description', 'slug', 'owner', 'categories', 'publish_date', 'like')
-        read_only_fields = ('id', 'owner')
+        fields = ('id', 'title', 'slug', 'owner', 'publish_date', 'score')
+        read_only_fields = fields
 
 
 class ArticleDetailSerializer(serializers.ModelSerializer):
@@ -62,6 +66,18 @@ class CommentSerializer(serializers.ModelSerializer):
         read_only_fields = ('id', 'author')
 
 
+class ArticleSummarySerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = Article
+        fields = ('id', 'title', 'slug', 'publish_date')
+        read_only_fields = fields
+
+
+class CommentWithArticleSerializer(CommentSerializer):
+    article = ArticleSummarySerializer(read_only=True)
+
+
 class CommentDetailSerializer(CommentSerializer):
     article = ArticleDetailSerializer(read_only=True)
     author = UserSerializer(read_only=True)
@@ -73,3 +89,12 @@ class ArticleImageSerializer(serializers.ModelSerializer):
         model = Article
         fields = ('id', 'image')
         read_only_fields = ('id',)
+
+
+class ImageUploadSerializer(serializers.ModelSerializer):
+    sha256 = serializers.RegexField(r'^[0-9a-f]{64}$')
+
+    class Meta:
+        model = ImageUpload
+        fields = ('id', 'filename', 'size', 'sha256', 'received', 'completed')
+        read_only_fields = ('id', 'received', 'completed')
@@ -0,0 +1,85 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.db.models.signals import m2m_changed, post_save, post_delete, pre_save
+from django.dispatch import receiver
+
+from core.models import Article, Comment, FeedEntry
+from article import feed
+from article import list_cache
+from article import events
+
+
+@receiver(m2m_changed, sender=Article.categories.through)
+def update_feeds_on_categories_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        return
+    if action == 'post_add' and pk_set:
+        feed.fan_out(instance, pk_set)
+    elif action in ('post_remove', 'post_clear'):
+        feed.withdraw(instance)
+
+
+@receiver(post_save, sender=Article)
+def update_feed_publish_date(sender, instance, created, **kwargs):
+    if not created:
+        FeedEntry.objects.filter(article_id=instance.id).update(publish_date=instance.publish_date)
+
+
+@receiver(post_save, sender=Article)
+@receiver(post_delete, sender=Article)
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+@receiver(m2m_changed, sender=Article.categories.through)
+@receiver(m2m_changed, sender=Article.like.through)
+def invalidate_article_lists(sender, action=None, **kwargs):
+    if action is None or action.startswith('post_'):
+        transaction.on_commit(list_cache.invalidate)
+
+
+@receiver(m2m_changed, sender=Article.like.through)
+def update_like_count(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        article_ids = [instance.pk]
+    elif action == 'pre_clear':
+        instance._cleared_like_ids = list(instance.likes.values_list('id', flat=True))
+        return
+    elif action == 'post_clear':
+        article_ids = getattr(instance, '_cleared_like_ids', [])
+    else:
+        article_ids = pk_set
+    if action in ('post_add', 'post_remove', 'post_clear') and article_ids:
+        articles = Article.objects.filter(pk__in=article_ids)
+        articles.refresh_counters()
+        like_counts = list(articles.values_list('id', 'like_count'))
+        transaction.on_commit(lambda: events.publish_like_counts(like_counts))
+
+
+@receiver(pre_save, sender=Comment)
+def remember_comment_article(sender, instance, **kwargs):
+    if instance.pk:
+        instance._previous_article_id = Comment.objects.filter(
+            pk=instance.pk
+        ).values_list('article_id', flat=True).first()
+
+
+@receiver(post_save, sender=Comment)
+def update_comment_count(sender, instance, created, **kwargs):
+    previous = getattr(instance, '_previous_article_id', None)
+    if created or (previous and previous != instance.article_id):
+        Article.objects.filter(pk=instance.article_id).update(comment_count=F('comment_count') + 1)
+    if not created and previous and previous != instance.article_id:
+        Article.objects.filter(pk=previous).update(comment_count=Greatest(F('comment_count') - 1, 0))
+
+
+@receiver(post_save, sender=Comment)
+def publish_new_comment(sender, instance, created, **kwargs):
+    if created:
+        transaction.on_commit(lambda: events.publish_comment(instance))
+
+
+@receiver(post_delete, sender=Comment)
+def decrease_comment_count(sender, instance, **kwargs):
+    if instance.deleted_on:
+        return
+    Article.objects.filter(pk=instance.article_id).update(comment_count=Greatest(F('comment_count') - 1, 0))
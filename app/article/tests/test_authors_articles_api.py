@@ -30,16 +30,19 @@ def detail_url(pk):
 
 class PrivateAuthorArticleApiTests(TestCase):
 
-    def setUp(self):
-        self.client = APIClient()
-        self.another_author_user = get_user_model().objects.create_author_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.another_author_user = get_user_model().objects.create_author_user(
             'othermail@gmail.com',
             'testotherpassword'
         )
-        self.author_user = get_user_model().objects.create_author_user(
+        cls.author_user = get_user_model().objects.create_author_user(
             'authormail@gmail.com',
             'testpassword'
         )
+
+    def setUp(self):
+        self.client = APIClient()
         self.client.force_authenticate(self.author_user)
 
     def test_retreive_articles(self):
@@ -182,21 +185,24 @@ class PrivateAuthorArticleApiTests(TestCase):
 
 class ArticleImageUploadTests(TestCase):
 
-    def setUp(self):
-        self.client = APIClient()
-        self.author_user = get_user_model().objects.create_author_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.author_user = get_user_model().objects.create_author_user(
             'authormail@gmail.com',
             'testpassauthor'
         )
-        self.client.force_authenticate(self.author_user)
-        cate1 = Category.objects.create(title='sport', slug='sport', author=self.author_user)
-        self.article = Article.objects.create(
+        cate1 = Category.objects.create(title='sport', slug='sport', author=cls.author_user)
+        cls.article = Article.objects.create(
             title = 'A test article',
             description = 'Test description for above article',
             slug = 'SestSlug',
-            owner=self.author_user
+            owner=cls.author_user
         )
-        self.article.categories.set((cate1.id,))
+        cls.article.categories.set((cate1.id,))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.author_user)
 
     def test_upload_image_to_article(self):
         url = image_upload_url(self.article.id)
@@ -220,21 +226,24 @@ class ArticleImageUploadTests(TestCase):
 
 class ArticleLikeAPITests(TestCase):
 
-    def setUp(self):
-        self.client = APIClient()
-        self.author_user = get_user_model().objects.create_author_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.author_user = get_user_model().objects.create_author_user(
             'authormail@gmail.com',
             'testpassauthor'
         )
-        self.client.force_authenticate(self.author_user)
-        cate1 = Category.objects.create(title='sport', slug='sport', author=self.author_user)
-        self.article = Article.objects.create(
+        cate1 = Category.objects.create(title='sport', slug='sport', author=cls.author_user)
+        cls.article = Article.objects.create(
             title = 'A test article',
             description = 'Test description for above article',
             slug = 'SestSlug',
-            owner=self.author_user
+            owner=cls.author_user
         )
-        self.article.categories.set((cate1.id,))
+        cls.article.categories.set((cate1.id,))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.author_user)
 
     def test_liking_article_successful(self):
         normal_user = get_user_model().objects.create_user(
@@ -250,8 +259,7 @@ class ArticleLikeAPITests(TestCase):
         self.article.refresh_from_db()
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertIn('like', res.data)
-        self.assertEqual(len(res.data['like']), 2)
+        self.assertEqual(res.data, {'id': self.article.id, 'liked': True, 'like_count': 2})
         self.assertIn(self.author_user, self.article.like.all())
 
     def test_unlike_article_successful(self):
@@ -263,5 +271,114 @@ class ArticleLikeAPITests(TestCase):
         res = self.client.delete(url, payload)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
-        self.assertIn('like', res.data)
-        self.assertNotIn(self.author_user.id, res.data['like'])
\ No newline at end of file
+        self.assertEqual(res.data, {'id': self.article.id, 'liked': False, 'like_count': 0})
+        self.assertFalse(self.article.like.exists())
+
+class ArticleSoftDeleteTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author_user = get_user_model().objects.create_author_user(
+            'authormail@gmail.com',
+            'testpassauthor'
+        )
+        cls.article = Article.objects.create(
+            title = 'A test article',
+            description = 'Test description for above article',
+            slug = 'SestSlug',
+            owner=cls.author_user
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.author_user)
+
+    def test_delete_article_is_soft(self):
+        res = self.client.delete(detail_url(self.article.id))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertFalse(Article.objects.filter(id=self.article.id).exists())
+        self.assertIsNotNone(Article.all_objects.get(id=self.article.id).deleted_on)
+        self.assertEqual(self.client.get(detail_url(self.article.id)).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_slug_of_soft_deleted_article_rejected(self):
+        self.article.soft_delete()
+        payload = {'title': 'Again', 'description': 'same slug', 'slug': self.article.slug}
+
+        res = self.client.post(ARTICLE_URL, payload)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('slug', res.data)
+
+    def test_delete_comment_is_soft(self):
+        comment = Comment.objects.create(article=self.article, author=self.author_user, body='Good')
+
+        res = self.client.delete(reverse('article:comment-detail', args=[comment.id]))
+        self.article.refresh_from_db()
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertTrue(Comment.all_objects.filter(id=comment.id).exists())
+        self.assertEqual(self.article.comments.count(), 0)
+        self.assertEqual(self.article.comment_count, 0)
+
+
+class ArticleWriteQueryCountTests(TestCase):
+    """Permission checks compare owner ids and write actions load only the columns they need"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author_user = get_user_model().objects.create_author_user(
+            'authormail@gmail.com',
+            'testpassauthor'
+        )
+        cls.article = Article.objects.create(
+            title = 'A test article',
+            description = 'Test description for above article',
+            slug = 'SestSlug',
+            owner=cls.author_user
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.author_user)
+
+    def test_update_queries(self):
+        # fetch, update, feed dates, categories and likes for the response
+        with self.assertNumQueries(5):
+            res = self.client.patch(detail_url(self.article.id), {'title': 'New title'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_delete_queries(self):
+        with self.assertNumQueries(3):
+            res = self.client.delete(detail_url(self.article.id))
+
+        self.assertEqual(res.status_code, status.HTTP_204_NO_CONTENT)
+
+    def test_upload_image_queries(self):
+        with tempfile.NamedTemporaryFile(suffix='.jpg') as ntf:
+            Image.new('RGB', (10, 10)).save(ntf, format='JPEG')
+            ntf.seek(0)
+            with self.assertNumQueries(3):
+                res = self.client.post(image_upload_url(self.article.id), {'image': ntf}, format='multipart')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_like_queries(self):
+        # fetch, insert, counter update and read back, plus the test and view savepoints
+        with self.assertNumQueries(6):
+            res = self.client.patch(like_url(self.article.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_other_author_forbidden_without_loading_owner(self):
+        other_author = get_user_model().objects.create_author_user(
+            'othermail@gmail.com',
+            'testotherpassword'
+        )
+        self.client.force_authenticate(other_author)
+
+        with self.assertNumQueries(1):
+            res = self.client.delete(detail_url(self.article.id))
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
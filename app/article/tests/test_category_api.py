@@ -36,16 +36,19 @@ class PublicCategoryAPITests(TestCase):
 
 class PrivateCategoryAPITests(TestCase):
 
-    def setUp(self):
-        self.client = APIClient()
-        self.user = get_user_model().objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
             'test@gmail.com',
             'testpass'
         )
-        self.author = get_user_model().objects.create_author_user(
+        cls.author = get_user_model().objects.create_author_user(
             'author@gmail.com',
             'testpassword'
         )
+
+    def setUp(self):
+        self.client = APIClient()
         self.client.force_authenticate(self.author)
 
     def test_retrieve_categories(self):
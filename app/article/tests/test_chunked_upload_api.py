@@ -0,0 +1,173 @@
+import io
+import os
+import hashlib
+from unittest.mock import patch
+
+from PIL import Image
+
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Article, ImageUpload
+
+
+def start_url(article_id):
+    return reverse('article:article-start-upload', args=[article_id])
+
+
+def chunk_url(article_id, upload_id):
+    return reverse('article:article-upload-chunk', args=[article_id, upload_id])
+
+
+def sample_image():
+    buffer = io.BytesIO()
+    Image.new('RGB', (40, 40), color='red').save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class ChunkedImageUploadTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author_user = get_user_model().objects.create_author_user(
+            'authormail@gmail.com',
+            'testpassauthor'
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.author_user)
+        self.article = self.create_article('SestSlug')
+        self.content = sample_image()
+        self.sha256 = hashlib.sha256(self.content).hexdigest()
+
+    def tearDown(self):
+        for article in Article.objects.exclude(image=''):
+            if article.image and os.path.exists(article.image.path):
+                os.remove(article.image.path)
+
+    def create_article(self, slug):
+        return Article.objects.create(
+            title='A test article',
+            description='Test description for above article',
+            slug=slug,
+            owner=self.author_user
+        )
+
+    def start(self, article, sha256=None):
+        return self.client.post(start_url(article.id), {
+            'filename': 'image.png',
+            'size': len(self.content),
+            'sha256': sha256 or self.sha256,
+        })
+
+    def send(self, article, upload_id, offset, chunk):
+        return self.client.patch(
+            chunk_url(article.id, upload_id), chunk,
+            content_type='application/offset+octet-stream',
+            HTTP_UPLOAD_OFFSET=str(offset)
+        )
+
+    def upload(self, article):
+        upload_id = self.start(article).data['id']
+        half = len(self.content) // 2
+        self.send(article, upload_id, 0, self.content[:half])
+        return self.send(article, upload_id, half, self.content[half:])
+
+    def test_chunked_upload(self):
+        res = self.upload(self.article)
+        self.article.refresh_from_db()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res.data['completed'])
+        self.assertIn(self.sha256, self.article.image.name)
+        with open(self.article.image.path, 'rb') as fh:
+            self.assertEqual(fh.read(), self.content)
+
+    def test_resume_reports_offset(self):
+        upload_id = self.start(self.article).data['id']
+        self.send(self.article, upload_id, 0, self.content[:10])
+
+        res = self.client.get(chunk_url(self.article.id, upload_id))
+
+        self.assertEqual(res.data['received'], 10)
+        self.assertFalse(res.data['completed'])
+
+    def test_wrong_offset_conflict(self):
+        upload_id = self.start(self.article).data['id']
+
+        res = self.send(self.article, upload_id, 5, self.content[:10])
+
+        self.assertEqual(res.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(res.data['received'], 0)
+
+    def test_checksum_mismatch_restarts(self):
+        upload_id = self.start(self.article, sha256='0' * 64).data['id']
+
+        res = self.send(self.article, upload_id, 0, self.content)
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(ImageUpload.objects.get(pk=upload_id).received, 0)
+
+    def test_identical_image_stored_once(self):
+        self.upload(self.article)
+        other = self.create_article('other')
+
+        res = self.upload(other)
+        other.refresh_from_db()
+        self.article.refresh_from_db()
+
+        self.assertTrue(res.data['completed'])
+        self.assertEqual(other.image.name, self.article.image.name)
+
+    def test_replaced_image_not_handed_to_other_articles(self):
+        self.upload(self.article)
+        buffer = io.BytesIO()
+        Image.new('RGB', (40, 40), color='green').save(buffer, format='PNG')
+        buffer.seek(0)
+        buffer.name = 'replacement.png'
+        replaced = self.client.post(
+            reverse('article:article-upload-image', args=[self.article.id]), {'image': buffer}, format='multipart'
+        )
+        self.assertEqual(replaced.status_code, status.HTTP_200_OK)
+        other = self.create_article('other')
+
+        self.upload(other)
+
+        other.refresh_from_db()
+        with open(other.image.path, 'rb') as fh:
+            self.assertEqual(fh.read(), self.content)
+
+    def test_declared_hash_alone_does_not_attach_image(self):
+        self.upload(self.article)
+        other = self.create_article('other')
+
+        res = self.start(other)
+        other.refresh_from_db()
+
+        self.assertFalse(res.data['completed'])
+        self.assertEqual(res.data['received'], 0)
+        self.assertFalse(other.image)
+
+    def test_storage_failure_restarts(self):
+        upload_id = self.start(self.article).data['id']
+
+        with patch('django.db.models.fields.files.FieldFile.save', side_effect=OSError('disk full')):
+            with self.assertRaises(OSError):
+                self.send(self.article, upload_id, 0, self.content)
+
+        self.assertEqual(ImageUpload.objects.get(pk=upload_id).received, 0)
+        res = self.send(self.article, upload_id, 0, self.content)
+        self.assertTrue(res.data['completed'])
+
+    def test_upload_limited_to_owner(self):
+        other_author = get_user_model().objects.create_author_user('other@gmail.com', 'testpass')
+        self.client.force_authenticate(other_author)
+
+        res = self.start(self.article)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
@@ -29,18 +29,21 @@ class PublicCommentApiTests(TestCase):
 
 class PrivateCommentAPITests(TestCase):
 
-    def setUp(self):
-        self.client = APIClient()
-        self.user = get_user_model().objects.create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(
             'realauthor@gmail.com',
             'testauthor',
         )
-        self.client.force_authenticate(self.user)
-        self.author_user = get_user_model().objects.create_author_user(
+        cls.author_user = get_user_model().objects.create_author_user(
             'authormail@gmail.com',
             'authorpassword'
         )
 
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
     def test_retrieve_comments(self):
         cate1 = Category.objects.create(title='sport', slug='sport', author=self.author_user)
         cate2 = Category.objects.create(title='casual', slug='casual', author=self.author_user)
@@ -56,7 +59,7 @@ class PrivateCommentAPITests(TestCase):
 
         comments = Comment.objects.all().order_by('-id')
         serializer = CommentSerializer(comments, many=True)
-        self.assertEqual(serializer.data, res.data)
+        self.assertEqual(serializer.data, res.data['results'])
 
     def test_retrieve_comments_limmited_to_user(self):
         cate1 = Category.objects.create(title='sport', slug='sport', author=self.author_user)
@@ -76,7 +79,7 @@ class PrivateCommentAPITests(TestCase):
         cm2 = Comment.objects.create(article=article, author=another_user, body='Bad')
         res = self.client.get(COMMENT_URL)
 
-        self.assertEqual(len(res.data), 1)
+        self.assertEqual(len(res.data['results']), 1)
 
     def test_creating_comment_successful(self):
         cate1 = Category.objects.create(title='sport', slug='sport', author=self.author_user)
@@ -181,3 +184,43 @@ class PrivateCommentAPITests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertEqual(cm.body, payload['body'])
+
+    def test_comments_keyset_paginated_newest_first(self):
+        article = Article.objects.create(
+            title = 'A test article',
+            description = 'Test description for above article',
+            slug = 'SestSlug',
+            owner = self.author_user
+        )
+        comments = [
+            Comment.objects.create(article=article, author=self.user, body=f'Comment {i}')
+            for i in range(5)
+        ]
+
+        res = self.client.get(COMMENT_URL, {'page_size': 3})
+        next_res = self.client.get(res.data['next'])
+
+        ids = [c['id'] for c in res.data['results']] + [c['id'] for c in next_res.data['results']]
+        self.assertEqual(ids, [c.id for c in reversed(comments)])
+        self.assertIsNone(next_res.data['next'])
+
+    def test_comments_with_article_summary_single_query(self):
+        for i in range(3):
+            article = Article.objects.create(
+                title = f'Article {i}',
+                description = 'Test description for above article',
+                slug = f'slug-{i}',
+                owner = self.author_user
+            )
+            Comment.objects.create(article=article, author=self.user, body='Good')
+
+        with self.assertNumQueries(1):
+            res = self.client.get(COMMENT_URL, {'expand': 'article'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            set(res.data['results'][0]['article']), {'id', 'title', 'slug', 'publish_date'}
+        )
+        self.assertEqual(
+            [c['article']['title'] for c in res.data['results']], ['Article 2', 'Article 1', 'Article 0']
+        )
@@ -0,0 +1,198 @@
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.conf import settings
+from django.test import TestCase
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Article, Comment
+from article import events
+
+
+COMMENT_URL = reverse('article:comment-list')
+
+
+def stream_url(article_id):
+    return reverse('article:article-stream', args=[article_id])
+
+
+def like_url(article_id):
+    return reverse('article:article-add-like', args=[article_id])
+
+
+class LocalRedis:
+    """Stand-in for a redis client, one pattern subscription fed from a queue"""
+
+    def __init__(self):
+        self.messages = queue.Queue()
+
+    def publish(self, channel, data):
+        self.messages.put({'type': 'pmessage', 'channel': channel.encode(), 'data': data})
+
+    def pubsub(self, ignore_subscribe_messages=False):
+        return self
+
+    def psubscribe(self, pattern):
+        self.pattern = pattern
+
+    def listen(self):
+        while True:
+            yield self.messages.get()
+
+
+class FlakyRedis(LocalRedis):
+    """Drops the first subscription like a Redis restart would"""
+
+    def __init__(self):
+        super().__init__()
+        self.drops = 1
+
+    def listen(self):
+        if self.drops:
+            self.drops -= 1
+            raise ConnectionError('Connection closed by server')
+        yield from super().listen()
+
+
+class FailingBroker(events.Broker):
+
+    def publish(self, name, event):
+        raise ConnectionError('Connection refused')
+
+
+class CommentStreamApiTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('reader@gmail.com', 'testpassword')
+        cls.author_user = get_user_model().objects.create_author_user(
+            'authormail@gmail.com',
+            'testpassword'
+        )
+        cls.article = Article.objects.create(
+            title='A test article',
+            description='Test description for above article',
+            slug='SestSlug',
+            owner=cls.author_user
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.broker = events.Broker()
+        patcher = patch.object(events, '_broker', self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_new_comment_and_like_published(self):
+        subscriber = self.broker.subscribe(events.topic(self.article.id))
+        self.client.force_authenticate(self.user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(COMMENT_URL, {'article': self.article.id, 'body': 'Nice'})
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.patch(like_url(self.article.id))
+
+        comment = subscriber.get_nowait()
+        self.assertEqual(comment['event'], 'comment')
+        self.assertEqual(comment['data']['body'], 'Nice')
+        like = subscriber.get_nowait()
+        self.assertEqual(like['data'], {'article': self.article.id, 'like_count': 1})
+
+    def test_stream_replays_missed_comments(self):
+        first = Comment.objects.create(article=self.article, author=self.user, body='First')
+        Comment.objects.create(article=self.article, author=self.user, body='Second')
+
+        with patch.object(events, 'STREAM_MAX_SECONDS', 0.05):
+            res = self.client.get(stream_url(self.article.id), HTTP_LAST_EVENT_ID=str(first.id))
+            body = b''.join(res.streaming_content).decode()
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'text/event-stream')
+        self.assertIn('event: comment', body)
+        self.assertIn('"body": "Second"', body)
+        self.assertNotIn('"body": "First"', body)
+
+    def test_stream_delivers_published_events(self):
+        with patch.object(events, 'STREAM_MAX_SECONDS', 1):
+            res = self.client.get(stream_url(self.article.id), HTTP_ACCEPT='text/event-stream')
+            content = iter(res.streaming_content)
+            self.assertEqual(next(content), b'retry: 3000\n\n')
+            threading.Timer(0.05, events.publish_like_counts, [[(self.article.id, 7)]]).start()
+            event = next(content).decode()
+
+        self.assertIn('event: like_count', event)
+        self.assertEqual(json.loads(event.split('data: ')[1])['like_count'], 7)
+
+    def test_stream_hidden_article_not_found(self):
+        self.article.soft_delete()
+
+        res = self.client.get(stream_url(self.article.id), HTTP_ACCEPT='text/event-stream')
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertTrue(res.content.startswith(b'event: error'))
+
+    def test_redis_broker_fans_out_across_nodes(self):
+        client = LocalRedis()
+        node_a = events.RedisBroker(client=client)
+        node_b = events.RedisBroker(client=client)
+        subscriber = node_b.subscribe(events.topic(self.article.id))
+
+        node_a.publish(events.topic(self.article.id), {'event': 'like_count', 'data': {'like_count': 3}})
+
+        self.assertEqual(subscriber.get(timeout=1)['data'], {'like_count': 3})
+
+    def test_broker_failure_does_not_fail_committed_comment(self):
+        self.client.force_authenticate(self.user)
+
+        with patch.object(events, '_broker', FailingBroker()), self.assertLogs('article.events', 'ERROR'):
+            with self.captureOnCommitCallbacks(execute=True):
+                res = self.client.post(COMMENT_URL, {'article': self.article.id, 'body': 'Nice'})
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Comment.objects.filter(body='Nice').exists())
+
+    @patch.object(events, 'RECONNECT_SECONDS', 0.01)
+    def test_redis_listener_resubscribes_after_disconnect(self):
+        client = FlakyRedis()
+        broker = events.RedisBroker(client=client)
+
+        with self.assertLogs('article.events', 'WARNING'):
+            subscriber = broker.subscribe(events.topic(self.article.id))
+            broker.publish(events.topic(self.article.id), {'event': 'like_count', 'data': {'like_count': 4}})
+
+            self.assertEqual(subscriber.get(timeout=1)['data'], {'like_count': 4})
+
+
+# runs in a separate interpreter, like a second gunicorn worker
+PUBLISHER = '''
+import sys
+import django
+django.setup()
+from article import events
+events.broker().publish(events.topic(int(sys.argv[1])), {'event': 'like_count', 'data': {'like_count': 5}})
+'''
+
+
+@skipUnless(os.environ.get('EVENTS_REDIS_URL'), 'needs a Redis server in EVENTS_REDIS_URL')
+class CrossProcessEventTests(TestCase):
+
+    def test_event_published_by_another_process_reaches_stream(self):
+        broker = events.RedisBroker(url=os.environ['EVENTS_REDIS_URL'])
+        subscriber = broker.subscribe(events.topic(42))
+
+        subprocess.run(
+            [sys.executable, '-c', PUBLISHER, '42'],
+            cwd=settings.BASE_DIR, env={**os.environ, 'DJANGO_PROFILE': 'dev'}, check=True
+        )
+
+        self.assertEqual(subscriber.get(timeout=5)['data'], {'like_count': 5})
@@ -0,0 +1,105 @@
+import csv
+import io
+import json
+
+from django.test import TestCase
+from django.urls import reverse
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Article, Category, Comment
+
+
+EXPORT_URL = reverse('article:article-export-content')
+
+
+def read_stream(res):
+    return b''.join(res.streaming_content).decode()
+
+
+class ArticleExportApiTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = get_user_model().objects.create_superuser(
+            'admin@gmail.com',
+            'testpassword'
+        )
+        cls.reader = get_user_model().objects.create_user(
+            'reader@gmail.com',
+            'testpassword'
+        )
+        cate1 = Category.objects.create(title='sport', slug='sport', author=cls.admin_user)
+        cate2 = Category.objects.create(title='casual', slug='casual', author=cls.admin_user)
+        cls.article1 = Article.objects.create(
+            title='A test article',
+            description='Test description for above article',
+            slug='first',
+            owner=cls.admin_user
+        )
+        cls.article2 = Article.objects.create(
+            title='Another test article',
+            description='Test description, with a comma',
+            slug='second',
+            owner=cls.admin_user
+        )
+        cls.article1.categories.set((cate1.id, cate2.id))
+        cls.article1.like.set((cls.reader.id, cls.admin_user.id))
+        cls.article2.categories.set((cate2.id,))
+        cls.comment = Comment.objects.create(article=cls.article2, author=cls.reader, body='Good')
+        cls.categories = (cate1, cate2)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin_user)
+
+    def test_non_staff_forbidden(self):
+        self.client.force_authenticate(self.reader)
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_export_articles_ndjson(self):
+        res = self.client.get(EXPORT_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in read_stream(res).splitlines()]
+        self.assertEqual([row['id'] for row in rows], [self.article1.id, self.article2.id])
+        self.assertEqual(sorted(rows[0]['categories']), sorted(c.id for c in self.categories))
+        self.assertEqual(rows[0]['like_count'], 2)
+        self.assertEqual(rows[1]['categories'], [self.categories[1].id])
+        self.assertEqual(rows[1]['like_count'], 0)
+
+    def test_export_articles_csv(self):
+        res = self.client.get(EXPORT_URL, {'output': 'csv'})
+
+        rows = list(csv.DictReader(io.StringIO(read_stream(res))))
+        self.assertEqual(res['Content-Type'], 'text/csv')
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1]['description'], self.article2.description)
+        self.assertEqual(rows[0]['like_count'], '2')
+
+    def test_export_comments(self):
+        res = self.client.get(EXPORT_URL, {'dataset': 'comments'})
+
+        rows = [json.loads(line) for line in read_stream(res).splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['article'], self.article2.id)
+        self.assertEqual(rows[0]['body'], self.comment.body)
+
+    def test_export_invalid_output(self):
+        res = self.client.get(EXPORT_URL, {'output': 'xml'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_command(self):
+        out = io.StringIO()
+        call_command('export_content', 'articles', '--chunk-size', '1', stdout=out)
+
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(rows[1]['slug'], self.article2.slug)
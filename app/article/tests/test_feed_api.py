@@ -0,0 +1,156 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Article, Category, FeedEntry
+
+
+FEED_URL = reverse('article:feed-list')
+
+
+def follow_url(category_id):
+    return reverse('article:category-follow', args=[category_id])
+
+
+class PublicFeedApiTests(TestCase):
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_login_required(self):
+        res = self.client.get(FEED_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class PrivateFeedApiTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author_user = get_user_model().objects.create_author_user(
+            'authormail@gmail.com',
+            'testpassword'
+        )
+        cls.user = get_user_model().objects.create_user(
+            'reader@gmail.com',
+            'testpassword'
+        )
+        cls.sport = Category.objects.create(title='sport', slug='sport', author=cls.author_user)
+        cls.casual = Category.objects.create(title='casual', slug='casual', author=cls.author_user)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def publish(self, slug, categories, **params):
+        article = Article.objects.create(
+            title='A test article',
+            description='Test description for above article',
+            slug=slug,
+            owner=self.author_user,
+            **params
+        )
+        article.categories.set([category.id for category in categories])
+        return article
+
+    def test_follow_category(self):
+        res = self.client.post(follow_url(self.sport.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn(self.user, self.sport.followers.all())
+
+    def test_unfollow_category(self):
+        self.sport.followers.add(self.user)
+
+        res = self.client.delete(follow_url(self.sport.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertNotIn(self.user, self.sport.followers.all())
+
+    def test_publish_fans_out_to_followers(self):
+        self.client.post(follow_url(self.sport.id))
+        sport_article = self.publish('sport-news', [self.sport])
+        self.publish('casual-news', [self.casual])
+
+        res = self.client.get(FEED_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['id'] for item in res.data['results']], [sport_article.id])
+
+    def test_follow_backfills_existing_articles(self):
+        article = self.publish('sport-news', [self.sport])
+
+        self.client.post(follow_url(self.sport.id))
+
+        self.assertTrue(FeedEntry.objects.filter(user=self.user, article=article).exists())
+
+    def test_unfollow_removes_articles(self):
+        self.client.post(follow_url(self.sport.id))
+        self.publish('sport-news', [self.sport])
+
+        self.client.delete(follow_url(self.sport.id))
+        res = self.client.get(FEED_URL)
+
+        self.assertEqual(res.data['results'], [])
+
+    def test_feed_newest_first_without_duplicates(self):
+        self.client.post(follow_url(self.sport.id))
+        self.client.post(follow_url(self.casual.id))
+        older = self.publish('older', [self.sport, self.casual],
+                             publish_date=timezone.now() - timedelta(hours=2))
+        newer = self.publish('newer', [self.casual])
+
+        res = self.client.get(FEED_URL)
+
+        self.assertEqual([item['id'] for item in res.data['results']], [newer.id, older.id])
+
+    def test_feed_hides_scheduled_articles(self):
+        self.client.post(follow_url(self.sport.id))
+        self.publish('scheduled', [self.sport], publish_date=timezone.now() + timedelta(days=1))
+
+        res = self.client.get(FEED_URL)
+
+        self.assertEqual(res.data['results'], [])
+
+    def test_removing_category_withdraws_article(self):
+        self.client.post(follow_url(self.sport.id))
+        article = self.publish('sport-news', [self.sport])
+
+        article.categories.set((self.casual.id,))
+
+        self.assertFalse(FeedEntry.objects.filter(user=self.user, article=article).exists())
+
+    @patch('article.feed.FANOUT_MAX_FOLLOWS', 1)
+    def test_heavy_follower_reads_merged_query(self):
+        self.client.post(follow_url(self.sport.id))
+        self.client.post(follow_url(self.casual.id))
+        article = self.publish('news', [self.sport, self.casual])
+
+        res = self.client.get(FEED_URL)
+
+        self.assertFalse(FeedEntry.objects.filter(user=self.user).exists())
+        self.assertEqual([item['id'] for item in res.data['results']], [article.id])
+
+    def test_follow_count_kept_on_follow_and_unfollow(self):
+        self.client.post(follow_url(self.sport.id))
+        self.client.post(follow_url(self.casual.id))
+        self.client.delete(follow_url(self.sport.id))
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.follow_count, 1)
+
+    @patch('article.feed.FEED_SIZE', 2)
+    @patch('article.feed.FEED_TRIM_SLACK', 0)
+    def test_timeline_capped(self):
+        self.client.post(follow_url(self.sport.id))
+        for i in range(4):
+            self.publish(f'news{i}', [self.sport])
+
+        self.assertEqual(FeedEntry.objects.filter(user=self.user).count(), 2)
@@ -0,0 +1,176 @@
+import fcntl
+import io
+import os
+import shutil
+import tempfile
+import threading
+import time
+from unittest.mock import patch
+
+from PIL import Image
+
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.contrib.auth import get_user_model
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Article
+from article import renditions
+
+
+def image_url(article_id):
+    return reverse('article:article-image', args=[article_id])
+
+
+class ImageRenditionTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author_user = get_user_model().objects.create_author_user(
+            'authormail@gmail.com',
+            'testpassauthor'
+        )
+        cls.article = Article.objects.create(
+            title='A test article',
+            description='Test description for above article',
+            slug='SestSlug',
+            owner=cls.author_user
+        )
+        buffer = io.BytesIO()
+        Image.new('RGB', (600, 300), color='blue').save(buffer, format='JPEG')
+        cls.article.image.save('image.jpg', ContentFile(buffer.getvalue()))
+
+    def setUp(self):
+        self.cache_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.cache_dir)
+        settings_override = override_settings(RENDITION_CACHE_DIR=self.cache_dir)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.client = APIClient()
+
+    def test_resize_image(self):
+        res = self.client.get(image_url(self.article.id), {'width': 128, 'output': 'webp'}, follow=True)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'image/webp')
+        self.assertIn('immutable', res['Cache-Control'])
+        with Image.open(io.BytesIO(b''.join(res.streaming_content))) as img:
+            self.assertEqual(img.size, (128, 64))
+
+    def test_unversioned_url_redirects_to_image_version(self):
+        version = renditions.version(self.article.image.name)
+
+        res = self.client.get(image_url(self.article.id), {'width': 128})
+        stale = self.client.get(image_url(self.article.id), {'width': 128, 'v': 'old'})
+
+        self.assertEqual(res.status_code, status.HTTP_302_FOUND)
+        self.assertIn(f'v={version}', res['Location'])
+        self.assertIn('width=128', res['Location'])
+        self.assertEqual(res['Cache-Control'], 'no-cache')
+        self.assertEqual(stale.status_code, status.HTTP_302_FOUND)
+
+    def test_rendition_evicted_before_open_is_rendered_again(self):
+        original = renditions.get
+
+        def get_then_evict(*args):
+            path = original(*args)
+            if not evicted:
+                os.remove(path)
+                evicted.append(path)
+            return path
+
+        evicted = []
+        with patch('article.renditions.get', get_then_evict):
+            with renditions.open_rendition(self.article.image.name, 128) as rendition:
+                content = rendition.read()
+
+        self.assertTrue(evicted)
+        with Image.open(io.BytesIO(content)) as img:
+            self.assertEqual(img.width, 128)
+
+    def test_invalid_width(self):
+        res = self.client.get(image_url(self.article.id), {'width': 130})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_article_without_image(self):
+        self.article.image = None
+        self.article.save()
+
+        res = self.client.get(image_url(self.article.id), {'width': 128})
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_rendition_cached(self):
+        renditions.get(self.article.image.name, 256)
+
+        with patch('article.renditions.render') as render:
+            renditions.get(self.article.image.name, 256)
+        render.assert_not_called()
+
+    def test_concurrent_requests_render_once(self):
+        calls = []
+        original = renditions.render
+
+        def slow_render(*args):
+            calls.append(args)
+            time.sleep(0.2)
+            return original(*args)
+
+        with patch('article.renditions.render', slow_render):
+            threads = [
+                threading.Thread(target=renditions.get, args=(self.article.image.name, 512))
+                for _ in range(5)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(len(calls), 1)
+
+    def test_lru_eviction(self):
+        first = renditions.get(self.article.image.name, 64)
+        os.utime(first, (0, 0))
+        size = os.path.getsize(first)
+
+        with override_settings(RENDITION_CACHE_MAX_BYTES=size * 2):
+            renditions.get(self.article.image.name, 128)
+            renditions.get(self.article.image.name, 256)
+
+        self.assertFalse(os.path.exists(first))
+
+    def test_rendition_finished_by_other_process_reused(self):
+        path = renditions.rendition_path(self.article.image.name, 512, 'jpeg', renditions.DEFAULT_QUALITY)
+        os.makedirs(os.path.dirname(path))
+        source = patch('article.renditions.default_storage.open', side_effect=AssertionError('rendered twice'))
+        with source, open(path + renditions.LOCK_SUFFIX, 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            waiting = renditions._pool.submit(
+                renditions.render, self.article.image.name, path, 512, 'jpeg', renditions.DEFAULT_QUALITY
+            )
+            time.sleep(0.1)
+            with open(path, 'wb') as rendered:
+                rendered.write(b'rendered elsewhere')
+            fcntl.flock(lock, fcntl.LOCK_UN)
+            self.assertEqual(waiting.result(timeout=5), path)
+
+        with open(path, 'rb') as rendition:
+            self.assertEqual(rendition.read(), b'rendered elsewhere')
+
+    def test_eviction_counts_files_of_other_processes(self):
+        other = os.path.join(self.cache_dir, 'ab', 'other-64-80.jpeg')
+        os.makedirs(os.path.dirname(other))
+        with open(other, 'wb') as rendition:
+            rendition.write(b'x' * 1000)
+        os.utime(other, (0, 0))
+
+        with override_settings(RENDITION_CACHE_MAX_BYTES=1000):
+            path = renditions.get(self.article.image.name, 64)
+
+        self.assertFalse(os.path.exists(other))
+        self.assertTrue(os.path.exists(path))
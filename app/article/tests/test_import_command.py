@@ -0,0 +1,130 @@
+import os
+import json
+import tempfile
+from io import StringIO
+
+from django.test import TestCase
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.contrib.auth import get_user_model
+
+from core.models import Article, Category, Comment, FeedEntry, ImportCheckpoint
+from article import list_cache
+
+
+RECORDS = [
+    {'type': 'user', 'email': 'author@gmail.com', 'name': 'Author', 'is_author': True},
+    {'type': 'user', 'email': 'reader@gmail.com', 'name': 'Reader'},
+    {'type': 'category', 'slug': 'sport', 'title': 'Sport', 'author': 'author@gmail.com'},
+    {'type': 'category', 'slug': 'casual', 'title': 'Casual', 'author': 'author@gmail.com'},
+    {
+        'type': 'article', 'slug': 'first', 'title': 'First', 'description': 'First article',
+        'owner': 'author@gmail.com', 'publish_date': '2021-03-04T10:00:00+00:00',
+        'categories': ['sport', 'casual'], 'likes': ['reader@gmail.com']
+    },
+    {
+        'type': 'article', 'slug': 'second', 'title': 'Second', 'description': 'Second article',
+        'owner': 'missing@gmail.com', 'categories': ['sport']
+    },
+    {
+        'type': 'comment', 'article': 'first', 'author': 'reader@gmail.com',
+        'body': 'Good', 'created_on': '2021-03-05T10:00:00+00:00'
+    },
+]
+
+
+class ImportContentCommandTests(TestCase):
+
+    def write_records(self, records):
+        ntf = tempfile.NamedTemporaryFile('w', suffix='.ndjson', delete=False)
+        with ntf:
+            for record in records:
+                ntf.write(json.dumps(record) + '\n')
+        self.addCleanup(os.remove, ntf.name)
+        return ntf.name
+
+    def run_import(self, path, *args):
+        out = StringIO()
+        call_command('import_content', path, '--chunk-size', '2', *args, stdout=out)
+        return out.getvalue()
+
+    def test_import_content(self):
+        self.run_import(self.write_records(RECORDS))
+
+        author = get_user_model().objects.get(email='author@gmail.com')
+        article = Article.objects.get(slug='first')
+        self.assertTrue(author.is_author)
+        self.assertFalse(author.has_usable_password())
+        self.assertEqual(article.owner, author)
+        self.assertEqual(set(article.categories.values_list('slug', flat=True)), {'sport', 'casual'})
+        self.assertEqual(article.like.get().email, 'reader@gmail.com')
+        self.assertEqual(article.publish_date.day, 4)
+        self.assertFalse(Article.objects.filter(slug='second').exists())
+        self.assertEqual(Comment.objects.get().created_on.day, 5)
+
+    def test_import_updates_on_slug_conflict(self):
+        path = self.write_records(RECORDS)
+        self.run_import(path)
+        changed = dict(RECORDS[4], title='First, edited', categories=['casual'])
+        self.run_import(self.write_records(RECORDS[:4] + [changed]))
+
+        article = Article.objects.get(slug='first')
+        self.assertEqual(Article.objects.count(), 1)
+        self.assertEqual(Category.objects.count(), 2)
+        self.assertEqual(article.title, changed['title'])
+        self.assertEqual(list(article.categories.values_list('slug', flat=True)), ['casual'])
+
+    def test_resume_after_last_checkpoint(self):
+        path = self.write_records(RECORDS)
+        self.run_import(path)
+        ImportCheckpoint.objects.filter(name__endswith='.ndjson').update(position=6)
+
+        self.run_import(path, '--resume')
+
+        self.assertEqual(Comment.objects.count(), 1)
+        self.assertEqual(ImportCheckpoint.objects.get().position, len(RECORDS))
+
+    def test_reimport_does_not_duplicate_comments(self):
+        path = self.write_records(RECORDS)
+        self.run_import(path)
+        self.run_import(path)
+
+        self.assertEqual(Comment.objects.count(), 1)
+        self.assertEqual(Article.objects.get(slug='first').comment_count, 1)
+
+    def test_repeated_comments_without_date_kept_apart(self):
+        undated = {'type': 'comment', 'article': 'first', 'author': 'reader@gmail.com', 'body': '+1'}
+        path = self.write_records(RECORDS[:5] + [undated, undated])
+        self.run_import(path)
+
+        out = self.run_import(path)
+
+        self.assertEqual(Comment.objects.filter(body='+1').count(), 2)
+        self.assertIn('comment: 0 imported, 2 skipped', out)
+
+    def test_feeds_and_list_cache_refreshed_after_import(self):
+        reader = get_user_model().objects.create_user('reader@gmail.com', 'testpass')
+        self.run_import(self.write_records(RECORDS[:4]))
+        Category.objects.get(slug='sport').followers.add(reader)
+        version = list_cache.version()
+
+        self.run_import(self.write_records(RECORDS[4:5]))
+
+        self.assertTrue(FeedEntry.objects.filter(user=reader, article__slug='first').exists())
+        self.assertGreater(list_cache.version(), version)
+
+    def test_missing_fields_keep_existing_user_values(self):
+        user = get_user_model().objects.create_author_user('author@gmail.com', 'testpass')
+
+        self.run_import(self.write_records([{'type': 'user', 'email': 'author@gmail.com', 'name': 'Renamed'}]))
+
+        user.refresh_from_db()
+        self.assertEqual(user.name, 'Renamed')
+        self.assertTrue(user.is_author)
+        self.assertTrue(user.check_password('testpass'))
+
+    def test_malformed_date_stops_with_error(self):
+        records = RECORDS[:4] + [dict(RECORDS[4], publish_date='yesterday')]
+
+        with self.assertRaises(CommandError):
+            self.run_import(self.write_records(records))
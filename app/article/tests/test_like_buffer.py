@@ -0,0 +1,205 @@
+import fnmatch
+from io import StringIO
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+
+from rest_framework.test import APIClient
+
+from core.models import Article, NotificationOutbox
+from article import like_buffer
+
+
+def like_url(article_id):
+    return reverse('article:article-add-like', args=[article_id])
+
+
+def detail_url(article_id):
+    return reverse('article:article-detail', args=[article_id])
+
+
+def list_url():
+    return reverse('article:article-list')
+
+
+class LocalPipeline:
+    """Queues commands and runs them on execute, returning their results"""
+
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    def __getattr__(self, name):
+        return lambda *args: self.commands.append((getattr(self.client, name), args))
+
+    def execute(self):
+        return [command(*args) for command, args in self.commands]
+
+
+class LocalRedis:
+    """Stand-in for the redis commands the buffer uses, values come back as bytes like redis-py"""
+
+    def __init__(self):
+        self.data = {}
+
+    def pipeline(self):
+        return LocalPipeline(self)
+
+    def hset(self, key, field, value):
+        self.data.setdefault(key, {})[str(field).encode()] = str(value).encode()
+
+    def hget(self, key, field):
+        return self.data.get(key, {}).get(str(field).encode())
+
+    def hgetall(self, key):
+        return dict(self.data.get(key, {}))
+
+    def sadd(self, key, member):
+        self.data.setdefault(key, set()).add(str(member).encode())
+
+    def spop(self, key, count):
+        members = self.data.get(key, set())
+        popped = [members.pop() for _ in range(min(count, len(members)))]
+        if not members:
+            self.data.pop(key, None)
+        return popped
+
+    def exists(self, key):
+        return int(key in self.data)
+
+    def rename(self, source, target):
+        self.data[target] = self.data.pop(source)
+
+    def scan_iter(self, match):
+        return [key.encode() for key in list(self.data) if fnmatch.fnmatch(key, match)]
+
+    def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+
+
+@override_settings(LIKE_BUFFER='local')
+class LikeBufferApiTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('reader@gmail.com', 'testpassword')
+        cls.author_user = get_user_model().objects.create_author_user(
+            'authormail@gmail.com',
+            'testpassword'
+        )
+        cls.article = Article.objects.create(
+            title='A test article',
+            description='Test description for above article',
+            slug='SestSlug',
+            owner=cls.author_user
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.buffer = like_buffer.LocalLikeBuffer()
+        patcher = patch.object(like_buffer, '_buffer', self.buffer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_toggle_counts_pending_intent(self):
+        res = self.client.patch(like_url(self.article.id))
+        detail = self.client.get(detail_url(self.article.id))
+
+        self.assertEqual(res.data, {'id': self.article.id, 'liked': True, 'like_count': 1})
+        self.assertEqual(detail.data['like'], [self.user.id])
+        self.assertFalse(self.article.like.exists())
+
+    def test_list_shows_own_pending_likes_only(self):
+        self.article.like.add(self.author_user)
+        self.article.like.add(self.user)
+        Article.all_objects.filter(pk=self.article.pk).refresh_counters()
+        self.client.delete(like_url(self.article.id))
+
+        own = self.client.get(list_url())
+        self.client.force_authenticate(self.author_user)
+        other = self.client.get(list_url())
+
+        self.assertEqual((own.data[0]['like'], own.data[0]['like_count']), ([self.author_user.id], 1))
+        self.assertEqual(sorted(other.data[0]['like']), sorted([self.author_user.id, self.user.id]))
+        self.assertEqual(other.data[0]['like_count'], 2)
+
+    def test_toggle_on_stored_like_not_counted_twice(self):
+        self.article.like.add(self.user)
+
+        liked = self.client.patch(like_url(self.article.id))
+        unliked = self.client.delete(like_url(self.article.id))
+
+        self.assertEqual(liked.data['like_count'], 1)
+        self.assertEqual(unliked.data['like_count'], 0)
+
+    def test_flush_writes_likes_counters_and_notifications(self):
+        self.client.patch(like_url(self.article.id))
+
+        call_command('flush_likes', stdout=StringIO())
+
+        self.article.refresh_from_db()
+        self.assertEqual(list(self.article.like.values_list('id', flat=True)), [self.user.id])
+        self.assertEqual(self.article.like_count, 1)
+        self.assertEqual(NotificationOutbox.objects.filter(recipient=self.author_user).count(), 1)
+        self.assertEqual(self.buffer.take(), {})
+
+    def test_latest_intent_wins(self):
+        self.article.like.add(self.user)
+        self.client.patch(like_url(self.article.id))
+        self.client.delete(like_url(self.article.id))
+
+        like_buffer.flush()
+
+        self.article.refresh_from_db()
+        self.assertFalse(self.article.like.exists())
+        self.assertEqual(self.article.like_count, 0)
+        self.assertFalse(NotificationOutbox.objects.exists())
+
+
+class RedisLikeBufferTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('reader@gmail.com', 'testpassword')
+        cls.author_user = get_user_model().objects.create_author_user(
+            'authormail@gmail.com',
+            'testpassword'
+        )
+        cls.article = Article.objects.create(
+            title='A test article',
+            description='Test description for above article',
+            slug='SestSlug',
+            owner=cls.author_user
+        )
+
+    def setUp(self):
+        self.client = LocalRedis()
+
+    def test_pending_intents_read_back(self):
+        buffer = like_buffer.RedisLikeBuffer(client=self.client)
+        buffer.record(self.article.id, self.user.id, liked=True)
+        buffer.take()
+        buffer.record(self.article.id, self.user.id, liked=False)
+
+        self.assertEqual(buffer.pending([self.article.id, 0], self.user.id), {self.article.id: False})
+        self.assertEqual(buffer.pending([self.article.id], self.author_user.id), {})
+
+    def test_batch_from_crashed_flush_is_applied_again(self):
+        crashed = like_buffer.RedisLikeBuffer(client=self.client)
+        crashed.record(self.article.id, self.user.id, liked=True)
+        batch = crashed.take()
+        like_buffer.apply(batch)
+
+        flushed = like_buffer.flush(like_buffer.RedisLikeBuffer(client=self.client))
+
+        self.article.refresh_from_db()
+        self.assertEqual(flushed, 1)
+        self.assertEqual(self.article.like_count, 1)
+        self.assertEqual(self.article.like.count(), 1)
+        self.assertEqual(NotificationOutbox.objects.count(), 1)
+        self.assertEqual(self.client.data, {})
@@ -0,0 +1,89 @@
+import threading
+
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.contrib.auth import get_user_model
+
+from core.models import Article
+from article import likes
+
+
+class LikeToggleTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user('reader@gmail.com', 'testpassword')
+        cls.author_user = get_user_model().objects.create_author_user(
+            'authormail@gmail.com',
+            'testpassword'
+        )
+        cls.article = Article.objects.create(
+            title='A test article',
+            description='Test description for above article',
+            slug='SestSlug',
+            owner=cls.author_user
+        )
+
+    def test_repeated_like_and_unlike_are_no_ops(self):
+        self.assertEqual(likes.add(self.article.id, self.user.id), (True, 1))
+        self.assertEqual(likes.add(self.article.id, self.user.id), (False, 1))
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.like_count, 1)
+
+        self.assertEqual(likes.remove(self.article.id, self.user.id), (True, 0))
+        self.assertEqual(likes.remove(self.article.id, self.user.id), (False, 0))
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.like_count, 0)
+        self.assertFalse(self.article.like.exists())
+
+
+class LikeConcurrencyTests(TransactionTestCase):
+    threads = 8
+    rounds = 20
+
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db():
+            self.skipTest('in-memory SQLite locks the table for concurrent writers')
+        self.author_user = get_user_model().objects.create_author_user(
+            'authormail@gmail.com',
+            'testpassword'
+        )
+        self.users = [
+            get_user_model().objects.create_user(f'reader{i}@gmail.com', 'testpassword')
+            for i in range(4)
+        ]
+        self.article = Article.objects.create(
+            title='A test article',
+            description='Test description for above article',
+            slug='SestSlug',
+            owner=self.author_user
+        )
+
+    def hammer(self, start, errors):
+        try:
+            start.wait()
+            for i in range(self.rounds):
+                user = self.users[i % len(self.users)]
+                if i % 3 == 2:
+                    likes.remove(self.article.id, user.id)
+                else:
+                    likes.add(self.article.id, user.id)
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            connection.close()
+
+    def test_counter_matches_rows_under_concurrent_toggles(self):
+        start = threading.Barrier(self.threads)
+        errors = []
+        workers = [
+            threading.Thread(target=self.hammer, args=(start, errors)) for _ in range(self.threads)
+        ]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        self.assertEqual(errors, [])
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.like_count, self.article.like.count())
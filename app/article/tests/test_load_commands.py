@@ -0,0 +1,59 @@
+from io import StringIO
+
+from django.test import TestCase, LiveServerTestCase
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+
+from core.models import Article, Category, Comment
+from article.management.commands.load_test import percentile
+
+
+def generate(**options):
+    args = ['--seed', '1', '--prefix', 'test']
+    for name, value in options.items():
+        args += [f'--{name}', str(value)]
+    call_command('generate_content', *args, stdout=StringIO())
+
+
+class GenerateContentCommandTests(TestCase):
+
+    def test_generate_volumes(self):
+        generate(users=20, authors=3, categories=4, articles=30, likes=200, comments=50)
+
+        self.assertEqual(get_user_model().objects.filter(is_author=True).count(), 3)
+        self.assertEqual(get_user_model().objects.count(), 23)
+        self.assertEqual(Category.objects.count(), 4)
+        self.assertEqual(Article.objects.count(), 30)
+        self.assertEqual(Comment.objects.count(), 50)
+        self.assertFalse(Article.objects.filter(categories__isnull=True).exists())
+
+    def test_likes_are_skewed(self):
+        generate(users=200, authors=2, categories=2, articles=50, likes=1000, comments=0)
+
+        like_counts = sorted(
+            (article.like.count() for article in Article.objects.all()), reverse=True
+        )
+        self.assertGreater(like_counts[0], 5 * like_counts[len(like_counts) // 2])
+
+    def test_percentile(self):
+        samples = list(range(1, 101))
+
+        self.assertEqual(percentile(samples, 50), 50)
+        self.assertEqual(percentile(samples, 95), 95)
+        self.assertEqual(percentile([], 95), 0.0)
+
+
+class LoadTestCommandTests(LiveServerTestCase):
+
+    def test_reports_every_scenario(self):
+        generate(users=5, authors=2, categories=3, articles=10, likes=20, comments=5)
+        out = StringIO()
+
+        call_command(
+            'load_test', '--base-url', self.live_server_url, '--requests', '4',
+            '--concurrency', '1', '--user', 'test-user0@example.com', stdout=out
+        )
+
+        lines = out.getvalue().splitlines()
+        self.assertEqual([line.split()[0] for line in lines[1:]], ['list', 'filter', 'detail', 'like', 'comment'])
+        self.assertTrue(all(line.split()[2] == '0' for line in lines[1:]))
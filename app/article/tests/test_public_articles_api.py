@@ -1,4 +1,7 @@
+from datetime import timedelta
+
 from django.test import TestCase
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 
@@ -18,13 +21,16 @@ def detail_url(pk):
 
 class PublicArticlesAPITests(TestCase):
 
-    def setUp(self):
-        self.client = APIClient()
-        self.author_user = get_user_model().objects.create_author_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.author_user = get_user_model().objects.create_author_user(
             'authormail@gmail.com',
             'testpassword'
         )
 
+    def setUp(self):
+        self.client = APIClient()
+
     def test_view_article_detail(self):
         cate1 = Category.objects.create(title='sport', slug='sport', author=self.author_user)
         cate2 = Category.objects.create(title='global', slug='global', author=self.author_user)
@@ -69,4 +75,102 @@ class PublicArticlesAPITests(TestCase):
         self.assertIn(serializer1.data, res.data)
         self.assertNotIn(serializer2.data, res.data)
 
+    def test_filter_any_categories_without_duplicates(self):
+        cate1 = Category.objects.create(title='sport', slug='sport', author=self.author_user)
+        cate2 = Category.objects.create(title='global', slug='global', author=self.author_user)
+        article = Article.objects.create(
+            title='A new one',
+            description='a  description for article',
+            slug='testTitle',
+            owner=self.author_user,
+        )
+        article.categories.set((cate1.id, cate2.id))
+
+        res = self.client.get(ARTICLE_URL, {'categories': f'{cate1.id},{cate2.id}'})
+
+        self.assertEqual(len(res.data), 1)
+
+    def test_filter_all_categories(self):
+        cate1 = Category.objects.create(title='sport', slug='sport', author=self.author_user)
+        cate2 = Category.objects.create(title='global', slug='global', author=self.author_user)
+        article1 = Article.objects.create(
+            title='A new one',
+            description='a  description for article',
+            slug='testTitle',
+            owner=self.author_user,
+        )
+        article2 = Article.objects.create(
+            title='Another Test Article',
+            description='description for another test article',
+            slug='anotherslug',
+            owner=self.author_user,
+        )
+        article1.categories.set((cate1.id, cate2.id))
+        article2.categories.set((cate1.id,))
+
+        res = self.client.get(ARTICLE_URL, {'categories_all': f'{cate1.id},{cate2.id},{cate1.id}'})
+
+        self.assertEqual([item['id'] for item in res.data], [article1.id])
+
+    def test_filter_malformed_categories(self):
+        res = self.client.get(ARTICLE_URL, {'categories': '1,abc'})
+        res_all = self.client.get(ARTICLE_URL, {'categories_all': '1,'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(res_all.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def create_article(self, slug, **params):
+        return Article.objects.create(
+            title='A new one',
+            description='a  description for article',
+            slug=slug,
+            owner=self.author_user,
+            **params
+        )
+
+    def test_order_by_publish_date(self):
+        older = self.create_article('older', publish_date=timezone.now() - timedelta(days=2))
+        newer = self.create_article('newer')
+
+        res = self.client.get(ARTICLE_URL, {'ordering': '-publish_date'})
+        res_asc = self.client.get(ARTICLE_URL, {'ordering': 'publish_date'})
+
+        self.assertEqual([item['id'] for item in res.data], [newer.id, older.id])
+        self.assertEqual([item['id'] for item in res_asc.data], [older.id, newer.id])
+
+    def test_order_by_like_and_comment_count(self):
+        liked = self.create_article('liked')
+        commented = self.create_article('commented')
+        liked.like.set((self.author_user.id,))
+        Comment.objects.create(article=commented, author=self.author_user, body='One')
+        Comment.objects.create(article=commented, author=self.author_user, body='Two')
+
+        res_likes = self.client.get(ARTICLE_URL, {'ordering': '-like_count'})
+        res_comments = self.client.get(ARTICLE_URL, {'ordering': '-comment_count'})
+
+        self.assertEqual([item['id'] for item in res_likes.data], [liked.id, commented.id])
+        self.assertEqual([item['id'] for item in res_comments.data], [commented.id, liked.id])
+        self.assertEqual(res_comments.data[0]['comment_count'], 2)
+
+    def test_unindexed_ordering_rejected(self):
+        res = self.client.get(ARTICLE_URL, {'ordering': 'description'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_filter_publish_date_range(self):
+        self.create_article('old', publish_date=timezone.now() - timedelta(days=10))
+        recent = self.create_article('recent', publish_date=timezone.now() - timedelta(days=2))
+        self.create_article('latest')
+        params = {
+            'published_after': (timezone.now() - timedelta(days=7)).isoformat(),
+            'published_before': (timezone.now() - timedelta(days=1)).isoformat(),
+        }
+
+        res = self.client.get(ARTICLE_URL, params)
+
+        self.assertEqual([item['id'] for item in res.data], [recent.id])
+
+    def test_filter_invalid_publish_date(self):
+        res = self.client.get(ARTICLE_URL, {'published_after': 'last week'})
 
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
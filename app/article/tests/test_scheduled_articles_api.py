@@ -0,0 +1,102 @@
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.contrib.auth import get_user_model
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Article
+from article import list_cache
+
+
+ARTICLE_URL = reverse('article:article-list')
+
+
+def detail_url(pk):
+    return reverse('article:article-detail', args=[pk])
+
+
+class ScheduledArticlesApiTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author_user = get_user_model().objects.create_author_user(
+            'authormail@gmail.com',
+            'testpassword'
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.published = self.create_article('published')
+        self.scheduled = self.create_article('scheduled', publish_date=timezone.now() + timedelta(hours=1))
+
+    def create_article(self, slug, **params):
+        return Article.objects.create(
+            title='A test article',
+            description='Test description for above article',
+            slug=slug,
+            owner=self.author_user,
+            **params
+        )
+
+    def test_list_hides_scheduled_articles(self):
+        res = self.client.get(ARTICLE_URL)
+
+        self.assertEqual([item['id'] for item in res.data], [self.published.id])
+
+    def test_detail_hides_scheduled_articles(self):
+        res = self.client.get(detail_url(self.scheduled.id))
+
+        self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_owner_sees_own_scheduled_article(self):
+        self.client.force_authenticate(self.author_user)
+        res = self.client.get(detail_url(self.scheduled.id))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_list_cache_expires_at_next_publish(self):
+        now = timezone.now()
+        self.assertEqual(list_cache.ttl(now), list_cache.LIST_CACHE_TTL)
+
+        self.scheduled.publish_date = now + timedelta(seconds=30)
+        self.scheduled.save()
+        self.assertEqual(list_cache.ttl(now), 30)
+
+    @patch('article.list_cache.LIST_CACHE_TTL', 60)
+    def test_list_cache_ttl_without_scheduled_articles(self):
+        self.scheduled.delete()
+
+        self.assertEqual(list_cache.ttl(), 60)
+
+    def test_list_served_from_cache(self):
+        self.client.get(ARTICLE_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(ARTICLE_URL)
+        self.assertEqual(len(res.data), 1)
+
+    def test_list_cache_invalidated_on_write(self):
+        self.client.get(ARTICLE_URL)
+        with self.captureOnCommitCallbacks(execute=True):
+            article = self.create_article('another')
+
+        res = self.client.get(ARTICLE_URL)
+
+        self.assertIn(article.id, [item['id'] for item in res.data])
+
+    def test_list_cache_invalidated_after_commit_only(self):
+        before = list_cache.version()
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.create_article('another')
+
+        self.assertEqual(list_cache.version(), before)
+        for callback in callbacks:
+            callback()
+        self.assertGreater(list_cache.version(), before)
@@ -0,0 +1,109 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Article, ArticleScore, Comment
+
+
+TRENDING_URL = reverse('article:article-trending')
+
+
+class TrendingArticlesAPITests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author_user = get_user_model().objects.create_author_user(
+            'authormail@gmail.com',
+            'testpassword'
+        )
+        cls.reader = get_user_model().objects.create_user(
+            'reader@gmail.com',
+            'testpassword'
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def create_article(self, slug, **params):
+        return Article.objects.create(
+            title='A test article',
+            description='Test description for above article',
+            slug=slug,
+            owner=self.author_user,
+            **params
+        )
+
+    def test_refresh_scores_recent_activity(self):
+        quiet = self.create_article('quiet')
+        liked = self.create_article('liked')
+        commented = self.create_article('commented')
+        liked.like.set((self.reader.id, self.author_user.id))
+        Comment.objects.create(article=commented, author=self.reader, body='Nice')
+        Comment.objects.create(article=commented, author=self.reader, body='Again')
+
+        call_command('refresh_trending')
+
+        self.assertFalse(ArticleScore.objects.filter(article=quiet).exists())
+        self.assertGreater(
+            ArticleScore.objects.get(article=commented).score,
+            ArticleScore.objects.get(article=liked).score
+        )
+
+    def test_refresh_prunes_articles_out_of_window(self):
+        old = self.create_article('old', publish_date=timezone.now() - timedelta(days=30))
+        old.like.set((self.reader.id,))
+        ArticleScore.objects.create(article=old, score=10)
+
+        call_command('refresh_trending')
+
+        self.assertFalse(ArticleScore.objects.filter(article=old).exists())
+
+    def test_future_articles_not_scored(self):
+        scheduled = self.create_article('scheduled', publish_date=timezone.now() + timedelta(days=1))
+        scheduled.like.set((self.reader.id,))
+
+        call_command('refresh_trending')
+
+        self.assertFalse(ArticleScore.objects.filter(article=scheduled).exists())
+
+    def test_retrieve_trending_ordered_by_score(self):
+        low = self.create_article('low')
+        high = self.create_article('high')
+        self.create_article('unscored')
+        ArticleScore.objects.create(article=low, score=1.5)
+        ArticleScore.objects.create(article=high, score=7.25)
+
+        res = self.client.get(TRENDING_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['id'] for item in res.data], [high.id, low.id])
+        self.assertEqual(res.data[0]['score'], 7.25)
+        self.assertNotIn('like', res.data[0])
+
+    def test_trending_limit(self):
+        for i in range(3):
+            article = self.create_article(f'slug{i}')
+            ArticleScore.objects.create(article=article, score=i)
+
+        res = self.client.get(TRENDING_URL, {'limit': 2})
+
+        self.assertEqual(len(res.data), 2)
+
+    def test_trending_invalid_limit(self):
+        res = self.client.get(TRENDING_URL, {'limit': 'many'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_trending_single_query(self):
+        article = self.create_article('scored')
+        ArticleScore.objects.create(article=article, score=1)
+
+        with self.assertNumQueries(1):
+            self.client.get(TRENDING_URL)
@@ -0,0 +1,113 @@
+import os
+import hashlib
+
+from PIL import Image
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+
+from core.models import ImageUpload
+
+
+MAX_IMAGE_SIZE = 20 * 1024 * 1024
+READ_SIZE = 64 * 1024
+
+
+class UploadError(Exception):
+    pass
+
+
+class OffsetMismatch(UploadError):
+    pass
+
+
+def partial_dir():
+    return settings.UPLOAD_PARTIAL_DIR
+
+
+def partial_path(upload):
+    return os.path.join(partial_dir(), str(upload.id))
+
+
+def file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as fh:
+        for block in iter(lambda: fh.read(READ_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def start(article, filename, size, sha256):
+    """
+    Open a session. The declared hash is only trusted once the bytes arrived
+    and matched it.
+    """
+    if size > MAX_IMAGE_SIZE:
+        raise UploadError(f'Images are limited to {MAX_IMAGE_SIZE} bytes')
+    return ImageUpload.objects.create(article=article, filename=filename, size=size, sha256=sha256)
+
+
+def append(upload_id, offset, stream, length):
+    """
+    Write one chunk at `offset` straight from the request stream. The session
+    row is locked so two chunks for the same upload never interleave.
+    """
+    with transaction.atomic():
+        upload = ImageUpload.objects.select_for_update().get(pk=upload_id)
+        if upload.completed:
+            return upload
+        if offset != upload.received:
+            raise OffsetMismatch(f'Expected offset {upload.received}')
+        if offset + length > upload.size:
+            raise UploadError('Chunk runs past the declared size')
+
+        os.makedirs(partial_dir(), exist_ok=True)
+        with open(partial_path(upload), 'ab') as fh:
+            fh.truncate(offset)
+            remaining = length
+            while remaining:
+                block = stream.read(min(READ_SIZE, remaining))
+                if not block:
+                    break
+                fh.write(block)
+                remaining -= len(block)
+        upload.received = offset + length - remaining
+        upload.save(update_fields=['received'])
+
+    if upload.received == upload.size:
+        finish(upload)
+
+    return upload
+
+
+def finish(upload):
+    """
+    Verify the assembled file, then hand it to storage. Stored names are the
+    SHA-256 of the bytes, identical content already stored is not written again.
+    """
+    path = partial_path(upload)
+    try:
+        if file_sha256(path) != upload.sha256:
+            raise UploadError('Checksum mismatch, upload restarted')
+
+        try:
+            with Image.open(path) as img:
+                img.verify()
+        except Exception:
+            raise UploadError('Upload a valid image')
+        article = upload.article
+        with open(path, 'rb') as fh:
+            article.image.save(upload.filename, File(fh), save=False)
+        article.save(update_fields=['image'])
+
+        upload.completed = True
+        upload.save(update_fields=['completed'])
+    except Exception:
+        # the partial file is gone either way, the client has to start over from offset 0
+        upload.received = 0
+        upload.save(update_fields=['received'])
+        raise
+    finally:
+        if os.path.exists(path):
+            os.remove(path)
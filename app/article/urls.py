@@ -8,6 +8,7 @@ router = DefaultRouter()
 router.register('categories', views.CategoryViewset)
 router.register('articles', views.ArticleViewSet)
 router.register('comments', views.CommentViewset)
+router.register('feed', views.FeedViewset, basename='feed')
 
 
 app_name = 'article'
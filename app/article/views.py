@@ -1,14 +1,37 @@
+from django.db import transaction
+from django.db.models import Count, Exists, OuterRef
+from django.http import FileResponse, Http404, HttpResponseRedirect, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from rest_framework import viewsets, mixins, status
+from rest_framework import viewsets, mixins, status, serializers as drf_serializers
+from rest_framework.exceptions import ValidationError
 from rest_framework.authentication import TokenAuthentication
-from rest_framework.permissions import IsAuthenticated
+from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from rest_framework.pagination import CursorPagination
 
-from core.models import Category, Article, Comment
+from core.models import Category, Article, Comment, FeedEntry, ImageUpload, NotificationOutbox
+from core.storage import IMMUTABLE_CACHE_CONTROL
 from article import serializers
+from article import feed
+from article import export
+from article import list_cache
+from article import uploads
+from article import renditions
+from article import notifications
+from article import likes
+from article import like_buffer
+from article import events
+from article.renderers import EventStreamRenderer
 from article import permissions as CustomePermissions
 
 
+ArticleCategory = Article.categories.through
+ArticleLike = Article.like.through
+
+
 class CategoryViewset(viewsets.GenericViewSet, mixins.ListModelMixin, mixins.CreateModelMixin):
     authentication_classes = (TokenAuthentication,)
     permission_classes = (IsAuthenticated, CustomePermissions.AuthorAccessPermission)
@@ -16,44 +39,139 @@ class CategoryViewset(viewsets.GenericViewSet, mixins.ListModelMixin, mixins.Cre
     queryset = Category.objects.all()
 
     def get_queryset(self):
+        if self.action == 'follow':
+            return self.queryset
         return self.queryset.filter(author=self.request.user)
 
+    def get_permissions(self):
+        if self.action == 'follow':
+            return [IsAuthenticated()]
+        return super().get_permissions()
+
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
+    @action(methods=['POST', 'DELETE'], detail=True, url_path='follow')
+    def follow(self, request, pk=None):
+        category = self.get_object()
+        if request.method == 'DELETE':
+            category.followers.remove(request.user)
+        else:
+            category.followers.add(request.user)
+        feed.rebuild(request.user)
+
+        return Response(
+            {'id': category.id, 'following': request.method != 'DELETE'},
+            status=status.HTTP_200_OK
+        )
+
     
 class ArticleViewSet(viewsets.ModelViewSet):
 
     serializer_class = serializers.ArticleSerializer
     queryset = Article.objects.all()
     authentication_classes = [TokenAuthentication]
+    trending_limit = 20
+    trending_max_limit = 100
+    # every ordering has a matching (-field, -id) index on Article
+    orderings = {
+        'publish_date': ('publish_date', 'id'),
+        'like_count': ('like_count', 'id'),
+        'comment_count': ('comment_count', 'id'),
+    }
+    # columns each write action reads, publish_date is needed by the post_save feed signal
+    write_fields = {
+        'destroy': ('id', 'owner', 'publish_date', 'deleted_on'),
+        'upload_image': ('id', 'owner', 'publish_date', 'image'),
+        'start_upload': ('id', 'owner'),
+        'upload_chunk': ('id', 'owner'),
+        'add_like': ('id', 'owner'),
+    }
 
-    def _ids_to_intiger(self, string):
-        return [int(str_id) for str_id in string.split(',')]
+    def _ids_to_intiger(self, string, param='categories'):
+        try:
+            return {int(str_id) for str_id in string.split(',')}
+        except ValueError:
+            raise ValidationError({param: 'Expected a comma separated list of ids.'})
 
     def get_queryset(self):
         categories = self.request.query_params.get('categories')
+        categories_all = self.request.query_params.get('categories_all')
         queryset = self.queryset
+        if self.action == 'list':
+            queryset = queryset.published()
+        elif self.action in ('retrieve', 'add_like', 'image', 'stream'):
+            queryset = queryset.visible_to(self.request.user)
+        if self.action in self.write_fields:
+            queryset = queryset.only(*self.write_fields[self.action])
         if categories:
             cat_ids = self._ids_to_intiger(categories)
-            queryset = queryset.filter(categories__id__in=cat_ids)
+            queryset = queryset.filter(Exists(
+                ArticleCategory.objects.filter(article_id=OuterRef('pk'), category_id__in=cat_ids)
+            ))
+        if categories_all:
+            cat_ids = self._ids_to_intiger(categories_all, 'categories_all')
+            queryset = queryset.filter(pk__in=ArticleCategory.objects.filter(
+                category_id__in=cat_ids
+            ).values('article_id').annotate(
+                matched=Count('category_id')
+            ).filter(matched=len(cat_ids)).values('article_id'))
+
+        queryset = self._filter_publish_date(queryset)
+
+        ordering = self.request.query_params.get('ordering')
+        if ordering:
+            queryset = queryset.order_by(*self._ordering_fields(ordering))
 
         return queryset
 
+    def _parse_datetime(self, param):
+        value = self.request.query_params.get(param)
+        if not value:
+            return None
+        try:
+            return drf_serializers.DateTimeField().to_internal_value(value)
+        except drf_serializers.ValidationError as exc:
+            raise ValidationError({param: exc.detail})
+
+    def _filter_publish_date(self, queryset):
+        published_after = self._parse_datetime('published_after')
+        published_before = self._parse_datetime('published_before')
+        if published_after:
+            queryset = queryset.filter(publish_date__gte=published_after)
+        if published_before:
+            queryset = queryset.filter(publish_date__lt=published_before)
+
+        return queryset
+
+    def _ordering_fields(self, ordering):
+        descending = ordering.startswith('-')
+        fields = self.orderings.get(ordering.lstrip('-'))
+        if fields is None:
+            raise ValidationError({
+                'ordering': f'Unsupported ordering, choose from {", ".join(sorted(self.orderings))}.'
+            })
+
+        return [f'-{field}' if descending else field for field in fields]
+
     def get_serializer_class(self):
         if self.action == 'retrieve':
             return serializers.ArticleDetailSerializer
         elif self.action == 'upload_image':
             return serializers.ArticleImageSerializer
-        elif self.action == 'add_like':
-            return serializers.ArticleAddLikeSerializer
+        elif self.action == 'trending':
+            return serializers.TrendingArticleSerializer
+        elif self.action in ('start_upload', 'upload_chunk'):
+            return serializers.ImageUploadSerializer
         return self.serializer_class
 
     def get_permissions(self):
-        if self.action == "list" or  self.action == "retrieve":
+        if self.action in ("list", "retrieve", "trending", "image", "stream"):
             permission_classes = []
         elif self.action == "add_like":
             permission_classes = (IsAuthenticated,)
+        elif self.action == "export_content":
+            permission_classes = (IsAdminUser,)
         else:
             permission_classes = (CustomePermissions.AuthorAccessPermission,)
 
@@ -62,6 +180,129 @@ class ArticleViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user)
 
+    def perform_destroy(self, instance):
+        instance.soft_delete()
+
+    def retrieve(self, request, *args, **kwargs):
+        response = super().retrieve(request, *args, **kwargs)
+        self._merge_pending_likes([response.data])
+        return response
+
+    def list(self, request, *args, **kwargs):
+        list_key = list_cache.key(request)
+        data = list_cache.get(list_key)
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            list_cache.store(list_key, data)
+        self._merge_pending_likes(data)
+
+        return Response(data)
+
+    def _merge_pending_likes(self, articles):
+        """Cached and stored likes plus the caller's own buffered toggles, so a like shows up at once"""
+        if like_buffer.enabled() and self.request.user.is_authenticated:
+            like_buffer.merge_pending(articles, self.request.user.id)
+
+    def _trending_limit(self):
+        limit = self.request.query_params.get('limit')
+        if limit is None:
+            return self.trending_limit
+        try:
+            limit = int(limit)
+        except ValueError:
+            raise ValidationError({'limit': 'A valid integer is required.'})
+        return max(1, min(limit, self.trending_max_limit))
+
+    @action(methods=['GET'], detail=False, url_path='trending')
+    def trending(self, request):
+        """Articles ranked by the score table kept by `refresh_trending`"""
+        articles = Article.objects.select_related('trending').filter(
+            trending__isnull=False
+        ).only(
+            'id', 'title', 'slug', 'owner', 'publish_date', 'trending__score'
+        ).order_by('-trending__score')[:self._trending_limit()]
+        serializer = self.get_serializer(articles, many=True)
+
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @action(methods=['GET'], detail=False, url_path='export')
+    def export_content(self, request):
+        """Stream every article or comment, `?dataset=articles|comments&output=ndjson|csv`"""
+        dataset = request.query_params.get('dataset', 'articles')
+        output = request.query_params.get('output', 'ndjson')
+        if dataset not in export.DATASETS or output not in export.OUTPUTS:
+            raise ValidationError({
+                'dataset': sorted(export.DATASETS),
+                'output': sorted(export.OUTPUTS)
+            })
+        lines, content_type = export.export(dataset, output)
+        response = StreamingHttpResponse(lines, content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{dataset}.{output}"'
+
+        return response
+
+    def _rendition_params(self):
+        params = self.request.query_params
+        try:
+            width = int(params.get('width', renditions.ALLOWED_WIDTHS[-1]))
+            quality = int(params.get('quality', renditions.DEFAULT_QUALITY))
+        except ValueError:
+            raise ValidationError({'detail': 'width and quality must be integers.'})
+        output = params.get('output', 'jpeg')
+        if width not in renditions.ALLOWED_WIDTHS:
+            raise ValidationError({'width': f'Choose from {list(renditions.ALLOWED_WIDTHS)}.'})
+        if output not in renditions.FORMATS:
+            raise ValidationError({'output': f'Choose from {sorted(renditions.FORMATS)}.'})
+        if not 30 <= quality <= 95:
+            raise ValidationError({'quality': 'Must be between 30 and 95.'})
+
+        return width, output, quality
+
+    @action(methods=['GET'], detail=True, url_path='image')
+    def image(self, request, pk=None):
+        """
+        Article image resized to `width`, rendered once and served from the
+        rendition cache. Only URLs carrying the image version `v` are cached
+        for good, the id URL redirects there and changes with the image.
+        """
+        width, output, quality = self._rendition_params()
+        article = self.get_object()
+        if not article.image:
+            raise Http404
+        version = renditions.version(article.image.name)
+        if request.query_params.get('v') != version:
+            params = request.query_params.copy()
+            params['v'] = version
+            response = HttpResponseRedirect(f'{request.path}?{params.urlencode()}')
+            response['Cache-Control'] = 'no-cache'
+            return response
+
+        try:
+            rendition = renditions.open_rendition(article.image.name, width, output, quality)
+        except FileNotFoundError:
+            raise Http404
+        response = FileResponse(rendition, content_type=renditions.FORMATS[output][1])
+        response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+
+        return response
+
+    @action(methods=['GET'], detail=True, url_path='stream', renderer_classes=[EventStreamRenderer])
+    def stream(self, request, pk=None):
+        """Server-sent events with new comments and like counts, replaces polling the detail endpoint"""
+        article = self.get_object()
+        last_event_id = request.headers.get('Last-Event-ID')
+        try:
+            last_event_id = int(last_event_id) if last_event_id else None
+        except ValueError:
+            last_event_id = None
+        response = StreamingHttpResponse(
+            events.stream(article.id, last_event_id), content_type=EventStreamRenderer.media_type
+        )
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'
+
+        return response
+
     @action(methods=['POST'], detail=True, url_path='upload-image')
     def upload_image(self, request, pk=None):
         article = self.get_object()
@@ -81,38 +322,143 @@ class ArticleViewSet(viewsets.ModelViewSet):
             status=status.HTTP_400_BAD_REQUEST
         )
 
+    @action(methods=['POST'], detail=True, url_path='uploads')
+    def start_upload(self, request, pk=None):
+        """Open a resumable upload, identical content already stored is reused once it arrived"""
+        article = self.get_object()
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            upload = uploads.start(article, **serializer.validated_data)
+        except uploads.UploadError as exc:
+            raise ValidationError({'size': str(exc)})
+
+        return Response(self.get_serializer(upload).data, status=status.HTTP_201_CREATED)
+
+    @action(methods=['GET', 'PATCH'], detail=True, url_path=r'uploads/(?P<upload_id>[0-9a-f-]+)')
+    def upload_chunk(self, request, pk=None, upload_id=None):
+        """GET reports the received offset, PATCH appends a raw chunk at `Upload-Offset`"""
+        article = self.get_object()
+        upload = get_object_or_404(ImageUpload, pk=upload_id, article=article)
+        if request.method == 'GET':
+            return Response(self.get_serializer(upload).data, status=status.HTTP_200_OK)
+
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+            length = int(request.META.get('CONTENT_LENGTH') or 0)
+        except ValueError:
+            raise ValidationError({'Upload-Offset': 'A valid integer is required.'})
+        if not length:
+            raise ValidationError({'detail': 'Empty chunk.'})
+        try:
+            upload = uploads.append(upload.id, offset, request.stream, length)
+        except uploads.OffsetMismatch:
+            upload.refresh_from_db()
+            return Response(self.get_serializer(upload).data, status=status.HTTP_409_CONFLICT)
+        except uploads.UploadError as exc:
+            raise ValidationError({'detail': str(exc)})
+
+        return Response(self.get_serializer(upload).data, status=status.HTTP_200_OK)
+
     @action(methods=['PATCH', 'DELETE'], detail=True, url_path='add-like')
     def add_like(self, request, pk=None):
+        """PATCH likes, DELETE unlikes, repeating either is a no-op"""
         article = self.get_object()
-        serializer = self.get_serializer(
-            article,
-            data={"like": [self.request.user.id]}
-        )            
-        if serializer.is_valid():
-            serializer.save()
-            return Response(
-                serializer.data,
-                status=status.HTTP_200_OK
-            )
+        liked = request.method != 'DELETE'
+        if like_buffer.enabled():
+            like_buffer.record(article.id, request.user.id, liked=liked)
+            like_count = self._buffered_like_count(article.id, liked)
+        else:
+            with transaction.atomic():
+                if not liked:
+                    _, like_count = likes.remove(article.id, request.user.id)
+                else:
+                    added, like_count = likes.add(article.id, request.user.id)
+                    if added:
+                        notifications.enqueue(article, request.user, NotificationOutbox.LIKE)
+
         return Response(
-            serializer.errors,
-            status=status.HTTP_400_BAD_REQUEST    
-        )    
+            {'id': article.id, 'liked': liked, 'like_count': like_count},
+            status=status.HTTP_200_OK
+        )
+
+    def _buffered_like_count(self, article_id, liked):
+        """Stored counter with the caller's toggle applied, checked against their stored like row"""
+        stored_like = ArticleLike.objects.filter(article_id=OuterRef('pk'), user_id=self.request.user.id)
+        like_count, stored = Article.all_objects.filter(pk=article_id).annotate(
+            stored=Exists(stored_like)
+        ).values_list('like_count', 'stored').get()
+        return like_count - stored + liked
+
+
+class CommentPagination(CursorPagination):
+    """Keyset pages over the (author, -created_on, -id) index, no OFFSET scans for prolific users"""
+    ordering = ('-created_on', '-id')
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
 
 
 class CommentViewset(viewsets.ModelViewSet):
     authentication_classes = (TokenAuthentication,)
     permission_classes = (IsAuthenticated,)
     serializer_class = serializers.CommentSerializer
+    pagination_class = CommentPagination
     queryset = Comment.objects.all()
 
+    def _expand_article(self):
+        return self.action == 'list' and self.request.query_params.get('expand') == 'article'
+
     def get_serializer_class(self):
         if self.action == "retrieve":
             return serializers.CommentDetailSerializer
+        elif self._expand_article():
+            return serializers.CommentWithArticleSerializer
         return self.serializer_class
 
     def get_queryset(self):
-        return self.queryset.filter(author=self.request.user)
+        queryset = self.queryset.filter(author=self.request.user)
+        if self._expand_article():
+            queryset = queryset.select_related('article').only(
+                'id', 'body', 'author', 'created_on',
+                'article__id', 'article__title', 'article__slug', 'article__publish_date'
+            )
+        return queryset
 
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user)
\ No newline at end of file
+        with transaction.atomic():
+            comment = serializer.save(author=self.request.user)
+            notifications.enqueue(comment.article, self.request.user, NotificationOutbox.COMMENT)
+
+    def perform_destroy(self, instance):
+        instance.soft_delete()
+
+
+class FeedPagination(CursorPagination):
+    ordering = '-publish_date'
+    page_size = 20
+
+
+class FeedViewset(viewsets.GenericViewSet, mixins.ListModelMixin):
+    """Latest articles in the categories the user follows"""
+    authentication_classes = (TokenAuthentication,)
+    permission_classes = (IsAuthenticated,)
+    serializer_class = serializers.ArticleSerializer
+    pagination_class = FeedPagination
+    queryset = FeedEntry.objects.all()
+
+    def get_queryset(self):
+        user = self.request.user
+        if feed.is_heavy_follower(user):
+            return feed.merged_articles(user).prefetch_related('categories', 'like')
+        return self.queryset.filter(
+            user=user,
+            publish_date__lte=timezone.now(),
+            article__deleted_on__isnull=True
+        ).select_related('article').prefetch_related('article__categories', 'article__like')
+
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if queryset.model is FeedEntry:
+            return [entry.article for entry in page]
+        return page
@@ -1,13 +1,59 @@
+import json
+
 from django.contrib import admin
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
 from django.utils.translation import gettext as _
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 
 from core import models
 
 
+# below this many rows an exact count is cheap enough
+ESTIMATE_THRESHOLD = 10000
+
+
+def estimated_count(queryset):
+    """Row estimate of the Postgres planner, None on other databases"""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    COUNT(*) on Postgres reads every live row, on the article, comment and
+    like tables that is most of a changelist request. Large results are
+    paged with the planner estimate instead, so the last page number is
+    approximate.
+    """
+
+    @cached_property
+    def count(self):
+        estimate = estimated_count(self.object_list)
+        if estimate is not None and estimate > ESTIMATE_THRESHOLD:
+            return estimate
+        return super().count
+
+
+class LargeTableAdmin(admin.ModelAdmin):
+    paginator = EstimatedCountPaginator
+    # skips the second, unfiltered count next to the search box
+    show_full_result_count = False
+
+
 class UserAdmin(BaseUserAdmin):
     ordering = ['id']
     list_display = ['email', 'name']
+    search_fields = ['email__exact']
     fieldsets = (
         (None, {'fields': ('email', 'password')}),
         (_('Personal Info'), {'fields': ('name',)}),
@@ -25,7 +71,63 @@ class UserAdmin(BaseUserAdmin):
     )
 
 
+class QueryStatAdmin(admin.ModelAdmin):
+    """Read only view of the fingerprints collected with QUERY_STATS"""
+    ordering = ['-total_ms']
+    list_display = ['fingerprint', 'endpoint', 'count', 'total_ms', 'avg_ms', 'p95_ms', 'max_ms']
+    list_filter = ['endpoint']
+    search_fields = ['endpoint', 'sql']
+    readonly_fields = ['fingerprint', 'endpoint', 'sql', 'count', 'total_ms', 'max_ms', 'p95_ms', 'updated_on']
+    exclude = ['histogram']
+
+    @admin.display(description='avg ms')
+    def avg_ms(self, obj):
+        return round(obj.total_ms / obj.count, 2) if obj.count else 0
+
+    @admin.display(description='p95 ms')
+    def p95_ms(self, obj):
+        return obj.p95_ms
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+class CategoryAdmin(admin.ModelAdmin):
+    ordering = ['title']
+    list_display = ['title', 'slug', 'author']
+    list_select_related = ['author']
+    # exact and prefix lookups stay on the unique indexes, icontains can not
+    search_fields = ['slug__exact', 'title__startswith']
+    raw_id_fields = ['author']
+    # followers change through the follow endpoint, which keeps follow counts and feeds in step
+    exclude = ['followers']
+    readonly_fields = ['follower_count']
+
+    @admin.display(description=_('Followers'))
+    def follower_count(self, category):
+        return category.followers.count()
+
+
+class ArticleAdmin(LargeTableAdmin):
+    list_display = ['title', 'slug', 'owner', 'publish_date', 'like_count', 'comment_count']
+    list_select_related = ['owner']
+    search_fields = ['slug__exact', 'title__startswith']
+    raw_id_fields = ['owner', 'like']
+    autocomplete_fields = ['categories']
+
+
+class CommentAdmin(LargeTableAdmin):
+    list_display = ['id', 'article', 'author', 'created_on']
+    list_select_related = ['article', 'author']
+    search_fields = ['article__slug__exact', 'author__email__exact']
+    raw_id_fields = ['article', 'author']
+
+
 admin.site.register(models.User, UserAdmin)
-admin.site.register(models.Category)
-admin.site.register(models.Article)
-admin.site.register(models.Comment)
+admin.site.register(models.Category, CategoryAdmin)
+admin.site.register(models.Article, ArticleAdmin)
+admin.site.register(models.Comment, CommentAdmin)
+admin.site.register(models.QueryStat, QueryStatAdmin)
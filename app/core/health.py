@@ -0,0 +1,82 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.db import connection
+
+
+CHECK_TIMEOUT = 1
+RESULT_TTL = 5
+PROBE_KEY = 'readyz:probe'
+
+_pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix='readyz')
+_lock = threading.Lock()
+_in_flight = {}
+_result = None
+_expires = 0
+
+
+def check_database():
+    """Connecting is bounded by the connect_timeout option in DATABASES, the query by statement_timeout"""
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SET statement_timeout = %s', [int(CHECK_TIMEOUT * 1000)])
+            cursor.execute('SELECT 1')
+    finally:
+        connection.close()
+
+
+def check_cache():
+    cache.set(PROBE_KEY, 1, timeout=RESULT_TTL)
+    if cache.get(PROBE_KEY) != 1:
+        raise RuntimeError('cache did not return the probe value')
+
+
+def check_storage():
+    default_storage.exists(PROBE_KEY)
+
+
+CHECKS = {
+    'database': check_database,
+    'cache': check_cache,
+    'storage': check_storage,
+}
+
+
+def run_checks():
+    """
+    Every check runs in the pool at the same time, a hung dependency costs
+    CHECK_TIMEOUT at most. A check still running from an earlier probe is
+    reported as timed out rather than submitted again, so hung checks never
+    pile up in the pool.
+    """
+    futures = {}
+    for name, check in CHECKS.items():
+        future = _in_flight.get(name)
+        if future is None or future.done():
+            future = _in_flight[name] = _pool.submit(check)
+        futures[name] = future
+    deadline = time.monotonic() + CHECK_TIMEOUT
+    results = {}
+    for name, future in futures.items():
+        try:
+            future.result(timeout=max(deadline - time.monotonic(), 0))
+            results[name] = 'ok'
+        except TimeoutError:
+            results[name] = f'timed out after {CHECK_TIMEOUT}s'
+        except Exception as exc:
+            results[name] = f'{type(exc).__name__}: {exc}'
+    return results
+
+
+def readiness():
+    """Results are reused for RESULT_TTL seconds, so frequent probes cost almost nothing"""
+    global _result, _expires
+    with _lock:
+        if time.monotonic() >= _expires:
+            _result = run_checks()
+            _expires = time.monotonic() + RESULT_TTL
+        return _result
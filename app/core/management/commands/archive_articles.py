@@ -0,0 +1,74 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+from django.core.management.base import BaseCommand
+
+from core.models import Article, Comment, FeedEntry, ArchivedArticle, ArchivedComment
+
+
+class Command(BaseCommand):
+    help = 'Move articles published before a cutoff, with their comments, into the archive tables'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--older-than-days', type=int, default=365)
+        parser.add_argument('--batch-size', type=int, default=100)
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['older_than_days'])
+        archived = 0
+        while True:
+            article_ids = list(Article.objects.filter(
+                publish_date__lt=cutoff
+            ).order_by('publish_date').values_list('id', flat=True)[:options['batch_size']])
+            if not article_ids:
+                break
+            self.archive(article_ids)
+            archived += len(article_ids)
+
+        self.stdout.write(self.style.SUCCESS(f'Archived {archived} articles'))
+
+    def archive(self, article_ids):
+        """Copy and delete one batch in a single transaction, a batch is never half moved"""
+        categories = {}
+        for article_id, category_id in Article.categories.through.objects.filter(
+            article_id__in=article_ids
+        ).values_list('article_id', 'category_id'):
+            categories.setdefault(article_id, []).append(category_id)
+        likes = {}
+        for article_id, user_id in Article.like.through.objects.filter(
+            article_id__in=article_ids
+        ).values_list('article_id', 'user_id'):
+            likes.setdefault(article_id, []).append(user_id)
+
+        with transaction.atomic():
+            ArchivedArticle.objects.bulk_create([
+                ArchivedArticle(
+                    id=article.id,
+                    title=article.title,
+                    description=article.description,
+                    slug=article.slug,
+                    owner_id=article.owner_id,
+                    image=article.image.name or '',
+                    publish_date=article.publish_date,
+                    categories=categories.get(article.id, []),
+                    likes=likes.get(article.id, []),
+                )
+                for article in Article.objects.filter(pk__in=article_ids)
+            ], ignore_conflicts=True)
+            ArchivedComment.objects.bulk_create([
+                ArchivedComment(
+                    id=comment.id,
+                    article_id=comment.article_id,
+                    author_id=comment.author_id,
+                    body=comment.body,
+                    created_on=comment.created_on,
+                )
+                for comment in Comment.objects.filter(article_id__in=article_ids)
+            ], ignore_conflicts=True)
+
+            Comment.all_objects.filter(article_id__in=article_ids).delete()
+            Article.like.through.objects.filter(article_id__in=article_ids).delete()
+            Article.categories.through.objects.filter(article_id__in=article_ids).delete()
+            FeedEntry.objects.filter(article_id__in=article_ids).delete()
+            Article.all_objects.filter(pk__in=article_ids).delete()
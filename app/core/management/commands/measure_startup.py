@@ -0,0 +1,62 @@
+import json
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# Runs in a fresh interpreter, so every sample is a real cold start
+PROBE = '''
+import json, sys, time
+from wsgiref.util import setup_testing_defaults
+started = time.perf_counter()
+import django
+django.setup()
+setup = time.perf_counter()
+from app.wsgi import application
+loaded = time.perf_counter()
+environ = {'PATH_INFO': sys.argv[1], 'HTTP_HOST': sys.argv[2]}
+setup_testing_defaults(environ)
+status = []
+body = application(environ, lambda code, headers, exc_info=None: status.append(code))
+b''.join(body)
+body.close()
+served = time.perf_counter()
+print(json.dumps({
+    'setup': setup - started,
+    'wsgi': loaded - setup,
+    'first_request': served - loaded,
+    'total': served - started,
+    'status': status[0],
+}))
+'''
+
+PHASES = ('setup', 'wsgi', 'first_request', 'total')
+
+
+class Command(BaseCommand):
+    help = 'Measure cold start: django.setup, loading the WSGI app and serving the first request'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/api/user/me/', help='Path of the first request')
+        parser.add_argument('--host', default='localhost')
+        parser.add_argument('--runs', type=int, default=5)
+
+    def handle(self, *args, **options):
+        samples = [self.sample(options['path'], options['host']) for _ in range(options['runs'])]
+        self.stdout.write(f'First request {options["path"]} answered {samples[0]["status"]}')
+        self.stdout.write(f'{"phase":<16}{"median ms":>12}{"max ms":>12}')
+        for phase in PHASES:
+            values = [sample[phase] * 1000 for sample in samples]
+            self.stdout.write(f'{phase:<16}{statistics.median(values):>12.1f}{max(values):>12.1f}')
+
+    def sample(self, path, host):
+        result = subprocess.run(
+            [sys.executable, '-c', PROBE, path, host],
+            cwd=settings.BASE_DIR, capture_output=True, text=True
+        )
+        if result.returncode:
+            raise CommandError(result.stderr.strip().splitlines()[-1])
+        return json.loads(result.stdout.strip().splitlines()[-1])
@@ -0,0 +1,38 @@
+import io
+import os
+import pstats
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core import profiling
+
+
+class Command(BaseCommand):
+    help = 'Merge the sampled request profiles and show the hottest functions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dir', default=None, help='Profile directory, PROFILING_DIR by default')
+        parser.add_argument('--view', help='Only samples of url names containing this text, e.g. article-list')
+        parser.add_argument('--sort', choices=['tottime', 'cumulative', 'ncalls'], default='tottime')
+        parser.add_argument('--limit', type=int, default=30)
+        parser.add_argument(
+            '--match', help='Only functions whose file or name matches this regex, e.g. serializers'
+        )
+
+    def handle(self, *args, **options):
+        directory = options['dir'] or settings.PROFILING_DIR
+        paths = profiling.profiles(directory)
+        if options['view']:
+            view = options['view'].replace(':', '.')
+            paths = [path for path in paths if view in os.path.basename(path)]
+        if not paths:
+            raise CommandError(f'No profiles in {directory}')
+
+        report = io.StringIO()
+        stats = pstats.Stats(*paths, stream=report)
+        stats.sort_stats(options['sort'])
+        restrictions = [options['match'], options['limit']] if options['match'] else [options['limit']]
+        stats.print_stats(*restrictions)
+        self.stdout.write(f'{len(paths)} profiles from {directory}')
+        self.stdout.write(report.getvalue())
@@ -0,0 +1,55 @@
+import time
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+from django.core.management.base import BaseCommand
+
+from core.models import Article, Comment, FeedEntry
+
+
+def delete_in_batches(queryset, batch_size):
+    """Delete rows a batch at a time so no single transaction holds many locks"""
+    deleted = 0
+    manager = queryset.model._base_manager
+    while True:
+        pks = list(queryset.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            return deleted
+        with transaction.atomic():
+            manager.filter(pk__in=pks).delete()
+        deleted += len(pks)
+
+
+class Command(BaseCommand):
+    help = 'Permanently delete soft deleted articles and comments in small batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--grace-days', type=int, default=30, help='Keep soft deleted rows this long')
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--pause', type=float, default=0, help='Seconds to sleep between articles')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['grace_days'])
+        batch_size = options['batch_size']
+
+        comments = delete_in_batches(
+            Comment.all_objects.filter(deleted_on__lt=cutoff), batch_size
+        )
+        articles = 0
+        while True:
+            article_id = Article.all_objects.filter(
+                deleted_on__lt=cutoff
+            ).values_list('id', flat=True).first()
+            if article_id is None:
+                break
+            comments += delete_in_batches(Comment.all_objects.filter(article_id=article_id), batch_size)
+            delete_in_batches(Article.like.through.objects.filter(article_id=article_id), batch_size)
+            delete_in_batches(FeedEntry.objects.filter(article_id=article_id), batch_size)
+            with transaction.atomic():
+                Article.all_objects.filter(pk=article_id).delete()
+            articles += 1
+            if options['pause']:
+                time.sleep(options['pause'])
+
+        self.stdout.write(self.style.SUCCESS(f'Purged {articles} articles and {comments} comments'))
@@ -0,0 +1,45 @@
+from django.core.management.base import BaseCommand
+
+from core import query_stats
+from core.models import QueryStat
+
+
+ORDERS = {
+    'total': lambda stat: stat.total_ms,
+    'count': lambda stat: stat.count,
+    'p95': lambda stat: stat.p95_ms,
+    'max': lambda stat: stat.max_ms,
+}
+
+
+class Command(BaseCommand):
+    help = 'Show the query fingerprints that cost the most database time, per endpoint'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=20)
+        parser.add_argument('--order', choices=sorted(ORDERS), default='total')
+        parser.add_argument('--endpoint', help='Only endpoints containing this text, e.g. article-list')
+        parser.add_argument('--reset', action='store_true', help='Delete the collected stats afterwards')
+
+    def handle(self, *args, **options):
+        # stats this process collected itself, e.g. under `manage.py shell`
+        query_stats.flush()
+
+        stats = QueryStat.objects.all()
+        if options['endpoint']:
+            stats = stats.filter(endpoint__icontains=options['endpoint'])
+        stats = sorted(stats, key=ORDERS[options['order']], reverse=True)[:options['top']]
+
+        for stat in stats:
+            self.stdout.write(
+                f'{stat.total_ms:10.1f}ms total {stat.count:8d} calls '
+                f'{stat.total_ms / stat.count:8.2f}ms avg {stat.p95_ms:8.1f}ms p95  '
+                f'{stat.fingerprint}  {stat.endpoint}'
+            )
+            self.stdout.write(f'    {stat.sql}')
+        if not stats:
+            self.stdout.write('No query stats collected, run the app with QUERY_STATS=1')
+
+        if options['reset']:
+            deleted, _ = QueryStat.objects.all().delete()
+            self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} query stats'))
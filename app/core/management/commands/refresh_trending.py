@@ -0,0 +1,86 @@
+import time
+from collections import defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+from django.core.management.base import BaseCommand
+
+from core.models import Article, Comment, ArticleScore
+
+
+HALF_LIFE_HOURS = 24
+WINDOW_DAYS = 7
+LIKE_WEIGHT = 1.0
+COMMENT_WEIGHT = 2.0
+BATCH_SIZE = 500
+
+
+def decay(moment, now):
+    age = (now - moment).total_seconds() / 3600
+    return 0.5 ** (max(age, 0) / HALF_LIFE_HOURS)
+
+
+class Command(BaseCommand):
+    help = 'Recompute trending scores for articles active in the trending window'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval', type=int, default=0,
+            help='Keep running and refresh every N seconds'
+        )
+
+    def handle(self, *args, **options):
+        interval = options['interval']
+        while True:
+            count = self.refresh(timezone.now())
+            self.stdout.write(self.style.SUCCESS(f'Refreshed {count} trending scores'))
+            if not interval:
+                break
+            time.sleep(interval)
+
+    def refresh(self, now):
+        """
+        Only articles published or commented on inside the window are scored,
+        rows that dropped out of the window are pruned afterwards.
+        """
+        window_start = now - timedelta(days=WINDOW_DAYS)
+        scores = defaultdict(float)
+
+        articles = Article.objects.filter(
+            publish_date__gte=window_start,
+            publish_date__lte=now
+        ).values_list('id', 'publish_date', 'like_count')
+        for article_id, publish_date, like_count in articles.iterator():
+            if like_count:
+                scores[article_id] += LIKE_WEIGHT * like_count * decay(publish_date, now)
+
+        comments = Comment.objects.filter(
+            created_on__gte=window_start,
+            article__publish_date__lte=now
+        ).values_list('article_id', 'created_on')
+        for article_id, created_on in comments.iterator():
+            scores[article_id] += COMMENT_WEIGHT * decay(created_on, now)
+
+        with transaction.atomic():
+            article_ids = list(scores)
+            for start in range(0, len(article_ids), BATCH_SIZE):
+                self._write_batch(article_ids[start:start + BATCH_SIZE], scores, now)
+            ArticleScore.objects.filter(updated_on__lt=now).delete()
+
+        return len(scores)
+
+    def _write_batch(self, article_ids, scores, now):
+        existing = set(
+            ArticleScore.objects.filter(article_id__in=article_ids).values_list('article_id', flat=True)
+        )
+        to_update = [
+            ArticleScore(article_id=pk, score=scores[pk], updated_on=now)
+            for pk in article_ids if pk in existing
+        ]
+        to_create = [
+            ArticleScore(article_id=pk, score=scores[pk])
+            for pk in article_ids if pk not in existing
+        ]
+        ArticleScore.objects.bulk_update(to_update, ['score', 'updated_on'])
+        ArticleScore.objects.bulk_create(to_create)
@@ -1,20 +1,47 @@
 import time
 
-from django.db import connections
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
 from django.db.utils import OperationalError
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 
 
 class Command(BaseCommand):
+    help = 'Wait until the database accepts connections, optionally until migrations are applied'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS)
+        parser.add_argument('--timeout', type=float, default=60, help='Give up after this many seconds')
+        parser.add_argument('--delay', type=float, default=0.25, help='First retry delay, doubled on every attempt')
+        parser.add_argument('--max-delay', type=float, default=5)
+        parser.add_argument(
+            '--migrations', action='store_true',
+            help='Also wait until the separate migrate step has applied every migration'
+        )
 
     def handle(self, *args, **options):
         self.stdout.write('Waiting for database ...')
-        db_con = None
-        while not db_con:
+        connection = connections[options['database']]
+        deadline = time.monotonic() + options['timeout']
+        delay = options['delay']
+        while True:
             try:
-                db_con = connections['default']
+                connection.ensure_connection()
+                if not options['migrations'] or not self.pending_migrations(connection):
+                    break
+                reason = 'migrations pending'
             except OperationalError:
-                self.stdout.write('Database unavailable, waiting 1 second...')
-                time.sleep(1)
-            
-        self.stdout.write(self.style.SUCCESS('Database available!'))
\ No newline at end of file
+                reason = 'database unavailable'
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise CommandError(f'Gave up after {options["timeout"]:g} seconds, {reason}')
+            delay = min(delay, options['max_delay'], remaining)
+            self.stdout.write(f'{reason.capitalize()}, waiting {delay:g} seconds...')
+            time.sleep(delay)
+            delay *= 2
+
+        self.stdout.write(self.style.SUCCESS('Database available!'))
+
+    def pending_migrations(self, connection):
+        executor = MigrationExecutor(connection)
+        return executor.migration_plan(executor.loader.graph.leaf_nodes())
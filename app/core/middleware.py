@@ -0,0 +1,85 @@
+import cProfile
+
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connection
+
+from core import profiling, query_stats
+
+
+# token authenticated API and the load balancer probes
+SKIP_PREFIXES = ('/api/', '/healthz', '/readyz')
+
+
+class SiteOnlyMixin:
+    """
+    Skips the middleware for the token authenticated API and the health
+    probes, only the admin and other site pages need sessions, session
+    users and messages.
+    """
+
+    def __call__(self, request):
+        if request.path_info.startswith(SKIP_PREFIXES):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class SiteSessionMiddleware(SiteOnlyMixin, SessionMiddleware):
+    pass
+
+
+class SiteAuthenticationMiddleware(SiteOnlyMixin, AuthenticationMiddleware):
+    pass
+
+
+class SiteMessageMiddleware(SiteOnlyMixin, MessageMiddleware):
+    pass
+
+
+class QueryStatsMiddleware:
+    """Fingerprints and times the core queries of each request, see core/query_stats.py"""
+
+    def __init__(self, get_response):
+        if not settings.QUERY_STATS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with connection.execute_wrapper(query_stats.wrapper(request)):
+            response = self.get_response(request)
+        query_stats.flush_if_due()
+        return response
+
+
+class ProfilingMiddleware:
+    """Profiles sampled requests with cProfile, see core/profiling.py"""
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_RATE and not settings.PROFILING_TOKEN:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        name = profiling.wanted(request)
+        if name is None:
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # another profiler is running on this thread
+            return self.get_response(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+
+        try:
+            response['X-Profile-Id'] = profiling.save(profiler, name)
+        except OSError:
+            profiling.logger.exception('Could not write profile for %s', name)
+        return response
@@ -0,0 +1,22 @@
+# Generated by Django 3.2.25 on 2026-10-19 17:07
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0015_alter_article_like'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleScore',
+            fields=[
+                ('article', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='trending', serialize=False, to='core.article')),
+                ('score', models.FloatField(db_index=True)),
+                ('updated_on', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,57 @@
+# Generated by Django 3.2.25 on 2026-10-19 17:14
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Article = apps.get_model('core', 'Article')
+    Comment = apps.get_model('core', 'Comment')
+    likes = Article.like.through.objects.filter(
+        article_id=OuterRef('pk')
+    ).order_by().values('article_id').annotate(total=Count('*')).values('total')
+    comments = Comment.objects.filter(
+        article_id=OuterRef('pk')
+    ).order_by().values('article_id').annotate(total=Count('*')).values('total')
+    Article.objects.update(
+        like_count=Coalesce(Subquery(likes), 0),
+        comment_count=Coalesce(Subquery(comments), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_importcheckpoint'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='article',
+            name='core_articl_publish_031607_idx',
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='like_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['-publish_date', '-id'], name='core_articl_publish_b0bd85_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['-like_count', '-id'], name='core_articl_like_co_84a850_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['-comment_count', '-id'], name='core_articl_comment_18a0e9_idx'),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
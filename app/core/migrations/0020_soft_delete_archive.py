@@ -0,0 +1,80 @@
+# Generated by Django 3.2.25 on 2026-10-19 17:17
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_article_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedArticle',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=155)),
+                ('description', models.TextField()),
+                ('slug', models.SlugField(db_index=False, max_length=155)),
+                ('owner_id', models.BigIntegerField(db_index=True)),
+                ('image', models.CharField(blank=True, max_length=255)),
+                ('publish_date', models.DateTimeField()),
+                ('categories', models.JSONField(default=list)),
+                ('likes', models.JSONField(default=list)),
+                ('archived_on', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ArchivedComment',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('article_id', models.BigIntegerField(db_index=True)),
+                ('author_id', models.BigIntegerField()),
+                ('body', models.TextField()),
+                ('created_on', models.DateTimeField()),
+            ],
+        ),
+        migrations.RemoveIndex(
+            model_name='article',
+            name='core_articl_publish_b0bd85_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='article',
+            name='core_articl_like_co_84a850_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='article',
+            name='core_articl_comment_18a0e9_idx',
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='deleted_on',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='deleted_on',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('deleted_on__isnull', True)), fields=['-publish_date', '-id'], name='article_live_publish_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('deleted_on__isnull', True)), fields=['-like_count', '-id'], name='article_live_like_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('deleted_on__isnull', True)), fields=['-comment_count', '-id'], name='article_live_comment_count_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('deleted_on__isnull', False)), fields=['deleted_on'], name='article_deleted_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(condition=models.Q(('deleted_on__isnull', False)), fields=['deleted_on'], name='comment_deleted_idx'),
+        ),
+    ]
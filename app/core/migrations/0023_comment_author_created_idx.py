@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-19 17:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_notifications'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(condition=models.Q(('deleted_on__isnull', True)), fields=['author', '-created_on', '-id'], name='comment_author_created_idx'),
+        ),
+    ]
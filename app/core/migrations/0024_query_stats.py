@@ -0,0 +1,30 @@
+# Generated by Django 3.2.25 on 2026-10-19 17:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0023_comment_author_created_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QueryStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(max_length=16)),
+                ('endpoint', models.CharField(max_length=255)),
+                ('sql', models.TextField()),
+                ('count', models.PositiveBigIntegerField(default=0)),
+                ('total_ms', models.FloatField(default=0)),
+                ('max_ms', models.FloatField(default=0)),
+                ('histogram', models.JSONField(default=list)),
+                ('updated_on', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'unique_together': {('fingerprint', 'endpoint')},
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-19 17:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0024_query_stats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('deleted_on__isnull', True)), fields=['title'], name='article_title_prefix_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
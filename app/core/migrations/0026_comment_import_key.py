@@ -0,0 +1,18 @@
+# Generated by Django 3.2.25 on 2026-10-19 17:45
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_article_title_prefix_idx'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='import_key',
+            field=models.CharField(editable=False, max_length=40, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 3.2.25 on 2026-10-19 17:46
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_follow_counts(apps, schema_editor):
+    User = apps.get_model('core', 'User')
+    Category = apps.get_model('core', 'Category')
+    follows = Category.followers.through.objects.filter(
+        user_id=OuterRef('pk')
+    ).order_by().values('user_id').annotate(total=Count('*')).values('total')
+    User.objects.update(follow_count=Coalesce(Subquery(follows), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0026_comment_import_key'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='follow_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_follow_counts, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 3.2.25 on 2026-10-19 17:57
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0027_user_follow_count'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='article',
+            name='image_hash',
+        ),
+    ]
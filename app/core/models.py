@@ -1,7 +1,10 @@
 import uuid
 import os
 from django.utils import timezone
+from django.utils.text import Truncator
 from django.db import models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin, BaseUserManager
 from django.conf import settings
 
@@ -47,6 +50,8 @@ class User(AbstractBaseUser, PermissionsMixin):
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
     is_author = models.BooleanField(default=False)
+    # number of followed categories, kept by `article.feed.count_follows`
+    follow_count = models.PositiveIntegerField(default=0, editable=False)
 
     objects = UserManager()
     USERNAME_FIELD = "email"
@@ -56,11 +61,52 @@ class Category(models.Model):
     title = models.CharField(max_length=122, unique=True)
     slug = models.SlugField(max_length=155, unique=True)
     author = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE)
+    followers = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name='followed_categories', blank=True)
 
     def __str__(self):
         return self.title
 
 
+class ArticleQuerySet(models.QuerySet):
+
+    def published(self):
+        return self.filter(publish_date__lte=timezone.now())
+
+    def visible_to(self, user):
+        """Published articles, plus scheduled ones owned by the user"""
+        if user.is_anonymous:
+            return self.published()
+        return self.filter(models.Q(publish_date__lte=timezone.now()) | models.Q(owner=user))
+
+    def refresh_counters(self):
+        """Recompute like_count and comment_count from the like and comment tables"""
+        likes = self.model.like.through.objects.filter(
+            article_id=OuterRef('pk')
+        ).order_by().values('article_id').annotate(total=Count('*')).values('total')
+        comments = Comment.objects.filter(
+            article_id=OuterRef('pk'),
+            deleted_on__isnull=True
+        ).order_by().values('article_id').annotate(total=Count('*')).values('total')
+
+        return self.update(
+            like_count=Coalesce(Subquery(likes), 0),
+            comment_count=Coalesce(Subquery(comments), 0)
+        )
+
+
+class ArticleManager(models.Manager.from_queryset(ArticleQuerySet)):
+    """Hides soft deleted articles, `all_objects` still sees them"""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_on__isnull=True)
+
+
+class CommentManager(models.Manager):
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_on__isnull=True)
+
+
 class Article(models.Model):
     title = models.CharField(max_length=155)
     description = models.TextField()
@@ -70,16 +116,226 @@ class Article(models.Model):
     categories = models.ManyToManyField(Category, related_name='articles')
     like = models.ManyToManyField(settings.AUTH_USER_MODEL, related_name='likes', blank=True)
     publish_date = models.DateTimeField(default=timezone.now)
+    like_count = models.PositiveIntegerField(default=0, editable=False)
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    deleted_on = models.DateTimeField(null=True, blank=True, editable=False)
+
+    objects = ArticleManager()
+    all_objects = ArticleQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['-publish_date', '-id'], name='article_live_publish_idx',
+                condition=models.Q(deleted_on__isnull=True)
+            ),
+            models.Index(
+                fields=['-like_count', '-id'], name='article_live_like_count_idx',
+                condition=models.Q(deleted_on__isnull=True)
+            ),
+            models.Index(
+                fields=['-comment_count', '-id'], name='article_live_comment_count_idx',
+                condition=models.Q(deleted_on__isnull=True)
+            ),
+            models.Index(
+                fields=['deleted_on'], name='article_deleted_idx',
+                condition=models.Q(deleted_on__isnull=False)
+            ),
+            # title prefix search in the admin, a LIKE 'abc%' only uses a pattern ops index
+            models.Index(
+                fields=['title'], name='article_title_prefix_idx', opclasses=['varchar_pattern_ops'],
+                condition=models.Q(deleted_on__isnull=True)
+            ),
+        ]
 
     def __str__(self):
         return self.title
 
+    def soft_delete(self):
+        self.deleted_on = timezone.now()
+        self.save(update_fields=['deleted_on'])
+
 
 class Comment(models.Model):
     article = models.ForeignKey(Article, related_name='comments', on_delete=models.CASCADE)
     author = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='author', on_delete=models.CASCADE)
     body = models.TextField()
+    created_on = models.DateTimeField(default=timezone.now, editable=False)
+    deleted_on = models.DateTimeField(null=True, blank=True, editable=False)
+    # set by `import_content` so a re-run or resumed import skips comments it already wrote
+    import_key = models.CharField(max_length=40, null=True, unique=True, editable=False)
+
+    objects = CommentManager()
+    all_objects = models.Manager()
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['deleted_on'], name='comment_deleted_idx',
+                condition=models.Q(deleted_on__isnull=False)
+            ),
+            models.Index(
+                fields=['author', '-created_on', '-id'], name='comment_author_created_idx',
+                condition=models.Q(deleted_on__isnull=True)
+            ),
+        ]
+
+    def __str__(self):
+        # author_id, not author, so listing comments does not load a user per row
+        return 'Comment {} by {}'.format(Truncator(self.body).chars(50), self.author_id)
+
+    def soft_delete(self):
+        self.deleted_on = timezone.now()
+        self.save(update_fields=['deleted_on'])
+        Article.all_objects.filter(pk=self.article_id).update(
+            comment_count=Greatest(models.F('comment_count') - 1, 0)
+        )
+
+
+class ArticleScore(models.Model):
+    article = models.OneToOneField(Article, primary_key=True, related_name='trending', on_delete=models.CASCADE)
+    score = models.FloatField(db_index=True)
+    updated_on = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return 'Score {} for {}'.format(self.score, self.article_id)
+
+
+class FeedEntry(models.Model):
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='feed', on_delete=models.CASCADE)
+    article = models.ForeignKey(Article, related_name='+', on_delete=models.CASCADE)
+    publish_date = models.DateTimeField()
+
+    class Meta:
+        unique_together = ('user', 'article')
+        indexes = [models.Index(fields=['user', '-publish_date'])]
+
+    def __str__(self):
+        return 'Feed entry {} for {}'.format(self.article_id, self.user_id)
+
+
+class ImportCheckpoint(models.Model):
+    name = models.CharField(max_length=255, unique=True)
+    position = models.PositiveBigIntegerField(default=0)
+    updated_on = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return '{} at line {}'.format(self.name, self.position)
+
+
+class ArchivedArticle(models.Model):
+    """Cold copy of an Article moved out of the hot tables by `archive_articles`"""
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=155)
+    description = models.TextField()
+    slug = models.SlugField(max_length=155, db_index=False)
+    owner_id = models.BigIntegerField(db_index=True)
+    image = models.CharField(max_length=255, blank=True)
+    publish_date = models.DateTimeField()
+    categories = models.JSONField(default=list)
+    likes = models.JSONField(default=list)
+    archived_on = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.title
+
+
+class ArchivedComment(models.Model):
+    id = models.BigIntegerField(primary_key=True)
+    article_id = models.BigIntegerField(db_index=True)
+    author_id = models.BigIntegerField()
+    body = models.TextField()
+    created_on = models.DateTimeField()
+
+    def __str__(self):
+        return 'Archived comment {} on {}'.format(self.id, self.article_id)
+
+
+class ImageUpload(models.Model):
+    """Resumable upload session, chunks are appended to a partial file until `size` bytes arrived"""
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    article = models.ForeignKey(Article, related_name='uploads', on_delete=models.CASCADE)
+    filename = models.CharField(max_length=255)
+    size = models.PositiveBigIntegerField()
+    sha256 = models.CharField(max_length=64)
+    received = models.PositiveBigIntegerField(default=0)
+    completed = models.BooleanField(default=False)
     created_on = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return 'Comment {} by {}'.format(self.body, self.author.name)
\ No newline at end of file
+        return 'Upload {} for {}'.format(self.id, self.article_id)
+
+
+class NotificationOutbox(models.Model):
+    """One row per event, written in the request transaction and drained by `send_notifications`"""
+    LIKE = 'like'
+    COMMENT = 'comment'
+    KINDS = ((LIKE, 'Like'), (COMMENT, 'Comment'))
+
+    recipient = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='+', on_delete=models.CASCADE)
+    article = models.ForeignKey(Article, related_name='+', on_delete=models.CASCADE)
+    kind = models.CharField(max_length=16, choices=KINDS)
+    created_on = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return '{} on {} for {}'.format(self.kind, self.article_id, self.recipient_id)
+
+
+class Notification(models.Model):
+    """Digest of outbox events of one kind on one article, e.g. 50 new likes"""
+    recipient = models.ForeignKey(settings.AUTH_USER_MODEL, related_name='notifications', on_delete=models.CASCADE)
+    article = models.ForeignKey(Article, related_name='+', on_delete=models.CASCADE)
+    kind = models.CharField(max_length=16, choices=NotificationOutbox.KINDS)
+    count = models.PositiveIntegerField()
+    created_on = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [models.Index(fields=['recipient', '-created_on'])]
+
+    def __str__(self):
+        return '{} new {}s on {}'.format(self.count, self.kind, self.article_id)
+
+
+class QueryStat(models.Model):
+    """Totals for one SQL fingerprint on one endpoint, merged in by `core.query_stats.flush`"""
+    # upper bounds of the latency histogram buckets, the last bucket is open
+    BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    fingerprint = models.CharField(max_length=16)
+    endpoint = models.CharField(max_length=255)
+    sql = models.TextField()
+    count = models.PositiveBigIntegerField(default=0)
+    total_ms = models.FloatField(default=0)
+    max_ms = models.FloatField(default=0)
+    histogram = models.JSONField(default=list)
+    updated_on = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ('fingerprint', 'endpoint')
+
+    def __str__(self):
+        return '{} on {}'.format(self.fingerprint, self.endpoint)
+
+    @property
+    def p95_ms(self):
+        return self.percentile(0.95)
+
+    def percentile(self, fraction):
+        """Upper bound of the bucket holding the percentile, capped at the slowest query seen"""
+        rank = fraction * sum(self.histogram)
+        seen = 0
+        for bound, count in zip(self.BUCKETS_MS + (self.max_ms,), self.histogram):
+            seen += count
+            if count and seen >= rank:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def merge(self, count, total_ms, max_ms, histogram):
+        self.count += count
+        self.total_ms += total_ms
+        self.max_ms = max(self.max_ms, max_ms)
+        size = max(len(self.histogram), len(histogram))
+        self.histogram = [
+            (self.histogram[i] if i < len(self.histogram) else 0) + (histogram[i] if i < len(histogram) else 0)
+            for i in range(size)
+        ]
@@ -0,0 +1,80 @@
+"""
+cProfile samples of individual requests.
+
+A request is profiled when it carries `X-Profile: <PROFILING_TOKEN>`, or at
+random with probability PROFILING_RATE if its URL name is in PROFILING_VIEWS
+(every view when empty). Each sample is written to PROFILING_DIR as
+`<time>-<url name>-<pid>.prof`, only the newest PROFILING_MAX_FILES are kept.
+`profile_summary` merges the samples into one report.
+"""
+import hmac
+import logging
+import os
+import random
+import time
+
+from django.conf import settings
+from django.urls import Resolver404, resolve
+
+
+logger = logging.getLogger(__name__)
+
+HEADER = 'X-Profile'
+SUFFIX = '.prof'
+
+
+def requested(request):
+    token = request.headers.get(HEADER)
+    return bool(token and settings.PROFILING_TOKEN) and hmac.compare_digest(token, settings.PROFILING_TOKEN)
+
+
+def view_name(request):
+    try:
+        return resolve(request.path_info).view_name
+    except Resolver404:
+        return 'unresolved'
+
+
+def wanted(request):
+    """URL name to profile the request under, None when it is not sampled"""
+    if requested(request):
+        return view_name(request)
+    if settings.PROFILING_RATE and random.random() < settings.PROFILING_RATE:
+        name = view_name(request)
+        if not settings.PROFILING_VIEWS or name in settings.PROFILING_VIEWS:
+            return name
+    return None
+
+
+def profiles(directory=None):
+    directory = directory or settings.PROFILING_DIR
+    try:
+        names = [name for name in os.listdir(directory) if name.endswith(SUFFIX)]
+    except FileNotFoundError:
+        return []
+    return sorted(os.path.join(directory, name) for name in names)
+
+
+def prune(directory=None, keep=None):
+    """Delete the oldest samples past the limit, file names sort by time"""
+    keep = settings.PROFILING_MAX_FILES if keep is None else keep
+    stale = profiles(directory)[:-keep] if keep else profiles(directory)
+    for path in stale:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    return len(stale)
+
+
+def save(profiler, name):
+    """Write the sample next to the others and return its file name"""
+    directory = settings.PROFILING_DIR
+    os.makedirs(directory, exist_ok=True)
+    filename = '{:.6f}-{}-{}{}'.format(time.time(), name.replace(':', '.'), os.getpid(), SUFFIX)
+    path = os.path.join(directory, filename)
+    partial = f'{path}.part'
+    profiler.dump_stats(partial)
+    os.replace(partial, path)
+    prune(directory)
+    return filename
@@ -0,0 +1,153 @@
+"""
+SQL fingerprints per endpoint, enabled with QUERY_STATS.
+
+Every statement on a core table is normalized (literals and placeholder
+lists collapsed) and hashed, so `Article.objects.filter(pk__in=[1, 2])` and
+the same filter with fifty ids count as one query shape. Each process keeps
+count, total time and a latency histogram per (fingerprint, endpoint) and
+merges them into QueryStat every QUERY_STATS_FLUSH_SECONDS, `query_stats`
+and the admin read the merged rows. Statements slower than SLOW_QUERY_MS
+are also logged to `core.query_stats`.
+"""
+import atexit
+import bisect
+import functools
+import hashlib
+import logging
+import re
+import threading
+import time
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+
+from core.models import QueryStat
+
+
+logger = logging.getLogger(__name__)
+
+CORE_TABLES = '"core_'
+UNRESOLVED = '<unresolved>'
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b|%s|\?")
+_LISTS = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_ROWS = re.compile(r'\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+')
+_WHITESPACE = re.compile(r'\s+')
+
+
+@functools.lru_cache(maxsize=2048)
+def normalize(sql):
+    sql = _LITERALS.sub('?', sql)
+    sql = _LISTS.sub('(...)', sql)
+    sql = _ROWS.sub('(...)', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+@functools.lru_cache(maxsize=2048)
+def fingerprint(sql):
+    return hashlib.sha1(normalize(sql).encode()).hexdigest()[:16]
+
+
+def endpoint(request):
+    match = getattr(request, 'resolver_match', None)
+    return f'{request.method} {match.view_name if match else UNRESOLVED}'
+
+
+class Stat:
+
+    def __init__(self, sql):
+        self.sql = sql
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.histogram = [0] * (len(QueryStat.BUCKETS_MS) + 1)
+
+    def add(self, duration_ms):
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.histogram[bisect.bisect_left(QueryStat.BUCKETS_MS, duration_ms)] += 1
+
+
+class Recorder:
+
+    def __init__(self, interval=None):
+        self._lock = threading.Lock()
+        self._stats = {}
+        self.interval = interval
+        self._flushed_at = time.monotonic()
+
+    def add(self, endpoint, sql, duration_ms):
+        key = (fingerprint(sql), endpoint)
+        with self._lock:
+            stat = self._stats.get(key)
+            if stat is None:
+                stat = self._stats[key] = Stat(normalize(sql))
+            stat.add(duration_ms)
+
+    def due(self):
+        return self.interval is not None and time.monotonic() - self._flushed_at >= self.interval
+
+    def take(self):
+        with self._lock:
+            stats, self._stats = self._stats, {}
+            self._flushed_at = time.monotonic()
+        return stats
+
+
+_recorder = None
+
+
+def recorder():
+    global _recorder
+    if _recorder is None:
+        _recorder = Recorder(interval=settings.QUERY_STATS_FLUSH_SECONDS)
+        atexit.register(flush, _recorder)
+    return _recorder
+
+
+def wrapper(request):
+    """`connection.execute_wrapper` hook that times core queries for one request"""
+    stats = recorder()
+
+    def record_query(execute, sql, params, many, context):
+        if CORE_TABLES not in sql:
+            return execute(sql, params, many, context)
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            name = endpoint(request)
+            stats.add(name, sql, duration_ms)
+            if duration_ms >= settings.SLOW_QUERY_MS:
+                logger.warning(
+                    'Slow query %.1fms on %s [%s]: %s', duration_ms, name, fingerprint(sql), normalize(sql)
+                )
+
+    return record_query
+
+
+def flush(query_recorder=None):
+    """Merge the recorded stats into QueryStat, returns the number of rows touched"""
+    stats = (query_recorder or recorder()).take()
+    if not stats:
+        return 0
+    with transaction.atomic():
+        for (key, name), stat in sorted(stats.items()):
+            row, _ = QueryStat.objects.select_for_update().get_or_create(
+                fingerprint=key, endpoint=name[:255], defaults={'sql': stat.sql}
+            )
+            row.merge(stat.count, stat.total_ms, stat.max_ms, stat.histogram)
+            row.save()
+    return len(stats)
+
+
+def flush_if_due():
+    stats = recorder()
+    if not stats.due():
+        return
+    try:
+        flush(stats)
+    except DatabaseError:
+        logger.exception('Could not write query stats')
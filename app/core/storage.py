@@ -0,0 +1,95 @@
+import os
+import hashlib
+import mimetypes
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage, Storage
+from django.utils.deconstruct import deconstructible
+
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+
+
+class ContentAddressedMixin:
+    """
+    Replaces the file name chosen by `upload_to` with the SHA-256 of the
+    bytes, keeping its directory and extension. Identical content maps to
+    the same name and is written once.
+    """
+
+    def content_name(self, name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        content.seek(0)
+        content_hash = digest.hexdigest()
+        directory = os.path.dirname(name)
+        ext = os.path.splitext(name)[1].lower()
+
+        return os.path.join(directory, content_hash[:2], content_hash[2:4], f'{content_hash}{ext}')
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.content_name(name, content)
+        if self.exists(name):
+            return name
+
+        return super().save(name, content, max_length=max_length)
+
+
+@deconstructible
+class LocalMediaStorage(ContentAddressedMixin, FileSystemStorage):
+    pass
+
+
+@deconstructible
+class S3MediaStorage(ContentAddressedMixin, Storage):
+    """
+    Minimal S3 compatible backend. boto3 is only needed when this storage
+    is selected, any client with the same methods can be passed in.
+    """
+
+    def __init__(self, client=None, bucket=None, public_url=None):
+        self.bucket = bucket or settings.MEDIA_S3_BUCKET
+        self.public_url = public_url or settings.MEDIA_S3_PUBLIC_URL
+        self._client = client
+
+    @property
+    def client(self):
+        if self._client is None:
+            import boto3
+            self._client = boto3.client('s3', endpoint_url=settings.MEDIA_S3_ENDPOINT_URL)
+        return self._client
+
+    def _save(self, name, content):
+        content_type = mimetypes.guess_type(name)[0] or 'application/octet-stream'
+        self.client.upload_fileobj(content, self.bucket, name, ExtraArgs={
+            'ContentType': content_type,
+            'CacheControl': IMMUTABLE_CACHE_CONTROL,
+        })
+        return name
+
+    def _open(self, name, mode='rb'):
+        return File(self.client.get_object(Bucket=self.bucket, Key=name)['Body'], name)
+
+    def exists(self, name):
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=name)
+        except Exception as exc:
+            if getattr(exc, 'response', {}).get('Error', {}).get('Code') in ('404', 'NoSuchKey', 'NotFound'):
+                return False
+            raise
+        return True
+
+    def delete(self, name):
+        self.client.delete_object(Bucket=self.bucket, Key=name)
+
+    def size(self, name):
+        return self.client.head_object(Bucket=self.bucket, Key=name)['ContentLength']
+
+    def url(self, name):
+        return f'{self.public_url.rstrip("/")}/{name}'
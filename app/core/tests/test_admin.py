@@ -1,23 +1,33 @@
+from unittest.mock import patch
+
+from django.db import connection
 from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 
+from core import admin
+from core.models import Article, Category, Comment, QueryStat
+
 
 class AdminTest(TestCase):
 
-    def setUp(self):
-        self.client = Client()
-        self.admin_user = get_user_model().objects.create_superuser(
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = get_user_model().objects.create_superuser(
             email='admin@gmail.com',
             password='testpass'
         )
-        self.client.force_login(self.admin_user)
-        self.user = get_user_model().objects.create_user(
+        cls.user = get_user_model().objects.create_user(
             email='test@gmail.com',
             password='testpass',
             name='testname'
         )
 
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.admin_user)
+
     def test_users_listed(self):
         url = reverse('admin:core_user_changelist')
         res = self.client.get(url)
@@ -35,4 +45,120 @@ class AdminTest(TestCase):
         url = reverse('admin:core_user_add')
         res = self.client.get(url)
 
-        self.assertEqual(res.status_code, 200)
\ No newline at end of file
+        self.assertEqual(res.status_code, 200)
+    def test_query_stats_listed(self):
+        QueryStat.objects.create(
+            fingerprint='0123456789abcdef', endpoint='GET article:article-list', sql='SELECT ?',
+            count=4, total_ms=20, max_ms=8, histogram=[0, 0, 0, 4]
+        )
+        url = reverse('admin:core_querystat_changelist')
+        res = self.client.get(url)
+
+        self.assertContains(res, '0123456789abcdef')
+        self.assertContains(res, 'GET article:article-list')
+
+
+class ContentAdminTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin_user = get_user_model().objects.create_superuser(
+            email='admin@gmail.com',
+            password='testpass'
+        )
+        cls.author = get_user_model().objects.create_author_user('author@gmail.com', 'testpass')
+        cls.category = Category.objects.create(title='sport', slug='sport', author=cls.author)
+        cls.article = Article.objects.create(
+            title='Barcelona vs Real Madrid', description='match', slug='el-clasico', owner=cls.author
+        )
+        cls.article.categories.add(cls.category)
+        cls.article.like.add(cls.admin_user)
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.admin_user)
+
+    def changelist_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            res = self.client.get(url)
+        self.assertEqual(res.status_code, 200)
+        return len(queries)
+
+    def test_comment_changelist_queries_constant(self):
+        url = reverse('admin:core_comment_changelist')
+        Comment.objects.create(article=self.article, author=self.author, body='first')
+        one = self.changelist_queries(url)
+
+        for number in range(5):
+            user = get_user_model().objects.create_user(f'reader{number}@gmail.com', 'testpass')
+            Comment.objects.create(article=self.article, author=user, body='more')
+
+        self.assertEqual(self.changelist_queries(url), one)
+
+    def test_article_changelist_search(self):
+        url = reverse('admin:core_article_changelist')
+        Article.objects.create(title='Other', description='other', slug='other', owner=self.author)
+
+        res = self.client.get(url, {'q': 'el-clasico'})
+        res_prefix = self.client.get(url, {'q': 'Barcelona'})
+
+        self.assertContains(res, 'Barcelona vs Real Madrid')
+        self.assertNotContains(res, 'Other')
+        self.assertContains(res_prefix, 'Barcelona vs Real Madrid')
+
+    def test_article_change_page_has_no_user_select(self):
+        url = reverse('admin:core_article_change', args=[self.article.id])
+        res = self.client.get(url)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertNotContains(res, f'<option value="{self.author.id}"')
+        self.assertContains(res, 'vForeignKeyRawIdAdminField')
+
+    def test_category_followers_read_only(self):
+        self.category.followers.add(self.author)
+        url = reverse('admin:core_category_change', args=[self.category.id])
+
+        res = self.client.get(url)
+        saved = self.client.post(url, {
+            'title': 'sport', 'slug': 'sport', 'author': self.author.id, 'followers': [self.admin_user.id]
+        })
+
+        self.assertNotContains(res, 'name="followers"')
+        self.assertEqual(saved.status_code, 302)
+        self.assertEqual(list(self.category.followers.all()), [self.author])
+
+    def test_category_autocomplete(self):
+        url = reverse('admin:autocomplete')
+        res = self.client.get(url, {
+            'app_label': 'core', 'model_name': 'article', 'field_name': 'categories', 'term': 'spo'
+        })
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual([item['text'] for item in res.json()['results']], ['sport'])
+
+
+class EstimatedCountPaginatorTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = get_user_model().objects.create_author_user('author@gmail.com', 'testpass')
+        for number in range(3):
+            Article.objects.create(title='A', description='a', slug=f'a{number}', owner=cls.author)
+
+    def test_exact_count_without_estimate(self):
+        paginator = admin.EstimatedCountPaginator(Article.objects.order_by('id'), 2)
+
+        self.assertEqual(paginator.count, 3)
+
+    def test_estimate_used_for_large_tables(self):
+        with patch.object(admin, 'estimated_count', return_value=2000000):
+            paginator = admin.EstimatedCountPaginator(Article.objects.order_by('id'), 100)
+
+            self.assertEqual(paginator.count, 2000000)
+            self.assertEqual(paginator.num_pages, 20000)
+
+    def test_exact_count_for_small_estimates(self):
+        with patch.object(admin, 'estimated_count', return_value=40):
+            paginator = admin.EstimatedCountPaginator(Article.objects.order_by('id'), 2)
+
+            self.assertEqual(paginator.count, 3)
@@ -1,22 +1,102 @@
+from datetime import timedelta
+from io import StringIO
 from unittest.mock import patch
 from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.contrib.auth import get_user_model
 from django.db.utils import OperationalError
 from django.test import TestCase
+from django.utils import timezone
+
+from core import models
 
 
 class CommandTest(TestCase):
 
     def test_wait_for_db_ready(self):
-        with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
-            gi.return_value = True
-            call_command('wait_for_db')
-            self.assertEqual(gi.call_count, 1)
+        with patch('django.db.backends.base.base.BaseDatabaseWrapper.ensure_connection') as ec:
+            call_command('wait_for_db', stdout=StringIO())
+            self.assertEqual(ec.call_count, 1)
 
     @patch('time.sleep', return_value=True)
     def test_wait_for_db(self, ts):
-        with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
-            gi.side_effect = [OperationalError] * 5 + [True]
-            call_command('wait_for_db')
-            self.assertEqual(gi.call_count, 6)
+        with patch('django.db.backends.base.base.BaseDatabaseWrapper.ensure_connection') as ec:
+            ec.side_effect = [OperationalError] * 5 + [None]
+            call_command('wait_for_db', stdout=StringIO())
+            self.assertEqual(ec.call_count, 6)
+            self.assertEqual([c.args[0] for c in ts.call_args_list], [0.25, 0.5, 1, 2, 4])
+
+    @patch('time.sleep', return_value=True)
+    def test_wait_for_db_times_out(self, ts):
+        with patch('django.db.backends.base.base.BaseDatabaseWrapper.ensure_connection') as ec, \
+                patch('time.monotonic', side_effect=[0, 1, 2, 61]):
+            ec.side_effect = OperationalError
+            with self.assertRaisesMessage(CommandError, 'database unavailable'):
+                call_command('wait_for_db', stdout=StringIO())
+            self.assertEqual(ts.call_count, 2)
+
+    @patch('time.sleep', return_value=True)
+    def test_wait_for_db_migrations(self, ts):
+        with patch(
+            'core.management.commands.wait_for_db.Command.pending_migrations',
+            side_effect=[['0023_comment_author_created_idx'], []]
+        ):
+            call_command('wait_for_db', '--migrations', stdout=StringIO())
+            self.assertEqual(ts.call_count, 1)
+
+    def test_no_pending_migrations(self):
+        call_command('wait_for_db', '--migrations', stdout=StringIO())
+
+    def test_measure_startup(self):
+        out = StringIO()
+        call_command('measure_startup', '--runs', '1', stdout=out)
+
+        self.assertIn('answered 401', out.getvalue())
+        self.assertIn('first_request', out.getvalue())
+
+
+class ContentMaintenanceCommandTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_author_user('author@gmail.com', 'testpass')
+        cls.category = models.Category.objects.create(title='sport', slug='sport', author=cls.user)
+
+    def create_article(self, slug, **params):
+        article = models.Article.objects.create(
+            title='Title', description='Description', slug=slug, owner=self.user, **params
+        )
+        article.categories.set((self.category.id,))
+        article.like.set((self.user.id,))
+        models.Comment.objects.create(article=article, author=self.user, body='Body')
+        return article
+
+    def test_purge_deleted(self):
+        kept = self.create_article('kept')
+        recent = self.create_article('recent')
+        old = self.create_article('old')
+        recent.soft_delete()
+        old.soft_delete()
+        models.Article.all_objects.filter(pk=old.pk).update(deleted_on=timezone.now() - timedelta(days=60))
+
+        call_command('purge_deleted', '--batch-size', '1', stdout=StringIO())
+
+        self.assertEqual(
+            set(models.Article.all_objects.values_list('slug', flat=True)), {kept.slug, recent.slug}
+        )
+        self.assertFalse(models.Comment.all_objects.filter(article_id=old.pk).exists())
+        self.assertFalse(models.Article.like.through.objects.filter(article_id=old.pk).exists())
+
+    def test_archive_articles(self):
+        self.create_article('fresh')
+        old = self.create_article('old', publish_date=timezone.now() - timedelta(days=400))
+
+        call_command('archive_articles', stdout=StringIO())
 
-        
\ No newline at end of file
+        archived = models.ArchivedArticle.objects.get()
+        self.assertEqual(archived.id, old.id)
+        self.assertEqual(archived.categories, [self.category.id])
+        self.assertEqual(archived.likes, [self.user.id])
+        self.assertEqual(models.ArchivedComment.objects.get().article_id, old.id)
+        self.assertFalse(models.Article.all_objects.filter(pk=old.pk).exists())
+        self.assertEqual(models.Comment.objects.count(), 1)
@@ -0,0 +1,78 @@
+import threading
+import time
+from unittest.mock import Mock, patch
+
+from django.test import TestCase
+from django.urls import reverse
+
+from core import health
+
+
+HEALTHZ_URL = reverse('healthz')
+READYZ_URL = reverse('readyz')
+
+
+def failing_check():
+    raise ConnectionError('refused')
+
+
+def hanging_check():
+    time.sleep(0.5)
+
+
+class HealthEndpointTests(TestCase):
+
+    def setUp(self):
+        health._expires = 0
+        health._in_flight.clear()
+
+    def test_healthz_touches_nothing(self):
+        with self.assertNumQueries(0):
+            res = self.client.get(HEALTHZ_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json(), {'status': 'ok'})
+
+    def test_readyz_all_dependencies_ok(self):
+        res = self.client.get(READYZ_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.json()['checks'], {'database': 'ok', 'cache': 'ok', 'storage': 'ok'})
+        self.assertIn('no-cache', res['Cache-Control'])
+
+    def test_readyz_result_reused(self):
+        with patch.object(health, 'run_checks', wraps=health.run_checks) as run_checks:
+            self.client.get(READYZ_URL)
+            self.client.get(READYZ_URL)
+
+        self.assertEqual(run_checks.call_count, 1)
+
+    def test_readyz_failing_dependency(self):
+        with patch.dict(health.CHECKS, {'cache': failing_check}):
+            res = self.client.get(READYZ_URL)
+
+        self.assertEqual(res.status_code, 503)
+        self.assertEqual(res.json()['status'], 'unavailable')
+        self.assertEqual(res.json()['checks']['cache'], 'ConnectionError: refused')
+
+    def test_readyz_hung_dependency_times_out(self):
+        with patch.dict(health.CHECKS, {'storage': hanging_check}), patch.object(health, 'CHECK_TIMEOUT', 0.05):
+            started = time.monotonic()
+            res = self.client.get(READYZ_URL)
+
+        self.assertLess(time.monotonic() - started, 0.4)
+        self.assertEqual(res.status_code, 503)
+        self.assertIn('timed out', res.json()['checks']['storage'])
+
+    def test_hung_check_not_resubmitted(self):
+        release = threading.Event()
+        self.addCleanup(release.set)
+        check = Mock(side_effect=lambda: release.wait(5))
+
+        with patch.dict(health.CHECKS, {'storage': check}), patch.object(health, 'CHECK_TIMEOUT', 0.05):
+            first = health.run_checks()
+            second = health.run_checks()
+
+        self.assertEqual(check.call_count, 1)
+        self.assertIn('timed out', first['storage'])
+        self.assertIn('timed out', second['storage'])
@@ -73,3 +73,30 @@ class ModelTests(TestCase):
         expected_path = f'uploads/article/{uuid}.jpg'
         self.assertEqual(file_path, expected_path)
 
+    def test_article_counters_follow_likes_and_comments(self):
+        user = sample_user()
+        article = models.Article.objects.create(
+            title='Title', description='Description', slug='slug', owner=user
+        )
+        article.like.add(user)
+        comment = models.Comment.objects.create(article=article, author=user, body='Body')
+        article.refresh_from_db()
+        self.assertEqual((article.like_count, article.comment_count), (1, 1))
+
+        user.likes.clear()
+        comment.delete()
+        article.refresh_from_db()
+        self.assertEqual((article.like_count, article.comment_count), (0, 0))
+
+    def test_comment_str_without_loading_author(self):
+        user = sample_user()
+        article = models.Article.objects.create(
+            title='Title', description='Description', slug='slug', owner=user
+        )
+        models.Comment.objects.create(article=article, author=user, body='A long comment ' * 10)
+        comment = models.Comment.objects.get()
+
+        with self.assertNumQueries(0):
+            text = str(comment)
+
+        self.assertEqual(text, 'Comment {} by {}'.format('A long comment A long comment A long comment A lo…', user.id))
@@ -0,0 +1,77 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core import profiling
+
+
+ARTICLE_URL = reverse('article:article-list')
+CATEGORY_URL = reverse('article:category-list')
+
+
+class ProfilingTests(TestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+        settings = override_settings(
+            PROFILING_DIR=self.directory, PROFILING_TOKEN='secret', PROFILING_RATE=0, PROFILING_VIEWS=[]
+        )
+        settings.enable()
+        self.addCleanup(settings.disable)
+        self.client = APIClient()
+
+    def test_profiled_on_header(self):
+        res = self.client.get(ARTICLE_URL, HTTP_X_PROFILE='secret')
+
+        self.assertEqual(res.status_code, 200)
+        self.assertIn('article.article-list', res['X-Profile-Id'])
+        self.assertEqual(os.listdir(self.directory), [res['X-Profile-Id']])
+
+    def test_wrong_token_not_profiled(self):
+        res = self.client.get(ARTICLE_URL, HTTP_X_PROFILE='guess')
+
+        self.assertNotIn('X-Profile-Id', res)
+        self.assertEqual(profiling.profiles(self.directory), [])
+
+    def test_sampled_views_only(self):
+        with self.settings(PROFILING_RATE=1, PROFILING_VIEWS=['article:article-list']):
+            listed = self.client.get(ARTICLE_URL)
+            other = self.client.get(CATEGORY_URL)
+
+        self.assertIn('X-Profile-Id', listed)
+        self.assertNotIn('X-Profile-Id', other)
+
+    def test_oldest_profiles_pruned(self):
+        with self.settings(PROFILING_MAX_FILES=2):
+            ids = [self.client.get(ARTICLE_URL, HTTP_X_PROFILE='secret')['X-Profile-Id'] for _ in range(3)]
+
+        self.assertEqual(sorted(os.listdir(self.directory)), ids[1:])
+
+    @override_settings(PROFILING_TOKEN=None)
+    def test_disabled_without_token_or_rate(self):
+        res = self.client.get(ARTICLE_URL, HTTP_X_PROFILE='secret')
+
+        self.assertNotIn('X-Profile-Id', res)
+
+    def test_summary_merges_samples(self):
+        self.client.get(ARTICLE_URL, HTTP_X_PROFILE='secret')
+        self.client.get(ARTICLE_URL, HTTP_X_PROFILE='secret')
+        out = StringIO()
+
+        call_command('profile_summary', '--view', 'article-list', '--match', 'views', stdout=out)
+
+        self.assertIn('2 profiles', out.getvalue())
+        self.assertIn('views.py', out.getvalue())
+
+    def test_summary_without_samples(self):
+        with self.assertRaises(CommandError):
+            call_command('profile_summary', stdout=StringIO())
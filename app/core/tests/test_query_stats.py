@@ -0,0 +1,155 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core import query_stats
+from core.models import Article, QueryStat
+
+
+def detail_url(pk):
+    return reverse('article:article-detail', args=[pk])
+
+
+class NormalizeTests(TestCase):
+
+    def test_placeholder_lists_collapse(self):
+        few = 'SELECT "core_article"."id" FROM "core_article" WHERE "core_article"."id" IN (%s, %s)'
+        many = 'SELECT "core_article"."id" FROM "core_article" WHERE "core_article"."id" IN (%s, %s, %s, %s)'
+
+        self.assertEqual(query_stats.fingerprint(few), query_stats.fingerprint(many))
+        self.assertTrue(query_stats.normalize(few).endswith('IN (...)'))
+
+    def test_literals_and_whitespace_collapse(self):
+        sql = query_stats.normalize("SELECT *\n  FROM \"core_article\" WHERE slug = 'a''b' LIMIT 21")
+
+        self.assertEqual(sql, 'SELECT * FROM "core_article" WHERE slug = ? LIMIT ?')
+
+    def test_bulk_insert_rows_collapse(self):
+        two = 'INSERT INTO "core_feedentry" ("user_id", "article_id") VALUES (%s, %s), (%s, %s)'
+        three = 'INSERT INTO "core_feedentry" ("user_id", "article_id") VALUES (%s, %s), (%s, %s), (%s, %s)'
+
+        self.assertEqual(query_stats.normalize(two), query_stats.normalize(three))
+
+    def test_different_shapes_differ(self):
+        by_id = 'SELECT * FROM "core_article" WHERE "id" = %s'
+        by_slug = 'SELECT * FROM "core_article" WHERE "slug" = %s'
+
+        self.assertNotEqual(query_stats.fingerprint(by_id), query_stats.fingerprint(by_slug))
+
+
+class QueryStatTests(TestCase):
+
+    def test_percentile_from_histogram(self):
+        stat = QueryStat(max_ms=700, histogram=[90, 0, 0, 0, 0, 5, 0, 0, 5])
+
+        self.assertEqual(stat.percentile(0.5), 1)
+        self.assertEqual(stat.p95_ms, 50)
+        self.assertEqual(stat.percentile(0.99), 500)
+
+    def test_percentile_capped_at_max(self):
+        stat = QueryStat(max_ms=3.2, histogram=[0, 0, 4])
+
+        self.assertEqual(stat.p95_ms, 3.2)
+
+    def test_merge_adds_histograms(self):
+        stat = QueryStat(count=2, total_ms=3, max_ms=2, histogram=[1, 1])
+        stat.merge(3, 30, 20, [0, 1, 0, 0, 0, 2])
+
+        self.assertEqual(stat.count, 5)
+        self.assertEqual(stat.total_ms, 33)
+        self.assertEqual(stat.max_ms, 20)
+        self.assertEqual(stat.histogram, [1, 2, 0, 0, 0, 2])
+
+
+@override_settings(QUERY_STATS=True, SLOW_QUERY_MS=10000)
+class QueryStatsMiddlewareTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_author_user('author@gmail.com', 'testpass')
+        cls.article = Article.objects.create(
+            title='A', description='article', slug='a', owner=cls.user
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.recorder = query_stats._recorder = query_stats.Recorder()
+
+    def tearDown(self):
+        query_stats._recorder = None
+
+    def test_queries_aggregated_per_endpoint(self):
+        self.client.get(detail_url(self.article.id))
+        self.client.get(detail_url(self.article.id))
+        query_stats.flush(self.recorder)
+
+        stats = QueryStat.objects.filter(endpoint='GET article:article-detail')
+        self.assertTrue(stats)
+        article_query = stats.get(sql__contains='FROM "core_article"')
+        self.assertEqual(article_query.count, 2)
+        self.assertEqual(sum(article_query.histogram), 2)
+        self.assertGreater(article_query.total_ms, 0)
+
+    def test_flush_merges_into_existing_rows(self):
+        self.client.get(detail_url(self.article.id))
+        query_stats.flush(self.recorder)
+        self.client.get(detail_url(self.article.id))
+        query_stats.flush(self.recorder)
+
+        article_query = QueryStat.objects.get(
+            endpoint='GET article:article-detail', sql__contains='FROM "core_article"'
+        )
+        self.assertEqual(article_query.count, 2)
+
+    def test_slow_queries_logged(self):
+        with override_settings(SLOW_QUERY_MS=0), self.assertLogs('core.query_stats', 'WARNING') as logs:
+            self.client.get(detail_url(self.article.id))
+
+        self.assertIn('GET article:article-detail', logs.output[0])
+
+    @override_settings(QUERY_STATS=False)
+    def test_disabled_records_nothing(self):
+        self.client.get(detail_url(self.article.id))
+
+        self.assertEqual(query_stats.flush(self.recorder), 0)
+
+
+class QueryStatsCommandTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        QueryStat.objects.create(
+            fingerprint='aaaa', endpoint='GET article:article-list', sql='SELECT 1',
+            count=10, total_ms=50, max_ms=9, histogram=[0, 0, 0, 10]
+        )
+        QueryStat.objects.create(
+            fingerprint='bbbb', endpoint='GET article:article-detail', sql='SELECT 2',
+            count=2, total_ms=400, max_ms=300, histogram=[0, 0, 0, 0, 0, 0, 1, 0, 1]
+        )
+
+    def call(self, *args):
+        out = StringIO()
+        call_command('query_stats', *args, stdout=out)
+        return out.getvalue()
+
+    def test_ordered_by_total_time(self):
+        out = self.call()
+
+        self.assertLess(out.index('bbbb'), out.index('aaaa'))
+
+    def test_ordered_by_count(self):
+        out = self.call('--order', 'count')
+
+        self.assertLess(out.index('aaaa'), out.index('bbbb'))
+
+    def test_endpoint_filter_and_reset(self):
+        out = self.call('--endpoint', 'article-list', '--reset')
+
+        self.assertIn('aaaa', out)
+        self.assertNotIn('bbbb', out)
+        self.assertFalse(QueryStat.objects.exists())
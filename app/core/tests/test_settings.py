@@ -0,0 +1,88 @@
+import os
+import subprocess
+import sys
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.test import TestCase, RequestFactory
+
+from core.middleware import SiteAuthenticationMiddleware, SiteSessionMiddleware
+
+
+def load_settings(**env):
+    """Import the settings module in a fresh interpreter with the given environment"""
+    return subprocess.run(
+        [sys.executable, '-c', (
+            'import app.settings as s; '
+            'print(s.PROFILE, s.DEBUG, s.DATABASES["default"]["CONN_MAX_AGE"], '
+            '"loaders" in s.TEMPLATES[0]["OPTIONS"])'
+        )],
+        cwd=settings.BASE_DIR, env={**os.environ, **env}, capture_output=True, text=True
+    )
+
+
+class SettingsProfileTests(TestCase):
+
+    def test_prod_profile_defaults(self):
+        result = load_settings(
+            DJANGO_PROFILE='prod', DJANGO_SECRET_KEY='secret',
+            CACHE_LOCATION='memcached:11211', EVENTS_REDIS_URL='redis://redis:6379/0'
+        )
+
+        self.assertEqual(result.stdout.split(), ['prod', 'False', '60', 'True'])
+
+    def test_prod_requires_secret_key(self):
+        env = {'DJANGO_PROFILE': 'prod', 'DJANGO_SECRET_KEY': ''}
+
+        result = load_settings(**env)
+
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn('DJANGO_SECRET_KEY', result.stderr)
+
+    def test_shared_cache_required_without_debug(self):
+        env = {'DJANGO_PROFILE': 'prod', 'DJANGO_SECRET_KEY': 'secret', 'CACHE_LOCATION': ''}
+
+        result = load_settings(**env)
+
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn('CACHE_LOCATION', result.stderr)
+
+    def test_shared_event_broker_required_without_debug(self):
+        env = {
+            'DJANGO_PROFILE': 'prod', 'DJANGO_SECRET_KEY': 'secret',
+            'CACHE_LOCATION': 'memcached:11211', 'EVENTS_REDIS_URL': ''
+        }
+
+        result = load_settings(**env)
+
+        self.assertNotEqual(result.returncode, 0)
+        self.assertIn('EVENTS_REDIS_URL', result.stderr)
+
+    def test_dev_profile_debug(self):
+        result = load_settings(DJANGO_PROFILE='dev')
+
+        self.assertEqual(result.stdout.split(), ['dev', 'True', '0', 'False'])
+
+
+class SiteOnlyMiddlewareTests(TestCase):
+
+    def setUp(self):
+        self.factory = RequestFactory()
+        middleware = SiteAuthenticationMiddleware(lambda request: HttpResponse())
+        self.middleware = SiteSessionMiddleware(middleware)
+
+    def test_api_requests_skip_sessions(self):
+        request = self.factory.get('/api/article/articles/')
+
+        self.middleware(request)
+
+        self.assertFalse(hasattr(request, 'session'))
+        self.assertFalse(hasattr(request, 'user'))
+
+    def test_site_requests_keep_sessions(self):
+        request = self.factory.get('/admin/')
+
+        self.middleware(request)
+
+        self.assertTrue(hasattr(request, 'session'))
+        self.assertTrue(hasattr(request, 'user'))
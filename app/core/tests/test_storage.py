@@ -0,0 +1,115 @@
+import io
+import os
+import shutil
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.storage import LocalMediaStorage, S3MediaStorage, IMMUTABLE_CACHE_CONTROL
+
+
+class FakeClientError(Exception):
+
+    def __init__(self, code):
+        self.response = {'Error': {'Code': code}}
+
+
+class FakeS3Client:
+    """Local stand-in for the subset of the boto3 S3 client the storage uses"""
+
+    def __init__(self):
+        self.objects = {}
+
+    def upload_fileobj(self, fileobj, bucket, key, ExtraArgs=None):
+        self.objects[(bucket, key)] = (fileobj.read(), ExtraArgs)
+
+    def get_object(self, Bucket, Key):
+        return {'Body': io.BytesIO(self.objects[(Bucket, Key)][0])}
+
+    def head_object(self, Bucket, Key):
+        if (Bucket, Key) not in self.objects:
+            raise FakeClientError('404')
+        return {'ContentLength': len(self.objects[(Bucket, Key)][0])}
+
+    def delete_object(self, Bucket, Key):
+        self.objects.pop((Bucket, Key), None)
+
+
+class StorageTests(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+
+    def test_local_names_are_content_addressed(self):
+        storage = LocalMediaStorage(location=self.media_root)
+
+        first = storage.save('uploads/article/a.JPG', ContentFile(b'same bytes'))
+        second = storage.save('uploads/article/b.jpg', ContentFile(b'same bytes'))
+        other = storage.save('uploads/article/c.jpg', ContentFile(b'other bytes'))
+
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, other)
+        self.assertTrue(first.startswith('uploads/article/'))
+        self.assertTrue(first.endswith('.jpg'))
+        self.assertEqual(len(os.listdir(os.path.dirname(storage.path(first)))), 1)
+
+    def test_s3_storage(self):
+        client = FakeS3Client()
+        storage = S3MediaStorage(client=client, bucket='media', public_url='https://cdn.example.com/')
+
+        name = storage.save('uploads/article/a.png', ContentFile(b'image bytes'))
+        again = storage.save('uploads/article/b.png', ContentFile(b'image bytes'))
+
+        self.assertEqual(name, again)
+        self.assertEqual(len(client.objects), 1)
+        self.assertEqual(client.objects[('media', name)][1]['CacheControl'], IMMUTABLE_CACHE_CONTROL)
+        self.assertEqual(storage.open(name).read(), b'image bytes')
+        self.assertEqual(storage.size(name), 11)
+        self.assertEqual(storage.url(name), f'https://cdn.example.com/{name}')
+        storage.delete(name)
+        self.assertFalse(storage.exists(name))
+
+
+class MediaViewTests(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root)
+        os.makedirs(os.path.join(self.media_root, 'uploads'))
+        with open(os.path.join(self.media_root, 'uploads', 'image.jpg'), 'wb') as fh:
+            fh.write(b'image bytes')
+        self.url = reverse('media', args=['uploads/image.jpg'])
+
+    def test_serves_with_immutable_cache_headers(self):
+        with self.settings(MEDIA_ROOT=self.media_root):
+            res = self.client.get(self.url)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(b''.join(res.streaming_content), b'image bytes')
+        self.assertEqual(res['Cache-Control'], IMMUTABLE_CACHE_CONTROL)
+
+    @override_settings(MEDIA_ACCEL_REDIRECT_PREFIX='/protected-media/')
+    def test_accel_redirect(self):
+        with self.settings(MEDIA_ROOT=self.media_root):
+            res = self.client.get(self.url)
+
+        self.assertEqual(res['X-Accel-Redirect'], '/protected-media/uploads/image.jpg')
+        self.assertEqual(res.content, b'')
+
+    @override_settings(MEDIA_SENDFILE=True)
+    def test_sendfile(self):
+        with self.settings(MEDIA_ROOT=self.media_root):
+            res = self.client.get(self.url)
+
+        self.assertEqual(res['X-Sendfile'], os.path.join(self.media_root, 'uploads', 'image.jpg'))
+
+    def test_missing_and_traversal(self):
+        with self.settings(MEDIA_ROOT=self.media_root):
+            missing = self.client.get(reverse('media', args=['uploads/none.jpg']))
+            traversal = self.client.get('/media/../settings.py')
+
+        self.assertEqual(missing.status_code, 404)
+        self.assertEqual(traversal.status_code, 404)
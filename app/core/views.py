@@ -0,0 +1,58 @@
+import os
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseRedirect, JsonResponse
+from django.utils._os import safe_join
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_GET
+
+from core import health
+from core.storage import IMMUTABLE_CACHE_CONTROL
+
+
+@require_GET
+def media(request, path):
+    """
+    Media names are content hashes, so responses never change and can be
+    cached forever. The bytes are handed off to the web server when it is
+    configured to send them.
+    """
+    try:
+        full_path = safe_join(default_storage.path(''), path)
+    except NotImplementedError:
+        return HttpResponseRedirect(default_storage.url(path))
+    except SuspiciousFileOperation:
+        raise Http404
+    if not os.path.isfile(full_path):
+        raise Http404
+
+    if settings.MEDIA_ACCEL_REDIRECT_PREFIX:
+        response = HttpResponse(content_type='')
+        response['X-Accel-Redirect'] = settings.MEDIA_ACCEL_REDIRECT_PREFIX.rstrip('/') + '/' + path
+    elif settings.MEDIA_SENDFILE:
+        response = HttpResponse(content_type='')
+        response['X-Sendfile'] = full_path
+    else:
+        response = FileResponse(open(full_path, 'rb'))
+    response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+
+    return response
+
+
+@never_cache
+@require_GET
+def healthz(request):
+    """Liveness, the process answers requests. Touches no dependency."""
+    return JsonResponse({'status': 'ok'})
+
+
+@never_cache
+@require_GET
+def readyz(request):
+    """Readiness, the database, cache and storage answer within a short timeout"""
+    checks = health.readiness()
+    ready = all(result == 'ok' for result in checks.values())
+
+    return JsonResponse({'status': 'ok' if ready else 'unavailable', 'checks': checks}, status=200 if ready else 503)
@@ -0,0 +1,34 @@
+import multiprocessing
+import os
+
+
+# One config, two pools picked with GUNICORN_POOL. Route these long lived
+# endpoints to the stream pool at the proxy, everything else to api:
+#
+#   /api/article/articles/<id>/stream/  server-sent events, open up to
+#                                       article.events.STREAM_MAX_SECONDS
+#   /api/article/articles/export/       NDJSON and CSV dumps of whole tables
+#
+# Both pools use gthread workers: the worker heartbeat runs outside the
+# request threads, so a response that streams for minutes is not killed by
+# `timeout`, it only holds one thread. api keeps few threads per process,
+# stream many, as its threads mostly wait on the event broker or the client.
+POOL = os.environ.get('GUNICORN_POOL', 'api')
+if POOL not in ('api', 'stream'):
+    raise ValueError(f'Unknown GUNICORN_POOL {POOL!r}, use api or stream')
+
+wsgi_app = 'app.wsgi:application'
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+worker_class = 'gthread'
+if POOL == 'stream':
+    workers = int(os.environ.get('GUNICORN_WORKERS', 2))
+    threads = int(os.environ.get('GUNICORN_THREADS', 64))
+else:
+    workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+    threads = int(os.environ.get('GUNICORN_THREADS', 4))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 30))
+
+# Load Django, every app and the URLconf once in the master, workers fork with
+# it in memory. Nothing opens a database connection at import time, so no
+# connection is shared across the fork.
+preload_app = True
@@ -3,6 +3,8 @@ from rest_framework import serializers
 from django.utils.translation import ugettext_lazy as _
 from django.contrib.auth import get_user_model, authenticate
 
+from core.models import Notification
+
 
 class UserSerializer(serializers.ModelSerializer):
 
@@ -55,4 +57,17 @@ class AuthTokenSerializer(serializers.Serializer):
             raise serializers.ValidationError(msg, code='authentication')
 
         attrs['user'] = user
-        return attrs
\ No newline at end of file
+        return attrs
+
+
+class NotificationSerializer(serializers.ModelSerializer):
+    message = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Notification
+        fields = ['id', 'article', 'kind', 'count', 'created_on', 'message']
+        read_only_fields = fields
+
+    def get_message(self, obj):
+        noun = obj.kind if obj.count == 1 else f'{obj.kind}s'
+        return f'{obj.count} new {noun} on "{obj.article.title}"'
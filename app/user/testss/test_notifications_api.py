@@ -0,0 +1,86 @@
+from io import StringIO
+
+from django.test import TestCase
+from django.urls import reverse
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Article, Notification, NotificationOutbox
+
+
+NOTIFICATIONS_URL = reverse('user:notifications')
+COMMENT_URL = reverse('article:comment-list')
+
+
+def like_url(article_id):
+    return reverse('article:article-add-like', args=[article_id])
+
+
+class NotificationApiTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.author_user = get_user_model().objects.create_author_user(
+            'authormail@gmail.com',
+            'testpassword'
+        )
+        cls.readers = [
+            get_user_model().objects.create_user(f'reader{i}@gmail.com', 'testpassword')
+            for i in range(3)
+        ]
+        cls.article = Article.objects.create(
+            title='A test article',
+            description='Test description for above article',
+            slug='SestSlug',
+            owner=cls.author_user
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+
+    def test_like_and_comment_write_outbox(self):
+        self.client.force_authenticate(self.readers[0])
+        self.client.patch(like_url(self.article.id))
+        self.client.post(COMMENT_URL, {'article': self.article.id, 'body': 'Nice'})
+
+        kinds = sorted(NotificationOutbox.objects.values_list('kind', flat=True))
+        self.assertEqual(kinds, [NotificationOutbox.COMMENT, NotificationOutbox.LIKE])
+
+    def test_own_activity_and_unlike_not_notified(self):
+        self.client.force_authenticate(self.author_user)
+        self.client.patch(like_url(self.article.id))
+        self.client.force_authenticate(self.readers[0])
+        self.client.delete(like_url(self.article.id))
+
+        self.assertFalse(NotificationOutbox.objects.exists())
+
+    def test_worker_aggregates_digests(self):
+        for reader in self.readers:
+            self.client.force_authenticate(reader)
+            self.client.patch(like_url(self.article.id))
+        self.client.post(COMMENT_URL, {'article': self.article.id, 'body': 'Nice'})
+
+        call_command('send_notifications', '--batch-size', '2', stdout=StringIO())
+
+        self.assertFalse(NotificationOutbox.objects.exists())
+        likes = Notification.objects.filter(kind=NotificationOutbox.LIKE)
+        self.assertEqual(sum(likes.values_list('count', flat=True)), 3)
+        self.assertEqual(Notification.objects.get(kind=NotificationOutbox.COMMENT).count, 1)
+
+    def test_list_notifications(self):
+        Notification.objects.create(
+            recipient=self.author_user, article=self.article, kind=NotificationOutbox.LIKE, count=50
+        )
+        Notification.objects.create(
+            recipient=self.readers[0], article=self.article, kind=NotificationOutbox.LIKE, count=1
+        )
+        self.client.force_authenticate(self.author_user)
+
+        res = self.client.get(NOTIFICATIONS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 1)
+        self.assertEqual(res.data[0]['message'], '50 new likes on "A test article"')
@@ -117,12 +117,15 @@ class PublicUsersApiTests(TestCase):
 
 class PrivateUserApiTest(TestCase):
 
-    def setUp(self):
-        self.user = create_user(
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user(
             email='test@gmail.com',
             password='tetspass',
             name='test name'
         )
+
+    def setUp(self):
         self.client = APIClient()
         self.client.force_authenticate(user=self.user)
 
@@ -8,5 +8,6 @@ urlpatterns = [
     path('create_user/', views.CreateUserView.as_view(), name='create_user'),
     path('create_author/', views.CreateAuthorView.as_view(), name='create_author'),
     path('token/', views.CreateTokenView.as_view(), name='token'),
-    path('me/', views.ManageUserView.as_view(), name='me')
+    path('me/', views.ManageUserView.as_view(), name='me'),
+    path('notifications/', views.NotificationListView.as_view(), name='notifications'),
 ]
\ No newline at end of file
@@ -2,7 +2,7 @@ from rest_framework import generics, authentication, permissions
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.settings import api_settings
 
-from user.serializers import UserSerializer, AuthorSerializer, AuthTokenSerializer
+from user.serializers import UserSerializer, AuthorSerializer, AuthTokenSerializer, NotificationSerializer
 
 
 class CreateUserView(generics.CreateAPIView):
@@ -30,4 +30,15 @@ class ManageUserView(generics.RetrieveUpdateAPIView):
         if self.request.user.is_author:
             return AuthorSerializer
         
-        return self.serializer_class
\ No newline at end of file
+        return self.serializer_class
+
+
+class NotificationListView(generics.ListAPIView):
+    serializer_class = NotificationSerializer
+    authentication_classes = (authentication.TokenAuthentication,)
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def get_queryset(self):
+        return self.request.user.notifications.select_related('article').only(
+            'id', 'article__title', 'kind', 'count', 'created_on'
+        ).order_by('-created_on')[:100]